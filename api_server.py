@@ -0,0 +1,199 @@
+"""
+NotionMate HTTP API
+
+Headless ASGI service with the same features as the Streamlit app:
+
+- chat sessions with server-side history, answered with RAG over the
+  vector store (optionally streamed as server-sent events)
+- PDF ingestion into the knowledge base
+- Notion page listing and background note creation
+
+Run with several worker processes, e.g.:
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8000 --workers 4
+
+Chat history is shared by all workers (SQLite under ``NOTIONMATE_DATA_DIR``).
+Note jobs run in the worker that accepted them, so poll a job through the
+same worker (sticky sessions) or submit it with ``wait=true``.
+"""
+
+import asyncio
+import json
+import os
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, File, Header, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+load_dotenv()
+os.environ["OTEL_SDK_DISABLED"] = "true"
+
+from notion_agent.event_loop import submit
+from notion_mcp_config import notion_config_error
+from rag_component.chat_service import CONTEXT_MESSAGES, aanswer, astream_answer, ingest_pdf, submit_note_job
+from rag_component.chat_store import chat_history_store
+
+
+# Seconds between job status checks when a note request waits for completion
+NOTE_WAIT_POLL_INTERVAL = 0.5
+
+app = FastAPI(title="NotionMate API")
+
+
+class ChatRequest(BaseModel):
+    message: str
+    stream: bool = False
+
+
+class NoteRequest(BaseModel):
+    notion_token: str
+    page_id: Optional[str] = None
+    wait: bool = False
+
+
+class Message(BaseModel):
+    role: str
+    content: str
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+async def _require_session(session_id: str):
+    if not await asyncio.to_thread(chat_history_store.exists, session_id):
+        raise HTTPException(status_code=404, detail="Unknown session")
+
+
+def _require_notion():
+    notion_error = notion_config_error()
+    if notion_error:
+        raise HTTPException(status_code=503, detail=f"Notion integration unavailable: {notion_error}")
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# ============================================================================
+# Chat Sessions
+# ============================================================================
+
+@app.post("/sessions")
+async def create_session():
+    session_id = await asyncio.to_thread(chat_history_store.create_session)
+    return {"session_id": session_id}
+
+
+@app.get("/sessions/{session_id}/messages", response_model=List[Message])
+async def get_messages(session_id: str, limit: Optional[int] = None):
+    """A session's messages, or only the most recent ``limit`` of them."""
+    await _require_session(session_id)
+    return await asyncio.to_thread(chat_history_store.messages, session_id, limit)
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    await asyncio.to_thread(chat_history_store.delete, session_id)
+    return {"deleted": session_id}
+
+
+@app.post("/sessions/{session_id}/chat")
+async def chat(session_id: str, request: ChatRequest):
+    """Answer a message in a session; with ``stream`` the answer arrives as SSE ``token`` events."""
+    await _require_session(session_id)
+    await asyncio.to_thread(chat_history_store.append, session_id, "user", request.message)
+    messages = await asyncio.to_thread(chat_history_store.messages, session_id, CONTEXT_MESSAGES)
+
+    if not request.stream:
+        response = await aanswer(request.message, messages)
+        await asyncio.to_thread(chat_history_store.append, session_id, "assistant", response)
+        return {"role": "assistant", "content": response}
+
+    async def events():
+        chunks = []
+        try:
+            async for chunk in astream_answer(request.message, messages):
+                chunks.append(chunk)
+                yield _sse("token", chunk)
+        except Exception as e:
+            yield _sse("error", str(e))
+            return
+        response = "".join(chunks)
+        await asyncio.to_thread(chat_history_store.append, session_id, "assistant", response)
+        yield _sse("done", {"role": "assistant", "content": response})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ============================================================================
+# Documents
+# ============================================================================
+
+@app.post("/documents")
+async def upload_document(file: UploadFile = File(...), session_id: Optional[str] = None):
+    """Add a PDF to the knowledge base, optionally noting it in a chat session."""
+    data = await file.read()
+    try:
+        chunks_added = await asyncio.to_thread(ingest_pdf, data, file.filename)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing PDF: {e}")
+
+    if session_id and await asyncio.to_thread(chat_history_store.exists, session_id):
+        system_msg = f"PDF '{file.filename}' has been added to the knowledge base. You can now ask questions about it."
+        await asyncio.to_thread(chat_history_store.append, session_id, "system", system_msg)
+    return {"file": file.filename, "chunks_added": chunks_added}
+
+
+# ============================================================================
+# Notion
+# ============================================================================
+
+def _note_jobs():
+    """The note job manager, imported on first use (it loads the ADK agents and MCP adapters)."""
+    from notion_agent.jobs import note_job_manager
+
+    return note_job_manager
+
+
+@app.get("/notion/pages")
+async def list_notion_pages(x_notion_token: str = Header(...), refresh: bool = False):
+    from notion_agent.tools.notion_page_info_retriever import get_notion_pages
+
+    _require_notion()
+    # The MCP session pool lives on the background loop, so page listing runs there too
+    pages = await asyncio.wrap_future(submit(get_notion_pages(x_notion_token, refresh=refresh)))
+    return {"pages": pages}
+
+
+@app.post("/sessions/{session_id}/notes", status_code=202)
+async def create_note(session_id: str, request: NoteRequest):
+    """Queue a note from the session's messages not yet written to the page."""
+    _require_notion()
+    await _require_session(session_id)
+    job_id, error = await asyncio.to_thread(submit_note_job, session_id, request.page_id, request.notion_token)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    job = _note_jobs().get(job_id)
+    while request.wait and job and job["status"] in ("queued", "running"):
+        await asyncio.sleep(NOTE_WAIT_POLL_INTERVAL)
+        job = _note_jobs().get(job_id)
+    return job
+
+
+@app.get("/notes/{job_id}")
+async def get_note_job(job_id: str):
+    job = _note_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown note job (jobs are tracked per worker)")
+    return job
+
+
+@app.post("/notes/{job_id}/retry", status_code=202)
+async def retry_note_job(job_id: str):
+    if not _note_jobs().retry(job_id):
+        raise HTTPException(status_code=409, detail="Only failed note jobs can be retried")
+    return _note_jobs().get(job_id)
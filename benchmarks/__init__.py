@@ -0,0 +1,5 @@
+"""
+Benchmarks Module
+
+Offline benchmarks and local stub servers for measuring NotionMate performance.
+"""
@@ -0,0 +1,275 @@
+"""
+Chunking Parameter Sweep
+
+Rebuilds the knowledge base index over a grid of chunk sizes, overlaps and
+splitters, and reports for each configuration:
+
+- chunk count, build time (split + embed + index) and index size on disk
+- search latency per query
+- prompt tokens per answer (RAG prompt with the top-k chunks, estimated)
+- recall@k: how often a question's evidence is in the top-k chunks
+
+Page text comes from the shared PDF text cache (rag_component/pdf_text_cache.py)
+and chunk embeddings are cached under ``--cache-dir``, so configurations that
+produce the same chunk (and later sweeps over the same corpus) do not
+re-parse PDFs or re-embed it. Indexes are built as
+index_snapshots snapshots in a temporary directory.
+
+Questions come from ``--questions`` (JSONL with ``question`` and either an
+``evidence`` string expected in a retrieved chunk, or the ``source`` file and
+1-based ``page`` it should come from). Without it, ``--auto-questions``
+sentences are sampled from the corpus pages as queries with their page as
+ground truth.
+
+Usage:
+    python -m benchmarks.chunking_sweep --chunk-sizes 250,500,1000 --overlaps 0,50,100
+    python -m benchmarks.chunking_sweep --questions eval.jsonl --splitters recursive,character --k 5
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.notion_backend_latency import summarize
+
+
+CHARS_PER_TOKEN = 4
+
+
+# ============================================================================
+# Caches
+# ============================================================================
+
+def load_pages(data_dir: str) -> List[Dict[str, Any]]:
+    """Page texts of every PDF under data_dir, parsed once per file content (pdf_text_cache)."""
+    from rag_component.pdf_text_cache import load_pdf_directory
+
+    return [{"source": os.path.basename(doc.metadata["source"]), "page": doc.metadata.get("page", 0) + 1,
+             "text": doc.page_content} for doc in load_pdf_directory(data_dir)]
+
+
+class EmbeddingCache:
+    """Chunk embeddings keyed by model and text, shared across configurations and runs."""
+
+    def __init__(self, path: str, embeddings, model_name: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.computed = 0
+        self.reused = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        keys = [self._key(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            vectors = np.asarray(self.embeddings.embed_documents([texts[i] for i in missing]), dtype=np.float32)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(keys[i], vector.tobytes()) for i, vector in zip(missing, vectors)]
+            )
+            self.conn.commit()
+            found.update((keys[i], vector) for i, vector in zip(missing, vectors))
+
+        self.computed += len(missing)
+        self.reused += len(texts) - len(missing)
+        return np.stack([found[key] for key in keys])
+
+
+# ============================================================================
+# Questions
+# ============================================================================
+
+def load_questions(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def sample_questions(pages: List[Dict[str, Any]], count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Corpus sentences as queries, each expected to retrieve its own page."""
+    rng = random.Random(seed)
+    candidates = []
+    for page in pages:
+        for sentence in re.split(r"(?<=[.!?])\s+", page["text"]):
+            sentence = " ".join(sentence.split())
+            if 60 <= len(sentence) <= 300:
+                candidates.append({"question": sentence, "source": page["source"], "page": page["page"]})
+    return rng.sample(candidates, min(count, len(candidates)))
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def is_hit(question: Dict[str, Any], chunks: List[Dict[str, Any]]) -> bool:
+    if question.get("evidence"):
+        evidence = _normalize(question["evidence"])
+        return any(evidence in _normalize(chunk["text"]) for chunk in chunks)
+    return any(chunk["source"] == question["source"] and chunk["page"] == question["page"] for chunk in chunks)
+
+
+# ============================================================================
+# Sweep
+# ============================================================================
+
+def make_splitter(name: str, chunk_size: int, chunk_overlap: int):
+    from langchain.text_splitter import CharacterTextSplitter, RecursiveCharacterTextSplitter
+
+    if name == "recursive":
+        return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    if name == "character":
+        return CharacterTextSplitter(separator="\n", chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    raise ValueError(f"Unknown splitter: {name}")
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def run_config(pages, questions, query_embeddings, cache: EmbeddingCache, splitter_name: str,
+               chunk_size: int, chunk_overlap: int, k: int, prompt_overhead: int) -> Dict[str, Any]:
+    from rag_component.index_snapshots import SnapshotStore
+
+    start = time.perf_counter()
+    splitter = make_splitter(splitter_name, chunk_size, chunk_overlap)
+    chunks = []
+    for page in pages:
+        for text in splitter.split_text(page["text"]):
+            chunks.append({"text": text, "source": page["source"], "page": page["page"]})
+    split_time = time.perf_counter() - start
+
+    computed_before = cache.computed
+    embed_start = time.perf_counter()
+    vectors = cache.embed([chunk["text"] for chunk in chunks])
+    embed_time = time.perf_counter() - embed_start
+
+    with tempfile.TemporaryDirectory() as root:
+        index_start = time.perf_counter()
+        store = SnapshotStore(root)
+        store.publish([c["text"] for c in chunks], [{"source": c["source"], "page": c["page"]} for c in chunks], vectors)
+        snapshot = store.open()
+        index_time = time.perf_counter() - index_start
+        index_bytes = _dir_bytes(os.path.join(root, snapshot.version))
+
+        latencies, hits, prompt_tokens = [], 0, []
+        for question, query in zip(questions, query_embeddings):
+            search_start = time.perf_counter()
+            results = snapshot.search(query[None, :], k)[0]
+            latencies.append(time.perf_counter() - search_start)
+            retrieved = [{"text": doc.page_content, **doc.metadata} for doc, _ in results]
+            hits += is_hit(question, retrieved)
+            context_chars = sum(len(chunk["text"]) for chunk in retrieved) + 2 * max(0, len(retrieved) - 1)
+            prompt_tokens.append(prompt_overhead + (context_chars + len(question["question"])) // CHARS_PER_TOKEN)
+
+    return {
+        "splitter": splitter_name,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "chunks": len(chunks),
+        "build_time_s": round(split_time + embed_time + index_time, 3),
+        "embedded_chunks": cache.computed - computed_before,
+        "index_bytes": index_bytes,
+        "search_latency": summarize(latencies) if latencies else None,
+        "prompt_tokens_per_answer": round(sum(prompt_tokens) / len(prompt_tokens), 1) if prompt_tokens else None,
+        f"recall@{k}": round(hits / len(questions), 3) if questions else None,
+    }
+
+
+def choose(results: List[Dict[str, Any]], k: int, tolerance: float) -> Optional[Dict[str, Any]]:
+    """Cheapest configuration (prompt tokens, then index size) within tolerance of the best recall."""
+    recall_key = f"recall@{k}"
+    scored = [r for r in results if r[recall_key] is not None]
+    if not scored:
+        return None
+    best = max(r[recall_key] for r in scored)
+    eligible = [r for r in scored if r[recall_key] >= best - tolerance]
+    return min(eligible, key=lambda r: (r["prompt_tokens_per_answer"], r["index_bytes"]))
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from rag_component.chat_service import EMBEDDING_MODEL, RETRIEVER_K, load_embeddings
+    from rag_component.prompt import get_rag_prompt
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--chunk-sizes", type=_int_list, default=[250, 500, 1000])
+    parser.add_argument("--overlaps", type=_int_list, default=[0, 50, 100])
+    parser.add_argument("--splitters", default="recursive", help="Comma-separated: recursive, character")
+    parser.add_argument("--k", type=int, default=RETRIEVER_K)
+    parser.add_argument("--questions", help="JSONL evaluation questions")
+    parser.add_argument("--auto-questions", type=int, default=100, help="Sampled questions when --questions is not given")
+    parser.add_argument("--recall-tolerance", type=float, default=0.02)
+    parser.add_argument("--cache-dir", default=os.path.join(os.environ.get("NOTIONMATE_DATA_DIR", ".notionmate"), "chunking_sweep"))
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    pages = load_pages(args.data_dir)
+    if not pages:
+        parser.error(f"No PDF pages found under {args.data_dir}")
+    questions = load_questions(args.questions) if args.questions else sample_questions(pages, args.auto_questions)
+
+    cache = EmbeddingCache(os.path.join(args.cache_dir, "embeddings.sqlite3"), load_embeddings(), EMBEDDING_MODEL)
+    query_start = time.perf_counter()
+    query_embeddings = np.asarray(load_embeddings().embed_documents([q["question"] for q in questions]), dtype=np.float32)
+    query_embeddings /= np.maximum(np.linalg.norm(query_embeddings, axis=1, keepdims=True), 1e-12)
+    query_embed_time = time.perf_counter() - query_start
+
+    # Prompt tokens that do not depend on the retrieved context
+    prompt_overhead = len(get_rag_prompt().format(conversation_history="", context="", input="")) // CHARS_PER_TOKEN
+
+    results = []
+    for splitter_name, chunk_size, chunk_overlap in itertools.product(
+            args.splitters.split(","), args.chunk_sizes, args.overlaps):
+        if chunk_overlap >= chunk_size:
+            continue
+        result = run_config(pages, questions, query_embeddings, cache, splitter_name,
+                            chunk_size, chunk_overlap, args.k, prompt_overhead)
+        results.append(result)
+        print(json.dumps(result))
+
+    report = {
+        "pages": len(pages),
+        "questions": len(questions),
+        "question_source": args.questions or f"{len(questions)} sampled corpus sentences",
+        "query_embed_time_s": round(query_embed_time, 3),
+        "embeddings_computed": cache.computed,
+        "embeddings_reused": cache.reused,
+        "results": results,
+        "recommended": choose(results, args.k, args.recall_tolerance),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
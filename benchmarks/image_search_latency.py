@@ -0,0 +1,124 @@
+"""
+Image Search Latency
+
+Times Serper image lookups against a local stub server:
+
+- cold: every topic misses the cache and goes over the network
+- cached: the same topics again, answered from the topic cache
+- hung: the stub never answers some requests in time; each lookup is bounded
+  by the client's read timeout instead of stalling
+
+The run also checks the client's behaviour and fails if any check does not
+hold: cold lookups make one request per topic, cached and normalized topics
+make none, entries expire after their TTL, a 4xx reports an error and is
+not cached, and hung lookups report an error within the timeout.
+
+Usage:
+    python -m benchmarks.image_search_latency --topics 20 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from benchmarks.notion_backend_latency import summarize
+from benchmarks.stub_serper_server import StubSerperServer
+
+
+def expected_url(topic: str) -> str:
+    return f"https://images.example.com/{'-'.join(topic.lower().split())}.jpg"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub server delay per request (seconds)")
+    parser.add_argument("--read-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SERPER_API_KEY", "stub-key")
+    from notion_agent.image_search import ImageSearchClient, TopicImageCache
+
+    topics = [f"topic {i}" for i in range(args.topics)]
+    report, problems = {}, []
+
+    def check(condition: bool, problem: str):
+        if not condition:
+            problems.append(problem)
+
+    with StubSerperServer(latency=args.latency) as server:
+        client = ImageSearchClient(url=server.url, cache=TopicImageCache(":memory:"),
+                                   read_timeout=args.read_timeout)
+        for phase in ("cold", "cached"):
+            before = server.request_count
+            samples, urls = [], []
+            for topic in topics:
+                start = time.perf_counter()
+                urls.append(client.search(topic))
+                samples.append(time.perf_counter() - start)
+            report[phase] = summarize(samples)
+            check(urls == [expected_url(t) for t in topics], f"{phase} lookups returned the wrong URLs")
+            requests = server.request_count - before
+            check(requests == (len(topics) if phase == "cold" else 0),
+                  f"{phase} lookups made {requests} requests")
+
+        # Topics differing only in case and spacing share a cache entry
+        before = server.request_count
+        check(client.search(f"  {topics[0].upper()} ") == expected_url(topics[0])
+              and server.request_count == before, "normalized topic missed the cache")
+
+        # Entries expire after the TTL
+        ttl_client = ImageSearchClient(url=server.url, cache=TopicImageCache(":memory:", ttl=0.3),
+                                       read_timeout=args.read_timeout)
+        before = server.request_count
+        ttl_client.search(topics[0])
+        ttl_client.search(topics[0])
+        check(server.request_count - before == 1, "fresh cache entry was not used")
+        time.sleep(0.4)
+        ttl_client.search(topics[0])
+        check(server.request_count - before == 2, "expired cache entry was still used")
+
+        async def run_async():
+            uncached = ImageSearchClient(url=server.url, cache=None, read_timeout=args.read_timeout)
+            start = time.perf_counter()
+            urls = await asyncio.gather(*(uncached.asearch(topic) for topic in topics))
+            return time.perf_counter() - start, urls
+
+        before = server.request_count
+        elapsed, urls = asyncio.run(run_async())
+        report["async_concurrent_total_ms"] = round(elapsed * 1000, 2)
+        check(list(urls) == [expected_url(t) for t in topics] and server.request_count - before == len(topics),
+              "async lookups returned the wrong URLs or request count")
+        report["stub_requests"] = server.request_count
+
+    # A 4xx surfaces as an error and is not cached
+    with StubSerperServer(api_key="another-key") as server:
+        client = ImageSearchClient(url=server.url, cache=TopicImageCache(":memory:"),
+                                   read_timeout=args.read_timeout)
+        results = [client.search(topics[0]), asyncio.run(client.asearch(topics[0]))]
+        check(all(r.startswith("Error") and "403" in r for r in results), f"403 surfaced as {results}")
+        check(server.request_count == 2, "failed lookup was cached")
+
+    with StubSerperServer(latency=args.latency, hang_every=2, hang_seconds=args.read_timeout * 5) as server:
+        client = ImageSearchClient(url=server.url, cache=None, read_timeout=args.read_timeout)
+        samples, urls = [], []
+        for topic in topics[:6]:
+            start = time.perf_counter()
+            urls.append(client.search(topic))
+            samples.append(time.perf_counter() - start)
+        report["hung"] = summarize(samples)
+        # Every other request hangs; those must time out within the read timeout
+        check(max(samples) < args.read_timeout + args.latency + 1.0, "a hung lookup was not bounded by the timeout")
+        check(all(url.startswith("Error") for url in urls[1::2]), "hung lookups did not report an error")
+
+    print(json.dumps(report, indent=2))
+    if problems:
+        sys.exit("Stub checks failed: " + "; ".join(problems))
+    print("Stub checks passed: cache hits and TTL expiry, async lookups, 4xx errors, timeouts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Import-Time Profile
+
+Measures the cold-start cost of importing the app: each sample imports the
+target module in a fresh interpreter with ``python -X importtime``, and the
+report lists the wall time, the slowest top-level imports and which heavy
+dependencies (LangChain, Chroma, torch, google-adk, MCP, ...) were pulled in.
+
+With ``--ref`` the same measurement runs against another git revision (checked
+out into a temporary worktree), to compare cold start before and after a change.
+
+Usage:
+    python -m benchmarks.import_time --runs 5
+    python -m benchmarks.import_time --module api_server
+    python -m benchmarks.import_time --ref HEAD~1
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.notion_backend_latency import summarize
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    "langchain",
+    "langchain_community",
+    "langchain_groq",
+    "langchain_mcp_adapters",
+    "chromadb",
+    "sentence_transformers",
+    "transformers",
+    "torch",
+    "google.adk",
+    "mcp",
+]
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+_PROBE = (
+    "import importlib, json, sys\n"
+    "importlib.import_module({module!r})\n"
+    "print(json.dumps([m for m in {heavy!r} if m in sys.modules]))\n"
+)
+
+
+def profile_once(module: str, cwd: str) -> Dict[str, Any]:
+    """Import a module in a fresh interpreter and parse its import-time log."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", OTEL_SDK_DISABLED="true")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    wall_time = time.perf_counter() - start
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"importing {module} failed:\n" + "\n".join(errors[-10:]))
+
+    top_level: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        # Top-level imports are the ones without nesting indentation
+        if match and len(match.group(3)) == 1:
+            top_level[match.group(4)] = int(match.group(2))
+
+    return {
+        "wall_time": wall_time,
+        "top_level_us": top_level,
+        "heavy_loaded": json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+def profile(module: str, cwd: str, runs: int, top: int) -> Dict[str, Any]:
+    samples = [profile_once(module, cwd) for _ in range(runs)]
+
+    cumulative: Dict[str, List[int]] = defaultdict(list)
+    for sample in samples:
+        for name, us in sample["top_level_us"].items():
+            cumulative[name].append(us)
+    slowest = sorted(cumulative.items(), key=lambda item: -sum(item[1]) / len(item[1]))[:top]
+
+    return {
+        "wall_time": summarize([s["wall_time"] for s in samples]),
+        "slowest_imports_ms": {name: round(sum(us) / len(us) / 1000, 2) for name, us in slowest},
+        "heavy_loaded": samples[-1]["heavy_loaded"],
+    }
+
+
+def profile_ref(ref: str, module: str, runs: int, top: int) -> Dict[str, Any]:
+    """Profile a git revision from a temporary worktree."""
+    with tempfile.TemporaryDirectory() as parent:
+        worktree = os.path.join(parent, "worktree")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, ref],
+                       cwd=REPO_ROOT, check=True, capture_output=True)
+        try:
+            # The .env file is untracked, so share the working copy's settings
+            env_file = os.path.join(REPO_ROOT, ".env")
+            if os.path.exists(env_file):
+                os.symlink(env_file, os.path.join(worktree, ".env"))
+            return profile(module, worktree, runs, top)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree],
+                           cwd=REPO_ROOT, capture_output=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import (main, api_server, ...)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--ref", help="Also profile this git revision for comparison")
+    args = parser.parse_args()
+
+    report = {"module": args.module, "current": profile(args.module, REPO_ROOT, args.runs, args.top)}
+    if args.ref:
+        report[args.ref] = profile_ref(args.ref, args.module, args.runs, args.top)
+        before = report[args.ref]["wall_time"]["p50_ms"]
+        after = report["current"]["wall_time"]["p50_ms"]
+        report["p50_speedup"] = round(before / after, 2) if after else None
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
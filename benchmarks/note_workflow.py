@@ -0,0 +1,271 @@
+"""
+Note Workflow Benchmark
+
+Runs the full note creation workflow (create_note_from_history_async) offline:
+
+- the ADK agents (summary, topic, image search, formatter, writer) talk to
+  ``FakeLlm``, which answers like Gemini would (tool calls, then text)
+- in ``--formatter llm`` mode the Groq formatter chain is replaced by a fake
+  chain with the same structured output
+- image search goes to a local stub Serper server
+- Notion calls go to a local stub Notion HTTP server (``--backend http``) or
+  a stub Notion MCP server over stdio (``--backend mcp``)
+
+Every fake has injectable latency. The report covers total and per-stage
+latency, LLM call counts per agent and throughput for N concurrent jobs.
+
+Each job summarizes its own conversation, so every note is distinct and the
+write ledger (write_ledger.py) lets all of them through. The run fails if
+any note was skipped as a duplicate or the append requests do not add up.
+
+Usage:
+    python -m benchmarks.note_workflow --jobs 20 --concurrency 5
+    python -m benchmarks.note_workflow --backend mcp --llm-latency 0.3 --notion-latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, AsyncGenerator, Dict, List
+
+from benchmarks.notion_backend_latency import summarize
+from benchmarks.stub_notion_server import StubNotionServer
+from benchmarks.stub_serper_server import StubSerperServer
+
+
+FAKE_SUMMARY = """## Key Points
+
+- **Gastritis** is inflammation of the stomach lining.
+- Common triggers include *NSAIDs*, alcohol and `H. pylori` infection.
+
+## Healing
+
+1. Eat smaller, regular meals.
+2. Avoid spicy and acidic food.
+
+> Most cases improve within a few weeks with treatment."""
+
+
+def make_chat_history(messages: int, message_chars: int = 300, conversation: int = 0) -> str:
+    """Synthetic alternating user/assistant conversation, tagged with its conversation number."""
+    lines = []
+    for i in range(messages):
+        role = "user" if i % 2 == 0 else "assistant"
+        lines.append(f"[{role}] Conversation {conversation}, message {i} about gastritis healing. "
+                     + "lorem ipsum " * (message_chars // 12))
+    return "\n".join(lines)
+
+
+def configure_environment(args, notion_url: str, serper_url: str, data_dir: str):
+    """Point every external service at the local stubs before notion_agent is imported."""
+    os.environ["NOTION_BACKEND"] = args.backend
+    os.environ["NOTION_API_BASE_URL"] = notion_url
+    stub_mcp = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_notion_mcp_server.py")
+    os.environ["NOTION_MCP_COMMAND"] = f"{sys.executable} {stub_mcp} --latency {args.notion_latency}"
+    os.environ["SERPER_IMAGES_URL"] = serper_url
+    os.environ["SERPER_API_KEY"] = "stub-key"
+    os.environ["NOTIONMATE_DATA_DIR"] = data_dir
+    os.environ["LLM_CACHE_ENABLED"] = "true" if args.llm_cache else "false"
+    os.environ["IMAGE_CACHE_TTL"] = "0"
+
+
+def build_fake_llm(latency: float):
+    """Fake ADK model: calls the agent's tool once, then confirms; plain prompts get canned text."""
+    from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+    from google.genai import types
+
+    class FakeLlm(BaseLlm):
+        model: str = "fake-llm"
+        latency: float = 0.0
+
+        @classmethod
+        def supported_models(cls) -> List[str]:
+            return [r"fake-.*"]
+
+        def _reply(self, llm_request: LlmRequest) -> types.Content:
+            last = llm_request.contents[-1] if llm_request.contents else None
+            if llm_request.tools_dict:
+                if last and any(part.function_response for part in last.parts or []):
+                    return types.Content(role="model", parts=[types.Part(text="Done.")])
+                tool_name = next(iter(llm_request.tools_dict))
+                return types.Content(role="model", parts=[
+                    types.Part(function_call=types.FunctionCall(name=tool_name, args={}))
+                ])
+
+            config = llm_request.config
+            instruction = str(config.system_instruction or "") if config else ""
+            if "Topic Extraction" in instruction:
+                text = "Gastritis Healing"
+            else:
+                # Summaries name their conversation, so each job writes a distinct note
+                prompt = "".join(part.text or "" for c in llm_request.contents for part in c.parts or [])
+                conversation = re.search(r"[Cc]onversation (-?\d+)", prompt)
+                text = FAKE_SUMMARY + (f"\n\nFrom conversation {conversation.group(1)}." if conversation else "")
+            return types.Content(role="model", parts=[types.Part(text=text)])
+
+        async def generate_content_async(self, llm_request: LlmRequest,
+                                         stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+            await asyncio.sleep(self.latency)
+            content = self._reply(llm_request)
+
+            prompt_chars = sum(len(part.text or "") for c in llm_request.contents for part in c.parts or [])
+            output_chars = sum(len(part.text or "") for part in content.parts)
+            yield LlmResponse(
+                content=content,
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_chars // 4,
+                    candidates_token_count=output_chars // 4,
+                    total_token_count=(prompt_chars + output_chars) // 4
+                )
+            )
+
+    return FakeLlm(latency=latency)
+
+
+def install_fake_formatter_chain(latency: float) -> Counter:
+    """Switch the shared formatter to llm mode with a fake Groq chain."""
+    from langchain_core.runnables import RunnableLambda
+    from notion_agent.agents.notion_formatter_agent import get_notion_formatter
+
+    formatter = get_notion_formatter()
+    calls: Counter = Counter()
+
+    def respond(inputs: Dict[str, Any]):
+        calls["NotionFormatterChain"] += 1
+        return formatter.compile_content(inputs["topic"], inputs["summary"], inputs["image_url"], inputs["timestamp"])
+
+    async def arespond(inputs: Dict[str, Any]):
+        await asyncio.sleep(latency)
+        return respond(inputs)
+
+    formatter.mode = "llm"
+    formatter.chain = RunnableLambda(respond, afunc=arespond)
+    return calls
+
+
+async def run_jobs(args, page_id: str, reset_counters) -> Dict[str, Any]:
+    from notion_agent.agent import create_note_from_history_async
+
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def one_job(index: int) -> Dict[str, Any]:
+        async with slots:
+            start = time.perf_counter()
+            result = await create_note_from_history_async(
+                make_chat_history(args.messages, conversation=index),
+                notion_page_id=page_id,
+                # One integration per job, so the per-token rate limit does not serialize the run
+                notion_token=f"stub-token-{index % args.tokens}",
+                user_id=f"bench-user-{index}"
+            )
+            result["latency"] = time.perf_counter() - start
+            return result
+
+    # Warm-up jobs pay for MCP start-up and first connections; they are reported separately
+    warmup = [await one_job(-1 - i) for i in range(args.warmup)]
+    reset_counters()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one_job(i) for i in range(args.jobs)))
+    wall_time = time.perf_counter() - start
+    return {"warmup": warmup, "results": results, "wall_time": wall_time}
+
+
+def check_writes(report: Dict[str, Any], args, stub_append_requests: int):
+    """Fail the run if the timed jobs did not each write their own note."""
+    problems = []
+    if report["notion_writes_skipped"]:
+        problems.append(f"{report['notion_writes_skipped']} writes skipped as duplicates")
+    if report["notion_writes"] != report["succeeded"]:
+        problems.append(f"{report['notion_writes']} notes written for {report['succeeded']} succeeded jobs")
+    if args.backend == "http" and stub_append_requests != report["notion_append_requests"]:
+        problems.append(f"stub received {stub_append_requests} append requests, "
+                        f"writer reported {report['notion_append_requests']}")
+    if problems:
+        sys.exit("Write check failed: " + "; ".join(problems))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--messages", type=int, default=40, help="Chat messages per note")
+    parser.add_argument("--tokens", type=int, default=4, help="Distinct Notion integration tokens")
+    parser.add_argument("--backend", choices=["http", "mcp"], default="http")
+    parser.add_argument("--formatter", choices=["markdown", "llm"], default="markdown")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake LLM delay per call (seconds)")
+    parser.add_argument("--serper-latency", type=float, default=0.1)
+    parser.add_argument("--notion-latency", type=float, default=0.05)
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the LLM response cache enabled")
+    args = parser.parse_args()
+
+    with StubNotionServer(page_count=50, latency=args.notion_latency) as notion, \
+            StubSerperServer(latency=args.serper_latency) as serper, \
+            tempfile.TemporaryDirectory() as data_dir:
+        configure_environment(args, notion.url, serper.url, data_dir)
+
+        from notion_agent.agent import note_creation_workflow
+        from tracing import ring_buffer
+
+        fake_llm = build_fake_llm(args.llm_latency)
+        for agent in note_creation_workflow.sub_agents:
+            if hasattr(agent, "model"):
+                agent.model = fake_llm
+        formatter_calls = install_fake_formatter_chain(args.llm_latency) if args.formatter == "llm" else Counter()
+
+        def reset_counters():
+            ring_buffer.clear()
+            formatter_calls.clear()
+            notion.append_requests = 0
+
+        run = asyncio.run(run_jobs(args, notion.pages[0]["id"], reset_counters))
+        results = run["results"]
+
+        stage_durations: Dict[str, List[float]] = {}
+        for result in results:
+            for stage, timing in result.get("stage_timeline", {}).items():
+                if "duration" in timing:
+                    stage_durations.setdefault(stage, []).append(timing["duration"])
+
+        llm_spans = [s for s in ring_buffer.spans() if s["name"] == "llm.call"]
+        llm_calls = Counter(s["attributes"].get("agent", "?") for s in llm_spans)
+        llm_calls.update(formatter_calls)
+
+        spans = ring_buffer.spans()
+        writes = [s for s in spans if s["name"] == "notion.write"]
+        skipped_writes = [s for s in spans if s["name"] == "notion.write_skipped"]
+        write_requests = sum(s["attributes"].get("requests", 0) for s in writes)
+
+        report = {
+            "config": vars(args),
+            "succeeded": sum(1 for r in results if r.get("success") and r.get("notion_write_success")),
+            "errors": sorted({r["error"] for r in results if r.get("error")}),
+            "wall_time_s": round(run["wall_time"], 3),
+            "throughput_jobs_per_s": round(len(results) / run["wall_time"], 3) if run["wall_time"] else None,
+            "warmup_latency_ms": [round(r["latency"] * 1000, 2) for r in run["warmup"]],
+            "job_latency": summarize([r["latency"] for r in results]),
+            "stages": {stage: summarize(durations) for stage, durations in sorted(stage_durations.items())},
+            "critical_path": results[0].get("critical_path", []) if results else [],
+            "llm_calls": dict(llm_calls),
+            "llm_calls_total": sum(llm_calls.values()),
+            "llm_tokens_total": sum(s["attributes"].get("total_tokens", 0) for s in llm_spans),
+            "notion_writes": len(writes),
+            "notion_writes_skipped": len(skipped_writes),
+            "notion_append_requests": write_requests,
+            "notion_http_requests": notion.request_count,
+            "serper_requests": serper.request_count,
+        }
+
+    print(json.dumps(report, indent=2))
+    check_writes(report, args, notion.append_requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Notion Backend Latency Comparison
+
+Times page search and block appends through the HTTP and MCP Notion backends.
+
+By default the HTTP backend runs against a local stub Notion server. With
+``--live`` both backends run against the real Notion API using NOTION_TOKEN
+and NOTION_PAGE_ID (the MCP backend needs the real API, since the Notion MCP
+server cannot be pointed at the stub).
+
+Against the stub, the run also checks the backend's behaviour and fails if
+any check does not hold:
+
+- the page directory follows ``next_cursor`` through every result page,
+  with one search request per page
+- a directory within its TTL is served from the cache, and an expired one
+  is refreshed incrementally rather than reloaded
+- a 4xx error surfaces as NotionAPIError with its status, code and message,
+  without retries
+- a 429 is retried, no sooner than its ``Retry-After``
+
+Usage:
+    python -m benchmarks.notion_backend_latency --iterations 20
+    python -m benchmarks.notion_backend_latency --live --iterations 10
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.stub_notion_server import StubNotionServer
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Mean/median/p95 of a list of durations in milliseconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+    }
+
+
+async def time_backend(backend_name: str, notion_token: str, page_id: str, iterations: int) -> Dict[str, Dict]:
+    """Time a cold call followed by warm search and append calls."""
+    from notion_agent.notion_backend import get_notion_backend
+
+    backend = get_notion_backend(backend_name)
+    block = {"object": "block", "type": "paragraph",
+             "paragraph": {"rich_text": [{"type": "text", "text": {"content": "latency probe"}}]}}
+
+    start = time.perf_counter()
+    await backend.search(notion_token, query="")
+    cold = time.perf_counter() - start
+
+    search_samples, append_samples = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await backend.search(notion_token, query="")
+        search_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await backend.append_block_children(notion_token, page_id, [block])
+        append_samples.append(time.perf_counter() - start)
+
+    return {
+        "cold_first_call_ms": round(cold * 1000, 2),
+        "search": summarize(search_samples),
+        "append": summarize(append_samples),
+    }
+
+
+async def check_stub_behavior(server: StubNotionServer) -> List[str]:
+    """Problems found checking the HTTP backend against the stub (empty when all checks hold)."""
+    from notion_agent.notion_backend import get_notion_backend
+    from notion_agent.notion_errors import NotionAPIError
+    from notion_agent.page_directory import PageDirectoryService
+
+    backend = get_notion_backend("http")
+    problems = []
+
+    # Pagination: every page, one request per result page
+    ttl = 0.5
+    service = PageDirectoryService(ttl=ttl, full_refresh=3600)
+    before = server.request_count
+    directory = await service.get_directory("check-token")
+    load_requests = server.request_count - before
+    expected_requests = math.ceil(len(server.pages) / server.max_page_size)
+    if len(directory.pages()) != len(server.pages):
+        problems.append(f"directory has {len(directory.pages())} of {len(server.pages)} pages")
+    if load_requests != expected_requests:
+        problems.append(f"full load took {load_requests} search requests, expected {expected_requests}")
+
+    # TTL cache: a hit makes no request, an expired entry is refreshed incrementally
+    before = server.request_count
+    await service.get_directory("check-token")
+    if server.request_count != before:
+        problems.append("directory within its TTL was fetched again")
+    await asyncio.sleep(ttl * 1.5)
+    before = server.request_count
+    await service.get_directory("check-token")
+    refresh_requests = server.request_count - before
+    if not 0 < refresh_requests < load_requests:
+        problems.append(f"expired directory took {refresh_requests} requests to refresh "
+                        f"(full load: {load_requests})")
+
+    # A 4xx surfaces as NotionAPIError, not retried
+    server.unauthorized_tokens.add("revoked-token")
+    before = server.request_count
+    try:
+        await backend.search("revoked-token", query="")
+        problems.append("401 response did not raise")
+    except NotionAPIError as e:
+        if (e.status, e.code, str(e)) != (401, "unauthorized", "API token is invalid."):
+            problems.append(f"401 surfaced as status={e.status} code={e.code} message={e}")
+    if server.request_count - before != 1:
+        problems.append(f"401 was sent {server.request_count - before} times")
+
+    # A 429 is retried after Retry-After (1 s on the stub)
+    server.rate_limit_every = 2
+    with server._lock:
+        # Make the next request an even one, so it is rate limited
+        if server.request_count % 2 == 0:
+            server.request_count += 1
+    start = time.perf_counter()
+    try:
+        await backend.search("retry-token", query="")
+        if time.perf_counter() - start < 1.0:
+            problems.append("429 was retried before Retry-After elapsed")
+    except NotionAPIError as e:
+        problems.append(f"429 was not retried: {e}")
+    finally:
+        server.rate_limit_every = 0
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub server delay per request (seconds)")
+    parser.add_argument("--live", action="store_true", help="Use the real Notion API for both backends")
+    args = parser.parse_args()
+
+    if args.live:
+        notion_token = os.environ["NOTION_TOKEN"]
+        page_id = os.environ["NOTION_PAGE_ID"]
+
+        async def run_live():
+            return {name: await time_backend(name, notion_token, page_id, args.iterations)
+                    for name in ("http", "mcp")}
+
+        results = asyncio.run(run_live())
+    else:
+        with StubNotionServer(page_count=250, latency=args.latency) as server:
+            # Point the HTTP backend at the stub before the config module is loaded
+            os.environ["NOTION_API_BASE_URL"] = server.url
+            os.environ["NOTION_BACKEND"] = "http"
+            page_id = server.pages[0]["id"]
+            results = {"http": asyncio.run(time_backend("http", "stub-token", page_id, args.iterations))}
+            problems = asyncio.run(check_stub_behavior(server))
+        print("MCP backend skipped: it needs the live Notion API (run with --live)")
+
+    for name, timings in results.items():
+        print(f"\n[{name}] cold first call: {timings['cold_first_call_ms']} ms")
+        for operation in ("search", "append"):
+            print(f"[{name}] {operation}: {timings[operation]}")
+
+    if not args.live:
+        if problems:
+            sys.exit("Stub checks failed: " + "; ".join(problems))
+        print("\nStub checks passed: pagination, TTL cache, 4xx errors, 429 retries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Stub Notion MCP Server
+
+A stdio MCP server exposing the two Notion MCP tools the app uses
+(``API-post-search`` and ``API-patch-block-children``), backed by in-memory
+pages, so the MCP backend and session pool can be exercised offline.
+
+Point the app at it instead of ``npx @notionhq/notion-mcp-server``:
+    NOTION_MCP_COMMAND="python benchmarks/stub_notion_mcp_server.py --latency 0.05"
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp.server.fastmcp import FastMCP  # noqa: E402
+
+from benchmarks.stub_notion_server import make_page  # noqa: E402
+
+
+def build_server(page_count: int, latency: float) -> FastMCP:
+    """Create the stub server with ``page_count`` pages and a per-call delay."""
+    server = FastMCP("stub-notion")
+    pages = [make_page(i) for i in range(page_count)]
+
+    @server.tool(name="API-post-search")
+    def post_search(query: str = "", start_cursor: Optional[str] = None, page_size: Optional[int] = None,
+                    sort: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Search pages by title."""
+        if latency:
+            time.sleep(latency)
+        matches = [p for p in pages if query.lower() in p["properties"]["title"]["title"][0]["plain_text"].lower()]
+        start = int(start_cursor or 0)
+        results = matches[start:start + min(page_size or 100, 100)]
+        next_start = start + len(results)
+        has_more = next_start < len(matches)
+        return {"object": "list", "results": results, "has_more": has_more,
+                "next_cursor": str(next_start) if has_more else None}
+
+    @server.tool(name="API-patch-block-children")
+    def patch_block_children(block_id: str, children: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Append children to a block."""
+        if latency:
+            time.sleep(latency)
+        return {"object": "list", "results": children, "has_more": False, "next_cursor": None}
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay per tool call (seconds)")
+    args = parser.parse_args()
+    build_server(args.pages, args.latency).run("stdio")
+
+
+if __name__ == "__main__":
+    main()
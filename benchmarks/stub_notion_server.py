@@ -0,0 +1,148 @@
+"""
+Stub Notion API Server
+
+A small in-process HTTP server implementing the Notion endpoints the app uses
+(``POST /v1/search`` and ``PATCH /v1/blocks/{id}/children``) so the HTTP
+backend can be exercised and timed without a live workspace.
+
+Usage:
+    with StubNotionServer(page_count=250, latency=0.05) as server:
+        os.environ["NOTION_API_BASE_URL"] = server.url
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List
+
+
+def make_page(index: int) -> Dict[str, Any]:
+    """Build a minimal Notion page object."""
+    return {
+        "object": "page",
+        "id": str(uuid.UUID(int=index + 1)),
+        "last_edited_time": f"2025-01-01T00:{index // 60 % 60:02d}:{index % 60:02d}.000Z",
+        "properties": {
+            "title": {
+                "type": "title",
+                "title": [{"plain_text": f"Page {index}"}]
+            }
+        }
+    }
+
+
+class StubNotionServer:
+    """
+    Threaded stub of the Notion REST API.
+
+    Args:
+        page_count: Number of pages returned by search
+        latency: Seconds of artificial delay added to every request
+        max_page_size: Largest page of search results returned per request
+        rate_limit_every: Answer every Nth request with HTTP 429 (0 disables)
+        unauthorized_tokens: Integration tokens answered with HTTP 401
+    """
+
+    def __init__(self, page_count: int = 10, latency: float = 0.0, max_page_size: int = 100,
+                 rate_limit_every: int = 0, unauthorized_tokens: Iterable[str] = ()):
+        self.pages: List[Dict[str, Any]] = [make_page(i) for i in range(page_count)]
+        self.latency = latency
+        self.max_page_size = max_page_size
+        self.rate_limit_every = rate_limit_every
+        self.unauthorized_tokens = set(unauthorized_tokens)
+        self.appended: Dict[str, List[Dict[str, Any]]] = {}
+        self.request_count = 0
+        self.append_requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "StubNotionServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        start = int(body.get("start_cursor") or 0)
+        page_size = min(int(body.get("page_size") or 100), self.max_page_size)
+        results = self.pages[start:start + page_size]
+        next_start = start + len(results)
+        has_more = next_start < len(self.pages)
+        return {
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": str(next_start) if has_more else None
+        }
+
+    def append_children(self, block_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        children = body.get("children", [])
+        with self._lock:
+            self.appended.setdefault(block_id, []).extend(children)
+            self.append_requests += 1
+        return {"object": "list", "results": children, "has_more": False, "next_cursor": None}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _handle(self, method: str):
+                with stub._lock:
+                    stub.request_count += 1
+                    request_number = stub.request_count
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                body = self._body()
+                token = (self.headers.get("Authorization") or "").replace("Bearer ", "", 1)
+                if token in stub.unauthorized_tokens:
+                    return self._reply(401, {"object": "error", "status": 401, "code": "unauthorized",
+                                             "message": "API token is invalid."})
+                if stub.rate_limit_every and request_number % stub.rate_limit_every == 0:
+                    return self._reply(429, {"object": "error", "status": 429, "code": "rate_limited",
+                                             "message": "Rate limited by stub"}, {"Retry-After": "1"})
+                path = self.path.rstrip("/")
+                if method == "POST" and path == "/v1/search":
+                    return self._reply(200, stub.search(body))
+                if method == "PATCH" and path.startswith("/v1/blocks/") and path.endswith("/children"):
+                    block_id = path[len("/v1/blocks/"):-len("/children")]
+                    return self._reply(200, stub.append_children(block_id, body))
+                return self._reply(404, {"object": "error", "status": 404, "code": "object_not_found",
+                                         "message": f"No route for {method} {self.path}"})
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PATCH(self):
+                self._handle("PATCH")
+
+        return Handler
@@ -0,0 +1,110 @@
+"""
+Stub Serper Image Search Server
+
+A small in-process HTTP server answering ``POST /images`` like the Serper
+API, so image search can be exercised and timed without an API key or
+network access.
+
+Usage:
+    with StubSerperServer(latency=0.2) as server:
+        client = ImageSearchClient(url=server.url)
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class StubSerperServer:
+    """
+    Threaded stub of the Serper images endpoint.
+
+    Args:
+        latency: Seconds of artificial delay added to every request
+        hang_every: Never answer every Nth request within ``hang_seconds`` (0 disables)
+        hang_seconds: How long a "hung" request is held before answering
+        api_key: Only accept this X-API-KEY (any non-empty key when None)
+    """
+
+    def __init__(self, latency: float = 0.0, hang_every: int = 0, hang_seconds: float = 30.0,
+                 api_key: Optional[str] = None):
+        self.latency = latency
+        self.hang_every = hang_every
+        self.hang_seconds = hang_seconds
+        self.api_key = api_key
+        self.queries: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/images"
+
+    @property
+    def request_count(self) -> int:
+        return len(self.queries)
+
+    def __enter__(self) -> "StubSerperServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def images(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        query = str(body.get("q", ""))
+        slug = "-".join(query.lower().split()) or "image"
+        return {
+            "searchParameters": {"q": query, "type": "images"},
+            "images": [{"title": query, "imageUrl": f"https://images.example.com/{slug}.jpg"}]
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.queries.append(str(body.get("q", "")))
+                    request_number = len(stub.queries)
+
+                delay = stub.latency
+                if stub.hang_every and request_number % stub.hang_every == 0:
+                    delay = stub.hang_seconds
+                if delay:
+                    time.sleep(delay)
+
+                if self.path.rstrip("/") != "/images":
+                    status, payload = 404, {"message": f"No route for POST {self.path}"}
+                elif not self.headers.get("X-API-KEY"):
+                    status, payload = 403, {"message": "Missing API key"}
+                elif stub.api_key is not None and self.headers.get("X-API-KEY") != stub.api_key:
+                    status, payload = 403, {"message": "Invalid API key"}
+                else:
+                    status, payload = 200, stub.images(body)
+
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError:
+                    # The client gave up (timed out) before the reply
+                    pass
+
+        return Handler
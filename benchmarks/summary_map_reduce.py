@@ -0,0 +1,156 @@
+"""
+Summary Map-Reduce Benchmark
+
+Runs the SummaryAgent (MapReduceSummaryAgent) against a stub LLM for chat
+histories of increasing length, so the map-reduce path beyond
+``SUMMARY_SEGMENT_TOKENS`` is both timed and checked:
+
+- a history that fits one segment takes a single summary call
+- a longer history gets one map call per segment from ``split_history``,
+  every segment within the token budget and every message in exactly one
+  segment
+- the reduce input holds every partial summary, in conversation order
+  (``--partial-chars`` makes partials long enough to need several rounds)
+- no more than ``--concurrency`` LLM calls run at once
+
+The run fails if any check does not hold. The report covers latency and
+call counts per history length.
+
+Usage:
+    python -m benchmarks.summary_map_reduce --messages 10,200,1000
+    python -m benchmarks.summary_map_reduce --segment-tokens 2000 --partial-chars 3000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.note_workflow import make_chat_history
+
+
+def build_stub_llm(latency: float, partial_chars: int):
+    """Stub ADK model that answers map prompts with numbered partials and records every call."""
+    from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+    from google.genai import types
+
+    class StubSummaryLlm(BaseLlm):
+        model: str = "stub-summary"
+        latency: float = 0.0
+        partial_chars: int = 0
+        calls: List[str] = []
+        running: int = 0
+        peak: int = 0
+
+        @classmethod
+        def supported_models(cls) -> List[str]:
+            return [r"stub-summary"]
+
+        async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False):
+            prompt = "".join(part.text or "" for c in llm_request.contents for part in c.parts or [])
+            self.calls.append(prompt)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                await asyncio.sleep(self.latency)
+            finally:
+                self.running -= 1
+
+            part = re.match(r"You are summarizing part (\d+) of (\d+)", prompt)
+            if part:
+                text = f"<partial {part.group(1)}>" + "x" * self.partial_chars
+            else:
+                text = f"<summary of {len(prompt)} chars>"
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+    return StubSummaryLlm(latency=latency, partial_chars=partial_chars)
+
+
+def check_run(history: str, llm, summary: str, segment_tokens: int, concurrency: int) -> List[str]:
+    """Problems with one summarize run (empty when the map-reduce path behaved)."""
+    from notion_agent.agents.summary_agent import CHARS_PER_TOKEN, split_history
+
+    problems = []
+    segments = split_history(history, segment_tokens)
+    map_calls = [c for c in llm.calls if c.startswith("You are summarizing part")]
+    reduce_calls = [c for c in llm.calls if "**Partial Summaries:**" in c]
+
+    if len(segments) <= 1:
+        if len(llm.calls) != 1 or map_calls or reduce_calls:
+            problems.append(f"single-segment history took {len(llm.calls)} calls")
+        return problems
+
+    if len(map_calls) != len(segments):
+        problems.append(f"{len(map_calls)} map calls for {len(segments)} segments")
+    if any(len(segment) > segment_tokens * CHARS_PER_TOKEN for segment in segments):
+        problems.append("a segment exceeds the token budget")
+    messages = history.count("\n") + 1
+    if sum(segment.count("\n") + 1 for segment in segments) != messages:
+        problems.append("messages lost or repeated across segments")
+
+    # Every partial reaches the first reduce round, in order
+    markers = [f"<partial {i + 1}>" for i in range(len(segments))]
+    first_round = "".join(c for c in reduce_calls if "<partial " in c)
+    positions = [first_round.find(marker) for marker in markers]
+    if -1 in positions or positions != sorted(positions):
+        problems.append("reduce input is missing partials or has them out of order")
+    if not reduce_calls or summary != f"<summary of {len(llm.calls[-1])} chars>" or llm.calls[-1] not in reduce_calls:
+        problems.append("the summary is not the final reduce output")
+    if llm.peak > concurrency:
+        problems.append(f"{llm.peak} concurrent calls with a limit of {concurrency}")
+    return problems
+
+
+async def run(args) -> Dict[str, Any]:
+    from notion_agent.agents.summary_agent import MapReduceSummaryAgent, split_history
+
+    results, problems = [], []
+    for messages in args.messages:
+        history = make_chat_history(messages, args.message_chars)
+        llm = build_stub_llm(args.llm_latency, args.partial_chars)
+        agent = MapReduceSummaryAgent(name="SummaryAgent", model=llm, segment_tokens=args.segment_tokens,
+                                      max_concurrency=args.concurrency)
+
+        start = time.perf_counter()
+        summary = await agent.summarize(history)
+        elapsed = time.perf_counter() - start
+
+        run_problems = check_run(history, llm, summary, args.segment_tokens, args.concurrency)
+        problems.extend(f"{messages} messages: {problem}" for problem in run_problems)
+        results.append({
+            "messages": messages,
+            "history_tokens": len(history) // 4,
+            "segments": len(split_history(history, args.segment_tokens)),
+            "llm_calls": len(llm.calls),
+            "reduce_calls": sum(1 for c in llm.calls if "**Partial Summaries:**" in c),
+            "peak_concurrency": llm.peak,
+            "latency_ms": round(elapsed * 1000, 2),
+        })
+    return {"config": vars(args), "runs": results, "problems": problems}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=lambda v: [int(x) for x in v.split(",")], default=[10, 200, 1000],
+                        help="Comma-separated history lengths (messages)")
+    parser.add_argument("--message-chars", type=int, default=300)
+    parser.add_argument("--segment-tokens", type=int, default=6000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--partial-chars", type=int, default=200, help="Length of each stub partial summary")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub LLM delay per call (seconds)")
+    args = parser.parse_args()
+
+    # Every call must reach the stub, not the response cache
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if report["problems"]:
+        sys.exit("Map-reduce check failed: " + "; ".join(report["problems"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,131 +1,121 @@
 import streamlit as st 
 import os
-import tempfile
-import asyncio
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain_core.runnables import RunnableParallel, RunnableLambda, RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_groq import ChatGroq
+import uuid
 from dotenv import load_dotenv
 
 # Project imports
-from rag_component.prompt import call_prompt
-from notion_agent.agent import create_note_from_history
-from notion_agent.tools.notion_page_info_retriever import get_notion_pages
+from rag_component.chat_service import (
+    CONTEXT_MESSAGES,
+    answer,
+    ingest_pdf,
+    load_vector_store,
+    submit_note_job,
+)
+from rag_component.chat_store import chat_history_store
+# The Notion workflow (google-adk, MCP adapters) is imported on first use
+from notion_mcp_config import notion_config_error
+from tracing import ring_buffer
 
 load_dotenv()
 os.environ["OTEL_SDK_DISABLED"] = "true"
 
-DB_CHROMA_PATH = "vector_store/chroma_index"
+# Show per-turn span breakdowns in the sidebar
+TRACING_DEBUG_PANEL = os.environ.get("TRACING_DEBUG_PANEL", "false").lower() in ("1", "true", "yes")
 
-@st.cache_resource
-def load_vector_store():
-    embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2", model_kwargs={"local_files_only": False})
-    vector_store = Chroma(persist_directory="vector_store/chroma_index", embedding_function=embedding_model)
-    return vector_store
+# Messages rendered per rerun; older ones are loaded on demand
+CHAT_WINDOW_MESSAGES = int(os.environ.get("CHAT_WINDOW_MESSAGES", "30"))
 
 
-def format_docs(retrieved_docs):
-    context_text = "\n\n".join(doc.page_content for doc in retrieved_docs)
-    return context_text
-
-def format_chat_history(messages, max_messages=6):
-    """Format recent messages from Streamlit's session state into conversation history string."""
-    recent = messages[-max_messages*2:] if messages else []
-    formatted = []
-    for msg in recent:
-        formatted.append(f"[{msg['role']}] {msg['content']}")
-    return "\n".join(formatted)
-
-def get_full_chat_history(messages):
-    """Get the complete chat history as a formatted string."""
-    if not messages:
-        return ""
-    
-    formatted = []
-    for msg in messages:
-        if msg['role'] != 'system':
-            formatted.append(f"[{msg['role']}] {msg['content']}")
-    return "\n".join(formatted)
-
-
-def get_notion_pages_sync(notion_token: str = None):
+def get_notion_pages_sync(notion_token: str = None, refresh: bool = False):
     """Get list of Notion pages synchronously for Streamlit."""
     try:
         if not notion_token:
             return []
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        pages = loop.run_until_complete(get_notion_pages(notion_token))
-        loop.close()
-        return pages
+        from notion_agent.event_loop import run_sync
+        from notion_agent.tools.notion_page_info_retriever import get_notion_pages
+        return run_sync(get_notion_pages(notion_token, refresh=refresh))
     except Exception as e:
         return []
 
 
-def write_note_to_notion(messages, page_id: str = None, notion_token: str = None):
-    """Create note from chat history and write directly to Notion."""
-    chat_history = get_full_chat_history(messages)
-    if not chat_history:
-        return "❌ No chat history available to create a note."
-    
-    if not notion_token:
-        return "❌ Please enter your Notion Integration Token first."
+def format_note_result(result):
+    """Turn a note creation result into a chat-ready message."""
+    if not result["success"]:
+        return f"❌ Error: {result['error']}"
     
-    try:
-        result = create_note_from_history(chat_history, notion_page_id=page_id, notion_token=notion_token)
-        
-        if not result["success"]:
-            return f"❌ Error: {result['error']}"
-        
-        if result["notion_write_success"]:
-            page_id_clean = result['notion_page_id'].replace('-', '')
-            notion_url = f"https://notion.so/{page_id_clean}"
-            return f"✅ Note added to **{result['notion_page_title']}**!\n\n🔗 [Open in Notion]({notion_url})"
-        else:
-            return f"❌ Notion write failed: {result.get('error', 'Unknown error')}"
-            
-    except Exception as e:
-        return f"❌ Error: {str(e)}"
+    if result["notion_write_success"]:
+        page_id_clean = result['notion_page_id'].replace('-', '')
+        notion_url = f"https://notion.so/{page_id_clean}"
+        return f"✅ Note added to **{result['notion_page_title']}**!\n\n🔗 [Open in Notion]({notion_url})"
+    else:
+        return f"❌ Notion write failed: {result.get('error') or 'Unknown error'}"
+
+
+STAGE_ICONS = {
+    "pending": "⏳",
+    "running": "🔄",
+    "done": "✅",
+    "skipped": "⏭️",
+    "failed": "❌",
+}
 
-def process_pdf_file(pdf_file):
-    """Process a single PDF file and return its documents."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-        temp_file.write(pdf_file.getvalue())
-        temp_path = temp_file.name
+
+@st.fragment(run_every=2)
+def note_job_status():
+    """Poll the current note job and show its stage-by-stage progress."""
+    job_id = st.session_state.get("note_job_id")
+    if not job_id:
+        return
+    
+    from notion_agent.jobs import note_job_manager
+    job = note_job_manager.get(job_id)
+    if job is None:
+        st.session_state.note_job_id = None
+        return
     
-    loader = PyPDFLoader(temp_path)
-    documents = loader.load()
-    os.unlink(temp_path)
+    for stage, status in job["stages"].items():
+        st.caption(f"{STAGE_ICONS.get(status, '•')} {stage}: {status}")
     
-    return documents
+    if job["status"] in ("queued", "running"):
+        st.info(f"📝 Note job {job['status']}...")
+    elif job["status"] == "succeeded":
+        st.markdown(format_note_result(job["result"]))
+    else:
+        st.markdown(f"❌ Error: {job['error']}")
+        if st.button("🔁 Retry", key=f"retry_{job_id}"):
+            note_job_manager.retry(job_id)
 
-def split_documents(documents):
-    """Split documents into chunks for processing."""
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50
-    )
-    split_docs = text_splitter.split_documents(documents)
-    return split_docs
 
-def update_vector_store(documents, vector_store):
-    """Add new documents to the existing vector store."""
-    split_docs = split_documents(documents)
-    vector_store.add_documents(split_docs)
-    vector_store.persist()
-    return len(split_docs)
+def render_trace_panel(limit: int = 10):
+    """Sidebar breakdown of the most recent chat turns, PDF uploads and note jobs."""
+    with st.expander("🛠 Debug: traces"):
+        for trace in ring_buffer.traces(limit):
+            st.markdown(f"**{trace['name']}** · {trace['duration_ms'] or 0:.0f} ms")
+            depth = {}
+            rows = []
+            for s in trace["spans"]:
+                depth[s["span_id"]] = depth.get(s["parent_id"], -1) + 1
+                rows.append({
+                    "span": "  " * depth[s["span_id"]] + s["name"],
+                    "ms": s["duration_ms"],
+                    "status": s["status"],
+                    "tokens": s["attributes"].get("total_tokens", ""),
+                })
+            st.dataframe(rows, hide_index=True, use_container_width=True)
 
 
 def main():
     st.title("NotionMate Capstone")
 
-    # session messages for UI
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    # Chat session kept in the chat store; its ID in the URL restores the
+    # conversation after a page reload or an app restart
+    if 'session_id' not in st.session_state:
+        session_id = st.query_params.get("session") or uuid.uuid4().hex
+        st.session_state.session_id = chat_history_store.create_session(session_id)
+        st.query_params["session"] = st.session_state.session_id
+    if 'history_window' not in st.session_state:
+        st.session_state.history_window = CHAT_WINDOW_MESSAGES
+    session_id = st.session_state.session_id
     
     # Initialize notion_token in session state
     if 'notion_token' not in st.session_state:
@@ -135,6 +125,10 @@ def main():
     if 'notion_pages' not in st.session_state:
         st.session_state.notion_pages = []
     
+    # The note job being tracked
+    if 'note_job_id' not in st.session_state:
+        st.session_state.note_job_id = None
+    
     # Use a unique key for the file uploader that can be reset
     file_uploader_key = "pdf_uploader"
     if 'file_uploader_key' in st.session_state:
@@ -167,63 +161,81 @@ def main():
         )
         # Notion Integration Section
         st.header("🔗 Notion Integration")
-        notion_token_input = st.text_input(
-            "Notion Integration Token",
-            type="password",
-            value=st.session_state.notion_token,
-            help="Enter your Notion integration token. Get it from https://www.notion.so/my-integrations",
-            placeholder="secret_..."
-        )
+        notion_error = notion_config_error()
+        if notion_error:
+            # Only the Notion feature is disabled; chat and PDF upload keep working
+            st.warning(f"⚠️ Notion integration unavailable: {notion_error}")
+        else:
+            notion_token_input = st.text_input(
+                "Notion Integration Token",
+                type="password",
+                value=st.session_state.notion_token,
+                help="Enter your Notion integration token. Get it from https://www.notion.so/my-integrations",
+                placeholder="secret_..."
+            )
         
-        # Update token and fetch pages when token changes
-        if notion_token_input != st.session_state.notion_token:
-            st.session_state.notion_token = notion_token_input
-            if notion_token_input:
-                with st.spinner("Fetching Notion pages..."):
-                    st.session_state.notion_pages = get_notion_pages_sync(notion_token_input)
-                if st.session_state.notion_pages:
-                    st.success(f"✅ Connected! Found {len(st.session_state.notion_pages)} pages")
+            # Update token and fetch pages when token changes
+            if notion_token_input != st.session_state.notion_token:
+                st.session_state.notion_token = notion_token_input
+                if notion_token_input:
+                    with st.spinner("Fetching Notion pages..."):
+                        st.session_state.notion_pages = get_notion_pages_sync(notion_token_input)
+                    if st.session_state.notion_pages:
+                        st.success(f"✅ Connected! Found {len(st.session_state.notion_pages)} pages")
+                    else:
+                        st.warning("⚠️ No pages found. Check your token and page permissions.")
                 else:
-                    st.warning("⚠️ No pages found. Check your token and page permissions.")
-            else:
-                st.session_state.notion_pages = []
+                    st.session_state.notion_pages = []
         
-        # Show connection status
-        if st.session_state.notion_token and st.session_state.notion_pages:
-            st.info(f"📄 {len(st.session_state.notion_pages)} Notion pages available")
+            # Show connection status
+            if st.session_state.notion_token and st.session_state.notion_pages:
+                st.info(f"📄 {len(st.session_state.notion_pages)} Notion pages available")
         
         
-        st.markdown("---")
-        st.markdown("### Write to Notion")
+            st.markdown("---")
+            st.markdown("### Write to Notion")
         
-        # Show dropdown if pages are available
-        if 'notion_pages' in st.session_state and st.session_state.notion_pages:
-            page_titles = [p['title'] for p in st.session_state.notion_pages]
-            selected_page = st.selectbox(
-                "Select Notion Page",
-                options=page_titles,
-                help="Choose which page to add the note to"
-            )
+            # Show dropdown if pages are available
+            if 'notion_pages' in st.session_state and st.session_state.notion_pages:
+                pages_by_id = {p['id']: p for p in st.session_state.notion_pages}
+                title_counts = {}
+                for page in st.session_state.notion_pages:
+                    title_counts[page['title']] = title_counts.get(page['title'], 0) + 1
             
-            # Get the selected page ID
-            selected_page_id = next(
-                (p['id'] for p in st.session_state.notion_pages if p['title'] == selected_page),
-                None
-            )
+                def page_label(page_id):
+                    # Disambiguate pages that share a title with a short ID suffix
+                    title = pages_by_id[page_id]['title']
+                    if title_counts[title] > 1:
+                        return f"{title} ({page_id[:8]})"
+                    return title
+            
+                selected_page_id = st.selectbox(
+                    "Select Notion Page",
+                    options=list(pages_by_id),
+                    format_func=page_label,
+                    help="Choose which page to add the note to"
+                )
+                selected_page = page_label(selected_page_id)
+            
+                if st.button("🔄 Refresh pages"):
+                    st.session_state.notion_pages = get_notion_pages_sync(st.session_state.notion_token, refresh=True)
+                    st.rerun()
 
-            if st.button("Write to Notion", type="primary"):
-                if not st.session_state.notion_token:
-                    st.error("❌ Please enter your Notion Integration Token first.")
-                else:
-                    with st.spinner(f"📝 Creating summary and writing to '{selected_page}'..."):
-                        notion_response = write_note_to_notion(
-                            st.session_state.messages, 
-                            selected_page_id,
-                            st.session_state.notion_token
-                        )
-                        st.markdown(notion_response)
-        else:
-            st.info("💡 Enter your Notion Integration Token above to connect your Notion pages.")
+                if st.button("Write to Notion", type="primary"):
+                    job_id, error = submit_note_job(
+                        session_id,
+                        selected_page_id,
+                        st.session_state.notion_token
+                    )
+                    if error:
+                        st.error(error)
+                    else:
+                        st.session_state.note_job_id = job_id
+                        st.toast(f"📝 Creating summary and writing to '{selected_page}'...")
+            
+                note_job_status()
+            else:
+                st.info("💡 Enter your Notion Integration Token above to connect your Notion pages.")
         
     # Set up placeholder for status messages
     status_container = st.container()
@@ -233,14 +245,8 @@ def main():
         with status_container:
             with st.spinner("Processing PDF file..."):
                 try:
-                    # Load vector store
-                    vector_store = load_vector_store()
-                    
-                    # Process the uploaded file
-                    documents = process_pdf_file(uploaded_file)
-                    
-                    # Update the vector store
-                    chunks_added = update_vector_store(documents, vector_store)
+                    # Parse, split and embed the file into the vector store
+                    chunks_added = ingest_pdf(uploaded_file.getvalue(), uploaded_file.name)
                     
                     # Success message
                     st.success(f"Successfully processed PDF: {uploaded_file.name}. Added {chunks_added} chunks to the knowledge base.")
@@ -250,7 +256,7 @@ def main():
                     
                     # Add a system message
                     system_msg = f"PDF '{uploaded_file.name}' has been added to the knowledge base. You can now ask questions about it."
-                    st.session_state.messages.append({"role": "system", "content": system_msg})
+                    chat_history_store.append(session_id, "system", system_msg)
                 
                 except Exception as e:
                     st.error(f"Error processing PDF: {str(e)}")
@@ -261,56 +267,44 @@ def main():
     # Display chat messages in a scrollable container
     with messages_container:
         st.markdown('<div class="chat-message-container">', unsafe_allow_html=True)
-        for message in st.session_state.messages:
+        # Only the most recent messages are rendered on each rerun
+        message_count = chat_history_store.count(session_id)
+        if message_count > st.session_state.history_window:
+            if st.button(f"⬆️ Load older messages ({message_count - st.session_state.history_window} hidden)"):
+                st.session_state.history_window += CHAT_WINDOW_MESSAGES
+                st.rerun()
+        for message in chat_history_store.messages(session_id, limit=st.session_state.history_window):
             st.chat_message(message['role']).markdown(message['content'])
         st.markdown('</div>', unsafe_allow_html=True)
         
     # Chat input at the bottom
     input = st.chat_input("Ask a question about ...")
-    try:
-        vector_store = load_vector_store()
-        if vector_store is None:
-            st.error("Vector store not found. Please ensure it is loaded correctly.")
-            return
-    except Exception as e:
-        st.error(f"Error loading vector store: {e}")
-        return 
     if input:
-        st.session_state.messages.append({"role": "user", "content": input})
+        # The embedding model and vector store load on the first question, not at startup
+        try:
+            vector_store = load_vector_store()
+            if vector_store is None:
+                st.error("Vector store not found. Please ensure it is loaded correctly.")
+                return
+        except Exception as e:
+            st.error(f"Error loading vector store: {e}")
+            return 
+        chat_history_store.append(session_id, "user", input)
         st.chat_message("user").markdown(input)
         # persist user message
 
+        response = answer(input, chat_history_store.messages(session_id, limit=CONTEXT_MESSAGES))
 
-        # llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
-        llm = ChatGroq(model="openai/gpt-oss-120b")
-
-        retriever=vector_store.as_retriever(search_type="similarity", search_kwargs={"k": 5})
-        
-        parser = StrOutputParser()
-
-        # Format conversation history from Streamlit messages
-        chat_history = format_chat_history(st.session_state.messages)
-        
-        parallel_chain = RunnableParallel({
-            # 'context': retriever | RunnableLambda(format_docs),
-            'context': RunnableLambda(lambda x: retriever.invoke(x["input"])) | RunnableLambda(format_docs),
-            'conversation_history': RunnableLambda(lambda _: chat_history),
-            'input': RunnablePassthrough()
-        })
-        prompt = call_prompt()
-        main_chain = parallel_chain | prompt | llm | parser
-
-        response = main_chain.invoke({'input': input})
-
-        
-        
-        
         # Here you would call your chatbot function to get the response
         # response = "This is a placeholder response from the chatbot."
         st.chat_message("assistant").markdown(response)
-        st.session_state.messages.append({"role": "assistant", "content": response})
+        chat_history_store.append(session_id, "assistant", response)
+    
+    if TRACING_DEBUG_PANEL:
+        with st.sidebar:
+            render_trace_panel()
 
         
         
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -6,11 +6,9 @@ notes from chat history and write them to Notion.
 """
 
 import os
-import asyncio
-import nest_asyncio
-from typing import Optional, Dict, Any
-from datetime import datetime
-from google.adk.agents import SequentialAgent
+import uuid
+from collections import deque
+from typing import Optional, Dict, Any, Callable
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.genai import types
@@ -22,51 +20,132 @@ from .agents.topic_agent import topic_agent
 from .agents.image_search_agent import image_search_agent
 from .agents.formatter_agent import formatter_agent
 from .agents.writer_agent import writer_agent
-
-# Apply nest_asyncio globally to allow nested event loops
-nest_asyncio.apply()
+from .agents.notion_target_agent import notion_target_agent
+from .agents.stage_graph_agent import StageGraphAgent
+from .event_loop import run_sync
 
 os.environ["OTEL_SDK_DISABLED"] = "true"
 load_dotenv()
 
 
 # ============================================================================
-# Sequential Workflow Definition
+# Workflow Graph Definition
 # ============================================================================
 
-note_creation_workflow = SequentialAgent(
+# Each stage starts as soon as the state keys it requires are available:
+# the page lookup runs alongside the summary, and the formatter starts as
+# soon as the image URL lands in state.
+note_creation_workflow = StageGraphAgent(
     name="NoteCreationWorkflow",
     sub_agents=[
+        notion_target_agent,
         summary_agent,
         topic_agent,
         image_search_agent,
         formatter_agent,
         writer_agent
     ],
-    description="Sequential workflow that creates a note from chat history and writes it to Notion"
+    requires={
+        "NotionTargetAgent": ["notion_page_id", "notion_token"],
+        "SummaryAgent": ["chat_history"],
+        "TopicAgent": ["summary"],
+        "ImageSearchAgent": ["topic"],
+        "NotionFormatterAgent": ["topic", "summary", "image_url"],
+        "NotionWriterAgent": ["notion_blocks", "notion_target_ready"]
+    },
+    provides={
+        "NotionTargetAgent": ["notion_target_ready", "notion_page_id", "notion_page_title"],
+        "SummaryAgent": ["summary"],
+        "TopicAgent": ["topic"],
+        "ImageSearchAgent": ["image_url"],
+        "NotionFormatterAgent": ["notion_blocks"],
+        "NotionWriterAgent": ["notion_write_success", "notion_page_title"]
+    },
+    description="Dependency-graph workflow that creates a note from chat history and writes it to Notion"
 )
 
 root_agent = note_creation_workflow
+
+
+# ============================================================================
+# Shared Runner and Sessions
+# ============================================================================
+
+APP_NAME = "notionmate_app"
+
+# Finished note sessions kept for inspection before they are deleted
+NOTE_SESSION_RETENTION = int(os.environ.get("NOTE_SESSION_RETENTION", "50"))
+
+# One session service and runner for the whole process; each note gets its
+# own uniquely named session, so concurrent jobs can share them safely
+session_service = InMemorySessionService()
+runner = Runner(
+    agent=root_agent,
+    app_name=APP_NAME,
+    session_service=session_service
+)
+
+_finished_sessions: deque = deque()
+
+
+async def _retire_session(user_id: str, session_id: str):
+    """Mark a note session finished and delete the oldest beyond the retention limit."""
+    _finished_sessions.append((user_id, session_id))
+    expired = []
+    while len(_finished_sessions) > NOTE_SESSION_RETENTION:
+        expired.append(_finished_sessions.popleft())
+    
+    for old_user_id, old_session_id in expired:
+        try:
+            await session_service.delete_session(
+                app_name=APP_NAME,
+                user_id=old_user_id,
+                session_id=old_session_id
+            )
+        except Exception:
+            pass
+
+
 # ============================================================================
 # Main Workflow Execution Functions
 # ============================================================================
 
+def _saved_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of the workflow state that can be kept for a retry (without the token)."""
+    return {key: value for key, value in state.items() if key != "notion_token"}
+
+
 async def create_note_from_history_async(
     chat_history: str, 
     notion_page_id: Optional[str] = None,
-    notion_token: Optional[str] = None
+    notion_token: Optional[str] = None,
+    user_id: str = "anonymous",
+    previous_summary: str = "",
+    resume_state: Optional[Dict[str, Any]] = None,
+    progress_callback: Optional[Callable[[Dict[str, str]], None]] = None
 ) -> Dict[str, Any]:
     """
-    Create a note from chat history and write to Notion using ADK Sequential Agents.
+    Create a note from chat history and write to Notion using the ADK workflow graph.
     
     Args:
         chat_history: Full chat history as a formatted string
         notion_page_id: Optional specific Notion page ID to write to
         notion_token: User's Notion integration token
+        user_id: ID of the user the note session belongs to
+        previous_summary: Note last written to the same page; chat_history
+            then holds only the messages added since
+        resume_state: Saved "state" from an earlier result; stages whose
+            outputs it already holds are skipped
+        progress_callback: Called with the stage -> status mapping whenever
+            a stage starts or finishes
         
     Returns:
-        dict: Result containing success status, summary, topic, image_url, and Notion info
+        dict: Result containing success status, summary, topic, image_url, Notion info,
+        and the final workflow "state"
     """
+    USER_ID = user_id
+    SESSION_ID = f"session_{uuid.uuid4().hex}"
+    session_created = False
     try:
         if not notion_token:
             return {
@@ -74,18 +153,14 @@ async def create_note_from_history_async(
                 "error": "Notion token is required"
             }
         
-        # Create session service
-        session_service = InMemorySessionService()
-        
-        # Constants for session
-        APP_NAME = "notionmate_app"
-        USER_ID = "user_1"
-        SESSION_ID = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        resume_state = resume_state or {}
         
         # Create session with initial state
         initial_state = {
+            **resume_state,
             "chat_history": chat_history,
-            "notion_page_id": notion_page_id or "",
+            "previous_summary": previous_summary or resume_state.get("previous_summary", ""),
+            "notion_page_id": notion_page_id or resume_state.get("notion_page_id", ""),
             "notion_token": notion_token
         }
         
@@ -95,13 +170,7 @@ async def create_note_from_history_async(
             session_id=SESSION_ID,
             state=initial_state
         )
-        
-        # Create runner
-        runner = Runner(
-            agent=root_agent,
-            app_name=APP_NAME,
-            session_service=session_service
-        )
+        session_created = True
         
         # Simple user message
         content = types.Content(
@@ -117,6 +186,11 @@ async def create_note_from_history_async(
             session_id=SESSION_ID,
             new_message=content
         ):
+            # Report stage progress published by the workflow graph
+            state_delta = event.actions.state_delta if event.actions else None
+            if progress_callback and state_delta and "stage_status" in state_delta:
+                progress_callback(state_delta["stage_status"])
+            
             # Store the final response but DON'T break!
             if event.is_final_response():
                 final_response = event
@@ -135,6 +209,9 @@ async def create_note_from_history_async(
         image_url = final_session.state.get('image_url', '')
         notion_write_success = final_session.state.get('notion_write_success', False)
         notion_page_title = final_session.state.get('notion_page_title', '')
+        resolved_page_id = final_session.state.get('notion_page_id', '') or notion_page_id or ""
+        stage_timeline = final_session.state.get('stage_timeline', {})
+        critical_path = final_session.state.get('critical_path', [])
         
         return {
             "success": True,
@@ -142,14 +219,30 @@ async def create_note_from_history_async(
             "topic": topic,
             "image_url": image_url,
             "notion_write_success": notion_write_success,
-            "notion_page_id": notion_page_id or "",
+            "notion_page_id": resolved_page_id,
             "notion_page_title": notion_page_title,
+            "stage_timeline": stage_timeline,
+            "critical_path": critical_path,
+            "state": _saved_state(final_session.state),
             "error": ""
         }
         
     except Exception as e:
         error_msg = str(e)
         
+        # Keep whatever the completed stages produced so a retry can resume
+        saved_state = {}
+        if session_created:
+            try:
+                failed_session = await session_service.get_session(
+                    app_name=APP_NAME,
+                    user_id=USER_ID,
+                    session_id=SESSION_ID
+                )
+                saved_state = _saved_state(failed_session.state) if failed_session else {}
+            except Exception:
+                pass
+        
         return {
             "success": False,
             "error": error_msg,
@@ -158,8 +251,13 @@ async def create_note_from_history_async(
             "image_url": "",
             "notion_write_success": False,
             "notion_page_id": "",
-            "notion_page_title": ""
+            "notion_page_title": "",
+            "state": saved_state
         }
+    
+    finally:
+        if session_created:
+            await _retire_session(USER_ID, SESSION_ID)
 
 
 def create_note_from_history(
@@ -170,6 +268,9 @@ def create_note_from_history(
     """
     Synchronous wrapper for create_note_from_history_async.
     
+    Runs the workflow on the shared background event loop, so pooled Notion
+    sessions and clients are reused across calls.
+    
     Args:
         chat_history: Full chat history as a formatted string
         notion_page_id: Optional specific Notion page ID to write to
@@ -179,7 +280,7 @@ def create_note_from_history(
         dict: Result containing success status and all relevant data
     """
     try:
-        result = asyncio.run(create_note_from_history_async(chat_history, notion_page_id, notion_token))
+        result = run_sync(create_note_from_history_async(chat_history, notion_page_id, notion_token))
         return result
     except Exception as e:
         return {
@@ -5,6 +5,8 @@ Formats the summary and image into Notion-compatible blocks.
 """
 
 from google.adk.agents import LlmAgent
+from tracing import trace_after_model, trace_before_model
+from ..llm_cache import llm_cache_after_model, llm_cache_before_model
 from ..tools.notion_formatter_tool import format_notion_blocks_tool
 
 
@@ -27,5 +29,7 @@ Call the format_notion_blocks_tool() function to create properly structured Noti
 
 Output a brief confirmation after the tool completes.""",
     tools=[format_notion_blocks_tool],
-    output_key="format_status"
+    output_key="format_status",
+    before_model_callback=[llm_cache_before_model, trace_before_model],
+    after_model_callback=[trace_after_model, llm_cache_after_model]
 )
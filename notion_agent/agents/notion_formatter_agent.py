@@ -1,20 +1,32 @@
 """
 Notion Formatter Agent
 
-Uses LLM to intelligently format content into Notion blocks.
-Takes topic, summary, and image URL and generates well-structured Notion blocks.
+Formats content into Notion blocks. Takes topic, summary, and image URL and
+generates well-structured Notion blocks, either by compiling the Markdown
+summary locally (default) or, as an opt-in mode, with an LLM.
 """
 
 import os
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
 from datetime import datetime
 from rag_component.prompt import get_notion_formatter_prompt
+from notion_agent.block_writer import text_rich_text
+from notion_agent.llm_cache import LangChainLLMCache
+from notion_agent.markdown_compiler import compile_markdown, parse_inline
 
 load_dotenv()
 
+# "markdown" compiles the summary locally; "llm" asks Groq to lay out the page
+FORMATTER_MODE = os.environ.get("NOTION_FORMATTER_MODE", "markdown").lower()
+
+# The LLM sees this instead of the real timestamp so identical inputs render
+# identical prompts (and hit the LLM response cache); it is filled in afterwards
+TIMESTAMP_PLACEHOLDER = "{{timestamp}}"
+
 
 # ============================================================================
 # Pydantic Models for Structured LLM Outputs
@@ -31,7 +43,8 @@ class NotionBlock(BaseModel):
                     "bulleted_list_item, numbered_list_item, quote, divider, bookmark"
     )
     content: str = Field(
-        description="Text content for the block (empty string for divider)"
+        description="Text content for the block (empty string for divider). "
+                    "May use inline Markdown: **bold**, *italic*, `code`, ~~strikethrough~~, [text](url)"
     )
 
 
@@ -49,27 +62,115 @@ class NotionFormatting(BaseModel):
     )
 
 
+# ============================================================================
+# Notion API Block Builders
+# ============================================================================
+
+def _divider_block(block_type: str, content: str) -> Optional[Dict[str, Any]]:
+    return {"object": "block", "type": "divider", "divider": {}}
+
+
+def _bookmark_block(block_type: str, content: str) -> Optional[Dict[str, Any]]:
+    if not content or not content.startswith("http"):
+        return None
+    return {"object": "block", "type": "bookmark", "bookmark": {"url": content}}
+
+
+def _rich_text_block(block_type: str, content: str) -> Optional[Dict[str, Any]]:
+    return {
+        "object": "block",
+        "type": block_type,
+        block_type: {"rich_text": parse_inline(content)}
+    }
+
+
+def _to_do_block(block_type: str, content: str) -> Optional[Dict[str, Any]]:
+    return {
+        "object": "block",
+        "type": "to_do",
+        "to_do": {"rich_text": parse_inline(content), "checked": block_type == "to_do_checked"}
+    }
+
+
+def _code_block(block_type: str, content: str) -> Optional[Dict[str, Any]]:
+    return {
+        "object": "block",
+        "type": "code",
+        "code": {"rich_text": text_rich_text(content), "language": "plain text"}
+    }
+
+
+# Block type -> builder for its Notion API dictionary
+BLOCK_BUILDERS = {
+    "divider": _divider_block,
+    "bookmark": _bookmark_block,
+    "heading_1": _rich_text_block,
+    "heading_2": _rich_text_block,
+    "heading_3": _rich_text_block,
+    "paragraph": _rich_text_block,
+    "bulleted_list_item": _rich_text_block,
+    "numbered_list_item": _rich_text_block,
+    "quote": _rich_text_block,
+    "to_do": _to_do_block,
+    "to_do_checked": _to_do_block,
+    "code": _code_block,
+}
+
+
 class NotionFormatterAgent:
     """
-    Agent that uses LLM to format content into well-structured Notion blocks.
+    Agent that formats content into well-structured Notion blocks.
+    
+    In "markdown" mode the summary is compiled locally with no model call;
+    in "llm" mode the layout is chosen by a Groq model, falling back to the
+    local compiler if that call fails.
     """
     
-    def __init__(self):
-        """Initialize the formatter with Groq LLM."""
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",  # Use Llama 3.3 70B for better formatting
-            temperature=0.3,  # Some creativity for formatting decisions
-            api_key=os.environ.get("GROQ_API_KEY")
-        )
-        
-        # Create structured output LLM
-        self.structured_llm = self.llm.with_structured_output(NotionFormatting)
+    def __init__(self, mode: Optional[str] = None):
+        """
+        Initialize the formatter.
         
-        # Get prompt from centralized prompts module
-        self.prompt = get_notion_formatter_prompt()
+        Args:
+            mode: "markdown" or "llm"; defaults to NOTION_FORMATTER_MODE
+        """
+        self.mode = (mode or FORMATTER_MODE).lower()
+        self.chain = None
         
-        # Create the formatting chain
-        self.chain = self.prompt | self.structured_llm
+        if self.mode == "llm":
+            self.llm = ChatGroq(
+                model="llama-3.3-70b-versatile",  # Use Llama 3.3 70B for better formatting
+                temperature=0.3,  # Some creativity for formatting decisions
+                api_key=os.environ.get("GROQ_API_KEY"),
+                cache=LangChainLLMCache()
+            )
+            
+            # Create structured output LLM
+            self.structured_llm = self.llm.with_structured_output(NotionFormatting)
+            
+            # Get prompt from centralized prompts module
+            self.prompt = get_notion_formatter_prompt()
+            
+            # Create the formatting chain
+            self.chain = self.prompt | self.structured_llm
+    
+    @staticmethod
+    def _chain_inputs(topic: str, summary: str, image_url: Optional[str]) -> Dict[str, str]:
+        """Prompt inputs for the LLM chain, with the timestamp left as a placeholder."""
+        return {
+            "topic": topic,
+            "summary": summary,
+            "image_url": image_url if image_url and image_url != "No image found" else "None",
+            "timestamp": TIMESTAMP_PLACEHOLDER
+        }
+    
+    @staticmethod
+    def _fill_timestamp(formatting: NotionFormatting, timestamp: str) -> NotionFormatting:
+        """Replace the timestamp placeholder in the LLM's blocks."""
+        blocks = [
+            block.model_copy(update={"content": block.content.replace(TIMESTAMP_PLACEHOLDER, timestamp)})
+            for block in formatting.blocks
+        ]
+        return formatting.model_copy(update={"blocks": blocks})
     
     def format_content(
         self,
@@ -78,7 +179,7 @@ class NotionFormatterAgent:
         image_url: Optional[str] = None
     ) -> NotionFormatting:
         """
-        Format content into Notion blocks using LLM.
+        Format content into Notion blocks.
         
         Args:
             topic: The main topic/title
@@ -90,45 +191,100 @@ class NotionFormatterAgent:
         """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
+        if self.chain is None:
+            return self.compile_content(topic, summary, image_url, timestamp)
+        
         try:
-            result = self.chain.invoke({
-                "topic": topic,
-                "summary": summary,
-                "image_url": image_url if image_url and image_url != "No image found" else "None",
-                "timestamp": timestamp
-            })
-            
-            return result
+            result = self.chain.invoke(self._chain_inputs(topic, summary, image_url))
+            return self._fill_timestamp(result, timestamp)
             
         except Exception as e:
             # Fallback to basic formatting
             return self._create_fallback_blocks(topic, summary, image_url, timestamp)
     
-    def _create_fallback_blocks(
+    async def aformat_content(
+        self,
+        topic: str,
+        summary: str,
+        image_url: Optional[str] = None
+    ) -> NotionFormatting:
+        """
+        Async variant of format_content that does not block the event loop.
+        
+        Args:
+            topic: The main topic/title
+            summary: The content summary
+            image_url: Optional image URL
+            
+        Returns:
+            NotionFormatting with blocks and reasoning
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        if self.chain is None:
+            return self.compile_content(topic, summary, image_url, timestamp)
+        
+        try:
+            result = await self.chain.ainvoke(self._chain_inputs(topic, summary, image_url))
+            return self._fill_timestamp(result, timestamp)
+        except Exception as e:
+            return self._create_fallback_blocks(topic, summary, image_url, timestamp)
+    
+    def compile_content(
         self,
         topic: str,
         summary: str,
         image_url: Optional[str],
         timestamp: str
     ) -> NotionFormatting:
-        """Create basic blocks if LLM formatting fails."""
+        """
+        Lay out the note by compiling the Markdown summary locally.
+        
+        Args:
+            topic: The main topic/title
+            summary: The Markdown summary
+            image_url: Optional image URL
+            timestamp: Time the note was created
+            
+        Returns:
+            NotionFormatting with blocks and reasoning
+        """
         blocks = [
             NotionBlock(block_type="divider", content=""),
             NotionBlock(block_type="heading_1", content=topic),
-            NotionBlock(block_type="paragraph", content=f"Added: {timestamp}"),
-            NotionBlock(block_type="heading_2", content="Summary"),
-            NotionBlock(block_type="paragraph", content=summary[:2000])
+            NotionBlock(block_type="paragraph", content=f"*Added: {timestamp}*")
         ]
         
+        summary_blocks = [
+            NotionBlock(block_type=block_type, content=content)
+            for block_type, content in compile_markdown(summary)
+        ]
+        # Only add a section heading if the summary does not open with its own
+        if not summary_blocks or not summary_blocks[0].block_type.startswith("heading_"):
+            blocks.append(NotionBlock(block_type="heading_2", content="Summary"))
+        blocks.extend(summary_blocks)
+        
         if image_url and image_url != "No image found":
             blocks.append(NotionBlock(block_type="heading_3", content="Reference Image"))
             blocks.append(NotionBlock(block_type="bookmark", content=image_url))
         
         return NotionFormatting(
             blocks=blocks,
-            reasoning="Fallback formatting due to error"
+            reasoning="Compiled locally from Markdown"
         )
     
+    def _create_fallback_blocks(
+        self,
+        topic: str,
+        summary: str,
+        image_url: Optional[str],
+        timestamp: str
+    ) -> NotionFormatting:
+        """Create blocks with the local compiler if LLM formatting fails."""
+        formatting = self.compile_content(topic, summary, image_url, timestamp)
+        formatting.reasoning = "Fallback formatting due to error"
+        return formatting
+    
     def blocks_to_notion_format(self, formatting: NotionFormatting) -> List[Dict[str, Any]]:
         """
         Convert NotionBlock objects to actual Notion API block format.
@@ -142,67 +298,26 @@ class NotionFormatterAgent:
         notion_blocks = []
         
         for block in formatting.blocks:
-            block_type = block.block_type
-            content = block.content
-            
-            if block_type == "divider":
-                notion_blocks.append({
-                    "object": "block",
-                    "type": "divider",
-                    "divider": {}
-                })
-            
-            elif block_type == "bookmark":
-                if content and content.startswith("http"):
-                    notion_blocks.append({
-                        "object": "block",
-                        "type": "bookmark",
-                        "bookmark": {"url": content}
-                    })
+            builder = BLOCK_BUILDERS.get(block.block_type)
+            if builder is None:
+                continue
             
-            elif block_type in ["heading_1", "heading_2", "heading_3"]:
-                notion_blocks.append({
-                    "object": "block",
-                    "type": block_type,
-                    block_type: {
-                        "rich_text": [{"type": "text", "text": {"content": content[:2000]}}]
-                    }
-                })
-            
-            elif block_type == "paragraph":
-                notion_blocks.append({
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [{"type": "text", "text": {"content": content[:2000]}}]
-                    }
-                })
-            
-            elif block_type == "bulleted_list_item":
-                notion_blocks.append({
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": content[:2000]}}]
-                    }
-                })
-            
-            elif block_type == "numbered_list_item":
-                notion_blocks.append({
-                    "object": "block",
-                    "type": "numbered_list_item",
-                    "numbered_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": content[:2000]}}]
-                    }
-                })
-            
-            elif block_type == "quote":
-                notion_blocks.append({
-                    "object": "block",
-                    "type": "quote",
-                    "quote": {
-                        "rich_text": [{"type": "text", "text": {"content": content[:2000]}}]
-                    }
-                })
+            notion_block = builder(block.block_type, block.content)
+            if notion_block is not None:
+                notion_blocks.append(notion_block)
         
         return notion_blocks
+
+
+@lru_cache(maxsize=None)
+def get_notion_formatter(mode: Optional[str] = None) -> NotionFormatterAgent:
+    """
+    Process-wide formatter per mode, so the Groq client and chain are built once.
+    
+    Args:
+        mode: "markdown" or "llm"; defaults to NOTION_FORMATTER_MODE
+        
+    Returns:
+        Shared NotionFormatterAgent instance
+    """
+    return NotionFormatterAgent((mode or FORMATTER_MODE).lower())
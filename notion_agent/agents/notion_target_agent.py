@@ -0,0 +1,55 @@
+"""
+Notion Target Agent (ADK Custom Agent)
+
+Resolves which Notion page the note will be written to and warms the pooled
+Notion MCP session. It depends only on the initial session state, so the
+workflow runs it alongside the summary instead of leaving the page lookup
+and server start-up to the writer at the very end.
+"""
+
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from notion_mcp_config import NOTION_BACKEND
+from ..mcp_pool import notion_mcp_pool
+from ..tools.notion_page_info_retriever import get_notion_pages
+
+
+class NotionTargetAgent(BaseAgent):
+    """Looks up the target page ahead of the writer stage."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        notion_page_id = state.get("notion_page_id")
+        notion_token = state.get("notion_token")
+
+        state_delta = {"notion_target_ready": True}
+
+        # Fall back to the first available page when none was selected
+        if not notion_page_id and notion_token:
+            pages = await get_notion_pages(notion_token)
+            if pages:
+                state_delta["notion_page_id"] = pages[0]["id"]
+                state_delta["notion_page_title"] = pages[0]["title"]
+        elif notion_token and NOTION_BACKEND == "mcp":
+            # Start the MCP server now so the writer finds a warm session
+            try:
+                await notion_mcp_pool().warm(notion_token)
+            except Exception:
+                pass
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta)
+        )
+
+
+notion_target_agent = NotionTargetAgent(
+    name="NotionTargetAgent",
+    description="Resolves the Notion page the note will be written to"
+)
@@ -0,0 +1,203 @@
+"""
+Stage Graph Agent (ADK Custom Agent)
+
+Runs sub-agents as a dependency graph over session state instead of a fixed
+sequence. Each stage declares the state keys it requires and the keys it
+provides; a stage starts as soon as every key it requires is either present
+in session state or no longer pending from an unfinished stage. Independent
+stages therefore run concurrently.
+
+Progress is published as ``stage_status`` state deltas whenever a stage
+starts or finishes. A stage whose provided keys are all already set (for
+example when a failed run is resumed from its saved state) is skipped. A
+per-stage timeline and the critical path are written to session state under
+``stage_timeline`` and ``critical_path`` when the graph finishes.
+"""
+
+import asyncio
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from tracing import span
+
+
+# Sentinel pushed by a stage driver when its sub-agent has finished
+_STAGE_DONE = object()
+
+
+class StageGraphAgent(BaseAgent):
+    """
+    Custom ADK agent that schedules its sub-agents by state-key dependencies.
+
+    Attributes:
+        requires: Mapping of sub-agent name to the state keys it reads
+        provides: Mapping of sub-agent name to the state keys it writes
+    """
+
+    requires: Dict[str, List[str]] = {}
+    provides: Dict[str, List[str]] = {}
+
+    def _producers(self, key: str) -> List[str]:
+        """Names of the stages that provide a state key."""
+        return [name for name, keys in self.provides.items() if key in keys]
+
+    def _is_ready(self, name: str, state, unfinished: set) -> bool:
+        """A stage is ready when none of its inputs are still pending."""
+        for key in self.requires.get(name, []):
+            if key in state:
+                continue
+            producers = [p for p in self._producers(key) if p != name]
+            if any(producer in unfinished for producer in producers):
+                return False
+        return True
+
+    def _already_done(self, name: str, state) -> bool:
+        """A stage is skipped when every key it provides is already set."""
+        keys = self.provides.get(name, [])
+        return bool(keys) and all(state.get(key) for key in keys)
+
+    def _branch_context(self, ctx: InvocationContext, agent: BaseAgent) -> InvocationContext:
+        """Give each stage its own branch so sibling conversations stay isolated."""
+        branch_ctx = ctx.model_copy()
+        branch_ctx.branch = f"{ctx.branch}.{agent.name}" if ctx.branch else agent.name
+        return branch_ctx
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        agents = {agent.name: agent for agent in self.sub_agents}
+        unfinished = set(agents)
+        pending = list(agents)
+        running: Dict[str, asyncio.Task] = {}
+        queue: asyncio.Queue = asyncio.Queue()
+
+        workflow_start = time.perf_counter()
+        key_ready_at: Dict[str, float] = {}
+        timeline: Dict[str, Dict] = {}
+        stage_status: Dict[str, str] = {name: "pending" for name in agents}
+
+        # Stages whose outputs survive from an earlier run are not repeated
+        for name in list(pending):
+            if self._already_done(name, state):
+                pending.remove(name)
+                unfinished.discard(name)
+                stage_status[name] = "skipped"
+
+        def status_event() -> Event:
+            return Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                actions=EventActions(state_delta={"stage_status": dict(stage_status)})
+            )
+
+        def elapsed() -> float:
+            return round(time.perf_counter() - workflow_start, 4)
+
+        def note_ready_keys():
+            # Record the first moment each state key became available
+            for key in state:
+                key_ready_at.setdefault(key, elapsed())
+
+        async def drive(agent: BaseAgent):
+            try:
+                with span(f"stage.{agent.name}"):
+                    async for event in agent.run_async(self._branch_context(ctx, agent)):
+                        # Wait until the runner has applied the event before continuing
+                        resume = asyncio.Event()
+                        await queue.put((agent.name, event, resume))
+                        await resume.wait()
+            except Exception as e:
+                await queue.put((agent.name, e, None))
+                return
+            await queue.put((agent.name, _STAGE_DONE, None))
+
+        def launch_ready_stages() -> bool:
+            note_ready_keys()
+            launched = False
+            for name in list(pending):
+                if not self._is_ready(name, state, unfinished):
+                    continue
+                pending.remove(name)
+                started = elapsed()
+
+                # The input that arrived last is what this stage waited on
+                blocked_by: Optional[str] = None
+                latest = -1.0
+                for key in self.requires.get(name, []):
+                    producers = [p for p in self._producers(key) if p != name]
+                    ready_at = key_ready_at.get(key, 0.0)
+                    if producers and ready_at > latest:
+                        latest = ready_at
+                        finished = [p for p in producers if p in timeline and "finished_at" in timeline[p]]
+                        blocked_by = finished[0] if finished else producers[0]
+
+                timeline[name] = {"started_at": started, "blocked_by": blocked_by}
+                stage_status[name] = "running"
+                running[name] = asyncio.create_task(drive(agents[name]))
+                launched = True
+            return launched
+
+        try:
+            launch_ready_stages()
+            yield status_event()
+            while running:
+                name, item, resume = await queue.get()
+
+                if item is _STAGE_DONE:
+                    running.pop(name, None)
+                    unfinished.discard(name)
+                    finished_at = elapsed()
+                    timeline[name]["finished_at"] = finished_at
+                    timeline[name]["duration"] = round(finished_at - timeline[name]["started_at"], 4)
+                    for key in self.provides.get(name, []):
+                        key_ready_at.setdefault(key, finished_at)
+                    stage_status[name] = "done"
+                    launch_ready_stages()
+                    yield status_event()
+                    continue
+
+                if isinstance(item, Exception):
+                    running.pop(name, None)
+                    stage_status[name] = "failed"
+                    yield status_event()
+                    raise item
+
+                yield item
+                resume.set()
+                if launch_ready_stages():
+                    yield status_event()
+
+            if pending:
+                raise RuntimeError(f"Workflow stages could not be scheduled: {', '.join(pending)}")
+        finally:
+            for task in running.values():
+                task.cancel()
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={
+                "stage_timeline": timeline,
+                "critical_path": self._critical_path(timeline),
+                "workflow_duration": elapsed()
+            })
+        )
+
+    @staticmethod
+    def _critical_path(timeline: Dict[str, Dict]) -> List[str]:
+        """Walk back from the last stage to finish along the inputs each stage waited on."""
+        if not timeline:
+            return []
+
+        last = max(timeline, key=lambda name: timeline[name].get("finished_at", 0.0))
+        path = []
+        current: Optional[str] = last
+        while current and current not in path:
+            path.append(current)
+            current = timeline.get(current, {}).get("blocked_by")
+        return list(reversed(path))
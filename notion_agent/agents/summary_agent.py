@@ -1,27 +1,272 @@
 """
-Summary Agent
+Summary Agent (ADK Custom Agent)
 
-Creates a structured summary from chat conversation history.
+Creates a structured summary from chat conversation history. When a note was
+already written to the same page, ``chat_history`` holds only the newer
+messages and ``previous_summary`` the note written last time.
+
+Long histories are summarized map-reduce style instead of in one prompt:
+
+- the history is split at message boundaries into segments of at most
+  ``SUMMARY_SEGMENT_TOKENS`` (estimated) tokens
+- segments are summarized concurrently, at most ``SUMMARY_MAX_CONCURRENCY``
+  LLM calls at a time
+- the partial summaries are reduced into the final ``summary`` state key,
+  in several rounds if they do not fit a single prompt
+
+A history that fits one segment takes a single LLM call, as before. Every
+call goes through the shared LLM response cache (see llm_cache.py).
 """
 
-from google.adk.agents import LlmAgent
+import asyncio
+import os
+import re
+import time
+from typing import AsyncGenerator, List, Optional, Union
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import BaseLlm, LlmRequest, LLMRegistry
+from google.genai import types
+from pydantic import PrivateAttr
+
+from tracing import record_span, span
+from ..llm_cache import cache_key, llm_response_cache
 
 
 GEMINI_MODEL = "gemini-2.0-flash"
 
+SUMMARY_SEGMENT_TOKENS = int(os.environ.get("SUMMARY_SEGMENT_TOKENS", "6000"))
+SUMMARY_MAX_CONCURRENCY = int(os.environ.get("SUMMARY_MAX_CONCURRENCY", "4"))
 
-summary_agent = LlmAgent(
-    name="SummaryAgent",
-    model=GEMINI_MODEL,
-    description="Creates a structured summary from chat conversation history",
-    instruction="""You are a Summary Agent.
+# Rough chars-per-token ratio used to size segments without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+SUMMARY_INSTRUCTION = """You are a Summary Agent.
 Based *only* on the chat history below, create a well-structured, comprehensive summary.
 
+**Previously written note (may be empty):**
+{previous_summary}
+
 **Chat History:**
 {chat_history}
 
 Create a summary that captures all key points, important details, and maintains logical flow.
+If a previously written note is given, the chat history contains only the messages added since it:
+summarize just that new material as a continuation, and do not repeat points already covered.
+
+Output *only* the summary text."""
+
+MAP_INSTRUCTION = """You are summarizing part {part} of {parts} of a longer chat conversation.
+Based *only* on this excerpt, list every key point, important detail, formula and code snippet it contains.
+
+**Chat Excerpt:**
+{chat_history}
+
+Output *only* the summary of this excerpt."""
+
+REDUCE_INSTRUCTION = """You are a Summary Agent.
+The partial summaries below cover consecutive parts of one chat conversation, in order.
+Combine them into a single well-structured, comprehensive summary.
+
+**Previously written note (may be empty):**
+{previous_summary}
+
+**Partial Summaries:**
+{partial_summaries}
+
+Merge overlapping points, keep all key points and important details, and maintain logical flow.
+If a previously written note is given, summarize just the new material as a continuation,
+and do not repeat points already covered.
+
+Output *only* the summary text."""
+
+
+# ============================================================================
+# Segmentation
+# ============================================================================
+
+# Messages are serialized as "[role] content" lines by the UI
+_MESSAGE_START = re.compile(r"\n(?=\[(?:user|assistant)\] )")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_history(chat_history: str, segment_tokens: int = SUMMARY_SEGMENT_TOKENS) -> List[str]:
+    """
+    Split a chat history into token-bounded segments at message boundaries.
+
+    A single message longer than a segment is split on its own.
 
-Output *only* the summary text.""",
-    output_key="summary"
+    Args:
+        chat_history: Serialized chat history
+        segment_tokens: Maximum estimated tokens per segment
+
+    Returns:
+        list: Segments in conversation order
+    """
+    max_chars = max(1, segment_tokens) * CHARS_PER_TOKEN
+    segments: List[str] = []
+    current: List[str] = []
+    current_chars = 0
+
+    for message in _MESSAGE_START.split(chat_history):
+        if not message.strip():
+            continue
+        if current and current_chars + len(message) + 1 > max_chars:
+            segments.append("\n".join(current))
+            current, current_chars = [], 0
+        while len(message) > max_chars:
+            segments.append(message[:max_chars])
+            message = message[max_chars:]
+        current.append(message)
+        current_chars += len(message) + 1
+
+    if current:
+        segments.append("\n".join(current))
+    return segments
+
+
+# ============================================================================
+# Map-Reduce Summary Agent
+# ============================================================================
+
+class MapReduceSummaryAgent(BaseAgent):
+    """
+    Summarizes ``chat_history`` into ``summary`` with concurrent segment calls.
+
+    Attributes:
+        model: Model name resolved through the ADK LLM registry, or a BaseLlm
+            instance (e.g. a stub LLM)
+        segment_tokens: Maximum estimated tokens per segment
+        max_concurrency: Maximum concurrent LLM calls
+    """
+
+    model: Union[str, BaseLlm] = GEMINI_MODEL
+    segment_tokens: int = SUMMARY_SEGMENT_TOKENS
+    max_concurrency: int = SUMMARY_MAX_CONCURRENCY
+
+    # Client built once per model, not on every summarize
+    _llm: Optional[BaseLlm] = PrivateAttr(default=None)
+
+    @property
+    def llm(self) -> BaseLlm:
+        if isinstance(self.model, BaseLlm):
+            return self.model
+        if self._llm is None or self._llm.model != self.model:
+            self._llm = LLMRegistry.new_llm(self.model)
+        return self._llm
+
+    async def _generate(self, llm: BaseLlm, template: str, inputs: dict, slots: asyncio.Semaphore) -> str:
+        """Render a prompt template, run it and return the response text."""
+        key = cache_key(llm.model, template, inputs)
+        cached = await asyncio.to_thread(llm_response_cache.get, key)
+        if cached is not None:
+            record_span("llm.cache_hit", time.time(), 0.0, agent=self.name)
+            return cached
+
+        request = LlmRequest(
+            model=llm.model,
+            contents=[types.Content(role="user", parts=[types.Part(text=template.format(**inputs))])]
+        )
+        text = []
+        async with slots:
+            with span("llm.call", agent=self.name, model=llm.model) as call_span:
+                async for response in llm.generate_content_async(request, stream=False):
+                    if response.content and response.content.parts:
+                        text.extend(part.text for part in response.content.parts if part.text)
+                    if response.usage_metadata:
+                        call_span.set(
+                            input_tokens=response.usage_metadata.prompt_token_count or 0,
+                            output_tokens=response.usage_metadata.candidates_token_count or 0,
+                            total_tokens=response.usage_metadata.total_token_count or 0
+                        )
+
+        result = "".join(text).strip()
+        if result:
+            await asyncio.to_thread(llm_response_cache.set, key, result)
+        return result
+
+    async def _reduce(self, llm: BaseLlm, partials: List[str], previous_summary: str,
+                      slots: asyncio.Semaphore) -> str:
+        """Combine partial summaries, grouping them if they exceed one segment."""
+        budget = self.segment_tokens * CHARS_PER_TOKEN
+        while True:
+            groups: List[List[str]] = [[]]
+            size = 0
+            for partial in partials:
+                if groups[-1] and size + len(partial) > budget:
+                    groups.append([])
+                    size = 0
+                groups[-1].append(partial)
+                size += len(partial)
+
+            # The final round (or one that cannot shrink any further) produces the summary
+            if len(groups) == 1 or len(groups) == len(partials):
+                return await self._generate(llm, REDUCE_INSTRUCTION, {
+                    "previous_summary": previous_summary,
+                    "partial_summaries": "\n\n---\n\n".join(partials)
+                }, slots)
+
+            partials = await asyncio.gather(*(
+                self._generate(llm, REDUCE_INSTRUCTION, {
+                    "previous_summary": "",
+                    "partial_summaries": "\n\n---\n\n".join(group)
+                }, slots)
+                for group in groups
+            ))
+
+    async def summarize(self, chat_history: str, previous_summary: str = "") -> str:
+        """
+        Summarize a chat history, map-reduce style when it is long.
+
+        Args:
+            chat_history: Serialized chat history
+            previous_summary: Note last written to the same page
+
+        Returns:
+            str: The summary text
+        """
+        llm = self.llm
+        slots = asyncio.Semaphore(max(1, self.max_concurrency))
+        segments = split_history(chat_history, self.segment_tokens)
+
+        if len(segments) <= 1:
+            return await self._generate(llm, SUMMARY_INSTRUCTION, {
+                "previous_summary": previous_summary,
+                "chat_history": chat_history
+            }, slots)
+
+        partials = await asyncio.gather(*(
+            self._generate(llm, MAP_INSTRUCTION, {
+                "part": index + 1, "parts": len(segments), "chat_history": segment
+            }, slots)
+            for index, segment in enumerate(segments)
+        ))
+        return await self._reduce(llm, list(partials), previous_summary, slots)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        summary = await self.summarize(
+            state.get("chat_history", ""),
+            state.get("previous_summary", "")
+        )
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=summary)]),
+            actions=EventActions(state_delta={"summary": summary})
+        )
+
+
+summary_agent = MapReduceSummaryAgent(
+    name="SummaryAgent",
+    description="Creates a structured summary from chat conversation history"
 )
@@ -5,6 +5,8 @@ Extracts a concise 2-4 word topic from the summary.
 """
 
 from google.adk.agents import LlmAgent
+from tracing import trace_after_model, trace_before_model
+from ..llm_cache import llm_cache_after_model, llm_cache_before_model
 
 
 GEMINI_MODEL = "gemini-2.0-flash"
@@ -23,5 +25,7 @@ Based *only* on the summary below, extract the main topic.
 Extract a concise topic that is 2-4 words maximum and works well as an image search query.
 
 Output *only* the topic (2-4 words).""",
-    output_key="topic"
+    output_key="topic",
+    before_model_callback=[llm_cache_before_model, trace_before_model],
+    after_model_callback=[trace_after_model, llm_cache_after_model]
 )
@@ -0,0 +1,189 @@
+"""
+Notion Block Writer
+
+Writes block lists of any length to a Notion page within the API limits:
+
+- text is split into rich-text segments of at most 2000 characters instead
+  of being truncated, and blocks with more than 100 segments are split into
+  consecutive blocks of the same type
+- children are appended in ordered batches of at most 100 blocks, each
+  request drawing from the token's shared rate limiter (see rate_limit.py)
+- ``write_note`` goes through the write ledger (see write_ledger.py): a note
+  already on the page is skipped, and a failed write resumes after the last
+  confirmed batch. Notes are keyed by their topic, summary and image rather
+  than their blocks, which carry the time they were formatted
+- with ``NOTION_WRITE_MARKER`` enabled, the note ends with a small gray
+  paragraph carrying its content hash
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from notion_agent.notion_backend import get_notion_backend
+from notion_agent.write_ledger import content_hash, write_ledger
+from tracing import record_span, span
+
+
+NOTION_WRITE_MARKER = os.environ.get("NOTION_WRITE_MARKER", "false").lower() in ("1", "true", "yes")
+
+MAX_TEXT_LENGTH = 2000
+MAX_RICH_TEXT_ITEMS = 100
+MAX_CHILDREN_PER_REQUEST = 100
+
+
+def split_text(text: str, limit: int = MAX_TEXT_LENGTH) -> List[str]:
+    """
+    Split text into chunks of at most ``limit`` characters.
+
+    Chunks break at the last newline or space inside the window when there
+    is one, so words are not cut in half.
+    """
+    chunks = []
+    while len(text) > limit:
+        cut = max(text.rfind("\n", 0, limit), text.rfind(" ", 0, limit))
+        if cut <= 0:
+            cut = limit
+        else:
+            cut += 1
+        chunks.append(text[:cut])
+        text = text[cut:]
+    if text or not chunks:
+        chunks.append(text)
+    return chunks
+
+
+def split_rich_text(rich_text: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split any text item over the length limit, keeping its annotations."""
+    items = []
+    for item in rich_text:
+        content = item.get("text", {}).get("content", "")
+        if item.get("type", "text") != "text" or len(content) <= MAX_TEXT_LENGTH:
+            items.append(item)
+            continue
+        for chunk in split_text(content):
+            items.append({**item, "text": {**item["text"], "content": chunk}})
+    return items
+
+
+def text_rich_text(content: str) -> List[Dict[str, Any]]:
+    """Plain rich-text items for a string of any length."""
+    return [{"type": "text", "text": {"content": chunk}} for chunk in split_text(content)]
+
+
+def enforce_block_limits(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Make every block fit Notion's per-block rich-text limits.
+
+    Args:
+        blocks: Notion API block dictionaries
+
+    Returns:
+        list: Blocks with long text split across segments and, where a
+        block would exceed 100 segments, across consecutive blocks
+    """
+    result = []
+    for block in blocks:
+        block_type = block.get("type")
+        body = block.get(block_type)
+        if not isinstance(body, dict) or "rich_text" not in body:
+            result.append(block)
+            continue
+
+        rich_text = split_rich_text(body["rich_text"])
+        for start in range(0, max(len(rich_text), 1), MAX_RICH_TEXT_ITEMS):
+            result.append({
+                **block,
+                block_type: {**body, "rich_text": rich_text[start:start + MAX_RICH_TEXT_ITEMS]}
+            })
+    return result
+
+
+async def append_blocks(notion_token: str, block_id: str, blocks: List[Dict[str, Any]], start: int = 0,
+                        on_batch: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+    """
+    Append blocks to a page in ordered batches of at most 100 children.
+
+    Args:
+        notion_token: User's Notion integration token
+        block_id: Page or block to append to
+        blocks: Notion API block dictionaries
+        start: Skip the first ``start`` blocks (after limits are enforced),
+            already written by an earlier attempt
+        on_batch: Called with the number of blocks written so far after
+            every batch Notion accepted
+
+    Returns:
+        dict: Number of blocks written and requests made
+    """
+    backend = get_notion_backend()
+    blocks = enforce_block_limits(blocks)
+
+    requests = 0
+    with span("notion.write", blocks=len(blocks), start=start) as write_span:
+        for offset in range(start, len(blocks), MAX_CHILDREN_PER_REQUEST):
+            # Batches go out one after another so the page keeps the block order
+            batch = blocks[offset:offset + MAX_CHILDREN_PER_REQUEST]
+            await backend.append_block_children(notion_token, block_id, batch)
+            requests += 1
+            if on_batch:
+                on_batch(offset + len(batch))
+        write_span.set(requests=requests)
+
+    return {"blocks": max(0, len(blocks) - start), "requests": requests}
+
+
+def marker_block(note_hash: str) -> Dict[str, Any]:
+    """Paragraph that tags a note in the page with its content hash."""
+    return {
+        "object": "block",
+        "type": "paragraph",
+        "paragraph": {
+            "rich_text": [{
+                "type": "text",
+                "text": {"content": f"notionmate:{note_hash}"},
+                "annotations": {"color": "gray"}
+            }]
+        }
+    }
+
+
+async def write_note(notion_token: str, page_id: str, blocks: List[Dict[str, Any]],
+                     key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write a note's blocks to a page at most once.
+
+    Args:
+        notion_token: User's Notion integration token
+        page_id: Page to append the note to
+        blocks: Notion API block dictionaries of the note
+        key: The note's idempotency key (``write_ledger.note_key``);
+            defaults to a hash of the blocks
+
+    Returns:
+        dict: ``content_hash``, ``skipped`` (None, or "written"/"busy" when
+        the note is already on the page or being written by another job),
+        ``resumed_from`` and the blocks written and requests made
+    """
+    blocks = enforce_block_limits(blocks)
+    note_hash = key or content_hash(blocks)
+    if NOTION_WRITE_MARKER:
+        blocks = blocks + [marker_block(note_hash)]
+
+    status, confirmed, blocks = write_ledger.claim(page_id, note_hash, blocks)
+    if status != "claimed":
+        record_span("notion.write_skipped", time.time(), 0.0, status=status, blocks=len(blocks))
+        return {"content_hash": note_hash, "skipped": status, "resumed_from": confirmed,
+                "blocks": 0, "requests": 0}
+
+    try:
+        written = await append_blocks(
+            notion_token, page_id, blocks, start=confirmed,
+            on_batch=lambda count: write_ledger.confirm(page_id, note_hash, count)
+        )
+    except BaseException:
+        write_ledger.release(page_id, note_hash)
+        raise
+    write_ledger.complete(page_id, note_hash)
+
+    return {"content_hash": note_hash, "skipped": None, "resumed_from": confirmed, **written}
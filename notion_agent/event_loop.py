@@ -0,0 +1,126 @@
+"""
+Background Event Loop
+
+One long-lived asyncio event loop per process, running in a daemon thread.
+Synchronous entry points (Streamlit callbacks, CLI helpers) submit
+coroutines to it instead of creating a loop per call with ``asyncio.run``.
+Because every coroutine runs on the same loop, loop-bound resources such as
+the Notion MCP session pool and the HTTP client stay warm across calls.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import sys
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class BackgroundEventLoop:
+    """Event loop running forever in a dedicated daemon thread."""
+
+    def __init__(self, name: str = "notionmate-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run_forever, args=(self._loop, ready), name=self.name, daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _run_forever(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """
+        Schedule a coroutine on the background loop from any thread.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            concurrent.futures.Future resolving to the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the background loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Optional seconds to wait before raising TimeoutError
+
+        Returns:
+            The coroutine's result
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("run() called from the background loop itself; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    async def _drain(self):
+        """Close the MCP session pool, then cancel outstanding tasks so subprocesses close."""
+        # Only loaded once something used the pool; importing it here would pull in the MCP client
+        mcp_pool = sys.modules.get("notion_agent.mcp_pool")
+        if mcp_pool is not None:
+            await mcp_pool.close_all()
+
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.get_running_loop().shutdown_asyncgens()
+
+    def stop(self, timeout: float = 10.0):
+        """Drain and stop the loop, then close it."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed():
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._drain(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+
+background_loop = BackgroundEventLoop()
+atexit.register(background_loop.stop)
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+    """Schedule a coroutine on the shared background loop."""
+    return background_loop.submit(coro)
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the shared background loop and return its result."""
+    return background_loop.run(coro, timeout)
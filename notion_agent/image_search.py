@@ -0,0 +1,225 @@
+"""
+Image Search Client
+
+Serper image lookups for note cover images.
+
+- Sync calls share one pooled ``requests.Session``; async calls share one
+  keep-alive ``httpx.AsyncClient`` per event loop.
+- Every request has strict connect/read timeouts, so a hung lookup costs
+  seconds instead of stalling the workflow.
+- Found images are cached per topic in a small SQLite file with a TTL, so
+  repeated topics skip the network entirely.
+"""
+
+import asyncio
+import atexit
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+SERPER_IMAGES_URL = os.environ.get("SERPER_IMAGES_URL", "https://google.serper.dev/images")
+IMAGE_SEARCH_CONNECT_TIMEOUT = float(os.environ.get("IMAGE_SEARCH_CONNECT_TIMEOUT", "3"))
+IMAGE_SEARCH_READ_TIMEOUT = float(os.environ.get("IMAGE_SEARCH_READ_TIMEOUT", "10"))
+IMAGE_CACHE_TTL = float(os.environ.get("IMAGE_CACHE_TTL", str(7 * 24 * 3600)))
+IMAGE_CACHE_PATH = os.path.join(os.environ.get("NOTIONMATE_DATA_DIR", ".notionmate"), "image_cache.sqlite3")
+
+
+# ============================================================================
+# Topic -> URL Cache
+# ============================================================================
+
+def normalize_topic(topic: str) -> str:
+    """Cache key for a topic: lower case with collapsed whitespace."""
+    return re.sub(r"\s+", " ", topic).strip().lower()
+
+
+class TopicImageCache:
+    """
+    Persistent topic -> image URL cache with a TTL.
+
+    Args:
+        path: SQLite file (":memory:" keeps the cache in memory)
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, path: str = IMAGE_CACHE_PATH, ttl: float = IMAGE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS images (topic TEXT PRIMARY KEY, url TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, topic: str) -> Optional[str]:
+        """Cached URL for a topic, or None if missing or expired."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT url FROM images WHERE topic = ? AND expires_at > ?", (normalize_topic(topic), time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, topic: str, url: str):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO images (topic, url, expires_at) VALUES (?, ?, ?)",
+                (normalize_topic(topic), url, time.time() + self.ttl)
+            )
+            conn.execute("DELETE FROM images WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+
+
+# ============================================================================
+# Serper Client
+# ============================================================================
+
+# One keep-alive client per event loop, since httpx connections are loop-bound
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+@atexit.register
+def _close_async_clients():
+    """Close pooled connections on interpreter exit."""
+    for loop, client in list(_async_clients.items()):
+        if loop.is_closed() or loop.is_running():
+            continue
+        try:
+            loop.run_until_complete(client.aclose())
+        except Exception:
+            pass
+
+
+class ImageSearchClient:
+    """
+    Cached, pooled Serper image search.
+
+    Args:
+        url: Serper images endpoint (point it at a stub server for testing)
+        cache: Topic cache, or None to disable caching
+        connect_timeout: Seconds to wait for a connection
+        read_timeout: Seconds to wait for the response
+    """
+
+    def __init__(self, url: str = SERPER_IMAGES_URL, cache: Optional[TopicImageCache] = None,
+                 connect_timeout: float = IMAGE_SEARCH_CONNECT_TIMEOUT,
+                 read_timeout: float = IMAGE_SEARCH_READ_TIMEOUT):
+        self.url = url
+        self.cache = cache
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=4, keepalive_expiry=60),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+            )
+            _async_clients[loop] = client
+        return client
+
+    @staticmethod
+    def _image_url(data: dict) -> str:
+        if "images" in data and data["images"]:
+            return data["images"][0]["imageUrl"]
+        return "No image found"
+
+    def _cached(self, query: str) -> Optional[str]:
+        return self.cache.get(query) if self.cache else None
+
+    def _store(self, query: str, image_url: str):
+        if self.cache and image_url.startswith("http"):
+            self.cache.set(query, image_url)
+
+    def search(self, query: str) -> str:
+        """
+        Search for one image.
+
+        Args:
+            query: Image search query (the note topic)
+
+        Returns:
+            str: Image URL, or a "No ..." / "Error ..." message
+        """
+        cached = self._cached(query)
+        if cached:
+            return cached
+
+        api_key = os.getenv("SERPER_API_KEY")
+        if not api_key:
+            return "No API key found"
+
+        try:
+            response = self.session.post(
+                self.url,
+                json={"q": query, "num": 1},
+                headers={"X-API-KEY": api_key},
+                timeout=(self.connect_timeout, self.read_timeout)
+            )
+            # A 4xx/5xx (bad key, quota) is an error, not "no image"
+            response.raise_for_status()
+            image_url = self._image_url(response.json())
+        except Exception as e:
+            return f"Error searching image: {str(e)}"
+
+        self._store(query, image_url)
+        return image_url
+
+    async def asearch(self, query: str) -> str:
+        """Async variant of ``search`` that runs on the caller's event loop."""
+        cached = await asyncio.to_thread(self._cached, query) if self.cache else None
+        if cached:
+            return cached
+
+        api_key = os.getenv("SERPER_API_KEY")
+        if not api_key:
+            return "No API key found"
+
+        try:
+            response = await self._async_client().post(
+                self.url,
+                json={"q": query, "num": 1},
+                headers={"X-API-KEY": api_key}
+            )
+            response.raise_for_status()
+            image_url = self._image_url(response.json())
+        except Exception as e:
+            return f"Error searching image: {str(e)}"
+
+        if self.cache:
+            await asyncio.to_thread(self._store, query, image_url)
+        return image_url
+
+
+image_search_client = ImageSearchClient(cache=TopicImageCache())
@@ -0,0 +1,207 @@
+"""
+Note Creation Jobs
+
+Runs note creation in the background so the UI is not blocked for the
+whole agent pipeline and Notion write.
+
+- ``submit`` returns a job ID immediately; the job runs on the shared
+  background event loop.
+- Each job exposes stage-by-stage status, updated as the workflow graph
+  starts and finishes stages, for the UI to poll.
+- At most ``NOTE_JOB_MAX_CONCURRENCY`` jobs run at once overall and at most
+  ``NOTE_JOB_MAX_PER_USER`` per user; further jobs wait in the queue.
+- ``retry`` re-runs a failed job from its saved workflow state, so stages
+  that already completed are not repeated.
+- A job submitted with a ``message_count`` advances the note ledger when it
+  succeeds, so the next note to the same page only covers newer messages.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .agent import create_note_from_history_async
+from .event_loop import submit
+from .note_ledger import note_ledger
+from tracing import span
+
+
+NOTE_JOB_MAX_CONCURRENCY = int(os.environ.get("NOTE_JOB_MAX_CONCURRENCY", "4"))
+NOTE_JOB_MAX_PER_USER = int(os.environ.get("NOTE_JOB_MAX_PER_USER", "1"))
+NOTE_JOB_RETENTION = int(os.environ.get("NOTE_JOB_RETENTION", "200"))
+
+
+class NoteJob:
+    """A single note creation request and its progress."""
+
+    def __init__(self, user_id: str, chat_history: str, notion_page_id: Optional[str], notion_token: str,
+                 previous_summary: str = "", message_count: Optional[int] = None):
+        self.job_id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.chat_history = chat_history
+        self.notion_page_id = notion_page_id
+        self.notion_token = notion_token
+        self.previous_summary = previous_summary
+        self.message_count = message_count
+        self.status = "queued"
+        self.stages: Dict[str, str] = {}
+        self.result: Dict[str, Any] = {}
+        self.error = ""
+        self.attempts = 0
+        self.trace_id: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the job's public status."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stages": dict(self.stages),
+            "error": self.error,
+            "attempts": self.attempts,
+            "trace_id": self.trace_id,
+            "result": {key: value for key, value in self.result.items() if key != "state"},
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class NoteJobManager:
+    """Bounded background runner for note creation jobs."""
+
+    def __init__(self, max_concurrency: int = NOTE_JOB_MAX_CONCURRENCY,
+                 max_per_user: int = NOTE_JOB_MAX_PER_USER, retention: int = NOTE_JOB_RETENTION):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_user = max(1, max_per_user)
+        self.retention = retention
+        self._jobs: "OrderedDict[str, NoteJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Created lazily on the background loop
+        self._global_slots: Optional[asyncio.Semaphore] = None
+        self._user_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slots_for(self, user_id: str):
+        if self._global_slots is None:
+            self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        if user_id not in self._user_slots:
+            self._user_slots[user_id] = asyncio.Semaphore(self.max_per_user)
+        return self._global_slots, self._user_slots[user_id]
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs beyond the retention limit."""
+        while len(self._jobs) > self.retention:
+            oldest = next((job_id for job_id, job in self._jobs.items() if job.finished), None)
+            if oldest is None:
+                break
+            del self._jobs[oldest]
+
+    def submit(self, user_id: str, chat_history: str, notion_page_id: Optional[str], notion_token: str,
+               previous_summary: str = "", message_count: Optional[int] = None) -> str:
+        """
+        Queue a note creation job.
+
+        Args:
+            user_id: Identifier used for the per-user concurrency limit and
+                as the conversation ID in the note ledger
+            chat_history: Chat history to summarize (only the new messages
+                when previous_summary is given)
+            notion_page_id: Optional specific Notion page ID to write to
+            notion_token: User's Notion integration token
+            previous_summary: Note last written to the same page
+            message_count: Conversation length the note covers; recorded in
+                the note ledger on success
+
+        Returns:
+            str: The new job's ID
+        """
+        job = NoteJob(user_id, chat_history, notion_page_id, notion_token, previous_summary, message_count)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict_finished()
+        submit(self._run(job))
+        return job.job_id
+
+    def retry(self, job_id: str) -> bool:
+        """
+        Re-run a failed job, skipping the stages that already completed.
+
+        Returns:
+            bool: True if the job was re-queued
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.status != "failed":
+            return False
+        job.status = "queued"
+        job.error = ""
+        job.updated_at = time.time()
+        submit(self._run(job, resume_state=job.result.get("state")))
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status snapshot of a job, or None if it is unknown."""
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def jobs_for_user(self, user_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values() if job.user_id == user_id]
+
+    async def _run(self, job: NoteJob, resume_state: Optional[Dict[str, Any]] = None):
+        global_slots, user_slots = self._slots_for(job.user_id)
+
+        def on_progress(stages: Dict[str, str]):
+            job.stages = dict(stages)
+            job.updated_at = time.time()
+
+        async with user_slots, global_slots:
+            job.status = "running"
+            job.attempts += 1
+            job.updated_at = time.time()
+
+            with span("note.job", job_id=job.job_id, attempt=job.attempts) as job_span:
+                job.trace_id = job_span.trace_id
+                try:
+                    result = await create_note_from_history_async(
+                        job.chat_history,
+                        notion_page_id=job.notion_page_id,
+                        notion_token=job.notion_token,
+                        user_id=job.user_id,
+                        previous_summary=job.previous_summary,
+                        resume_state=resume_state,
+                        progress_callback=on_progress
+                    )
+                except Exception as e:
+                    result = {"success": False, "error": str(e), "state": resume_state or {}}
+                job_span.set(success=bool(result.get("success") and result.get("notion_write_success")))
+
+        job.result = result
+        if result.get("success") and result.get("notion_write_success"):
+            job.status = "succeeded"
+            if job.message_count is not None:
+                # Record under the page the note actually went to (the agent
+                # picks one when none was given), so a later note to that page
+                # only covers newer messages
+                page_id = result.get("notion_page_id") or job.notion_page_id
+                note_ledger.record(job.user_id, page_id, job.message_count, result.get("summary", ""))
+                if page_id != job.notion_page_id:
+                    # Also under the page as requested: the next note without a page lands there too
+                    note_ledger.record(job.user_id, job.notion_page_id, job.message_count, result.get("summary", ""))
+        else:
+            job.status = "failed"
+            job.error = result.get("error") or "Notion write failed"
+            if result.get("success"):
+                # The workflow ran but the write did not go through
+                job.stages["NotionWriterAgent"] = "failed"
+        job.updated_at = time.time()
+
+
+note_job_manager = NoteJobManager()
@@ -0,0 +1,210 @@
+"""
+LLM Response Cache
+
+Content-addressed, disk-backed cache of model responses, shared by the note
+workflow's generation stages. A response is keyed by the model, the prompt
+template (or agent) and the exact inputs, so a retried job or a duplicate
+note request skips generations it has already paid for.
+
+- ``LLMResponseCache``: the SQLite store, evicting least recently used
+  entries once it grows past ``LLM_CACHE_MAX_MB``
+- ``llm_cache_before_model`` / ``llm_cache_after_model``: ADK model
+  callbacks for LlmAgents
+- ``LangChainLLMCache``: the same store as a LangChain cache, for ChatGroq
+
+Set ``LLM_CACHE_ENABLED=false`` to turn caching off.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from tracing import record_span
+
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_MAX_MB = float(os.environ.get("LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_PATH = os.path.join(os.environ.get("NOTIONMATE_DATA_DIR", ".notionmate"), "llm_cache.sqlite3")
+
+
+def cache_key(model: str, template: str, inputs: Any) -> str:
+    """Content address of a generation: model, prompt template and inputs."""
+    payload = json.dumps({"model": model, "template": template, "inputs": inputs},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# Disk Store
+# ============================================================================
+
+class LLMResponseCache:
+    """
+    SQLite key -> response store with size-based LRU eviction.
+
+    Args:
+        path: SQLite file (":memory:" keeps the cache in memory)
+        max_bytes: Total size of stored responses before eviction starts
+        enabled: When False, lookups always miss and nothing is stored
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024),
+                 enabled: bool = LLM_CACHE_ENABLED):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Stored response for a key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """Store a response, evicting the least recently used ones if over size."""
+        if not self.enabled:
+            return
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Evict down to 90% so eviction does not run on every insert
+                excess = total - int(self.max_bytes * 0.9)
+                freed = 0
+                stale = []
+                for old_key, old_size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                    if freed >= excess:
+                        break
+                    stale.append((old_key,))
+                    freed += old_size
+                conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM responses")
+            self._connection().commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "hits": self.hits, "misses": self.misses}
+
+
+llm_response_cache = LLMResponseCache()
+
+
+# ============================================================================
+# ADK Model Callbacks
+# ============================================================================
+
+def _strip_call_ids(value: Any) -> Any:
+    """Drop per-call function IDs so identical turns share a key."""
+    if isinstance(value, dict):
+        return {k: _strip_call_ids(v) for k, v in value.items() if k != "id"}
+    if isinstance(value, list):
+        return [_strip_call_ids(v) for v in value]
+    return value
+
+
+def _request_key(agent_name: str, llm_request: LlmRequest) -> str:
+    config = llm_request.config
+    inputs = {
+        "system_instruction": str(config.system_instruction) if config and config.system_instruction else "",
+        "contents": _strip_call_ids([c.model_dump(mode="json", exclude_none=True) for c in llm_request.contents]),
+        "tools": sorted(llm_request.tools_dict),
+    }
+    return cache_key(llm_request.model or "", agent_name, inputs)
+
+
+def llm_cache_before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Answer the model call from the cache when the same request was seen before."""
+    key = _request_key(callback_context.agent_name, llm_request)
+    callback_context.state[f"temp:llm_cache_key:{callback_context.agent_name}"] = key
+
+    cached = llm_response_cache.get(key)
+    if cached is None:
+        return None
+    record_span("llm.cache_hit", time.time(), 0.0, agent=callback_context.agent_name)
+    try:
+        return LlmResponse.model_validate_json(cached)
+    except ValueError:
+        return None
+
+
+def llm_cache_after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """Store a complete, successful model response under its request's key."""
+    key = callback_context.state.get(f"temp:llm_cache_key:{callback_context.agent_name}")
+    if key and llm_response.content and not llm_response.error_code and not llm_response.partial:
+        llm_response_cache.set(key, llm_response.model_dump_json(exclude_none=True))
+    return None
+
+
+# ============================================================================
+# LangChain Cache
+# ============================================================================
+
+class LangChainLLMCache(BaseCache):
+    """LangChain cache (e.g. for ChatGroq) backed by the shared response store."""
+
+    def __init__(self, store: Optional[LLMResponseCache] = None):
+        self.store = store or llm_response_cache
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        cached = self.store.get(cache_key(llm_string, "langchain", prompt))
+        if cached is None:
+            return None
+        try:
+            return [loads(item) for item in json.loads(cached)]
+        except Exception:
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]):
+        self.store.set(cache_key(llm_string, "langchain", prompt), json.dumps([dumps(g) for g in return_val]))
+
+    def clear(self, **kwargs: Any):
+        self.store.clear()
@@ -0,0 +1,177 @@
+"""
+Markdown to Notion Compiler
+
+Deterministic, local replacement for the formatter LLM call. The summary
+produced by the summary agent is already Markdown, so it is parsed straight
+into (block_type, content) pairs for NotionFormatterAgent:
+
+- block level: headings, bulleted/numbered lists, to-dos, quotes, dividers,
+  fenced code and paragraphs
+- inline: bold, italic, bold-italic, strikethrough, inline code and links,
+  rendered as Notion rich-text annotations by ``parse_inline``
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from notion_agent.block_writer import split_rich_text
+
+
+# ============================================================================
+# Inline Markdown -> Rich Text
+# ============================================================================
+
+_INLINE_PATTERN = re.compile(
+    r"\*\*\*(?P<bold_italic>.+?)\*\*\*"
+    r"|\*\*(?P<bold>.+?)\*\*"
+    r"|__(?P<bold_alt>.+?)__"
+    r"|~~(?P<strike>.+?)~~"
+    r"|`(?P<code>[^`]+)`"
+    r"|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)\)"
+    r"|\*(?!\s)(?P<italic>.+?)(?<!\s)\*"
+    r"|(?<!\w)_(?!\s)(?P<italic_alt>.+?)(?<!\s)_(?!\w)"
+)
+
+# Match group -> annotations it adds to the enclosed text
+_INLINE_ANNOTATIONS = {
+    "bold_italic": {"bold": True, "italic": True},
+    "bold": {"bold": True},
+    "bold_alt": {"bold": True},
+    "strike": {"strikethrough": True},
+    "italic": {"italic": True},
+    "italic_alt": {"italic": True},
+}
+
+
+def _text_item(content: str, annotations: Dict[str, bool], url: Optional[str] = None) -> Dict[str, Any]:
+    text: Dict[str, Any] = {"content": content}
+    if url:
+        text["link"] = {"url": url}
+    item: Dict[str, Any] = {"type": "text", "text": text}
+    if annotations:
+        item["annotations"] = dict(annotations)
+    return item
+
+
+def _parse_inline(text: str, annotations: Dict[str, bool], url: Optional[str]) -> List[Dict[str, Any]]:
+    items = []
+    position = 0
+    for match in _INLINE_PATTERN.finditer(text):
+        if match.start() > position:
+            items.append(_text_item(text[position:match.start()], annotations, url))
+
+        group = match.lastgroup
+        if group == "code":
+            items.append(_text_item(match.group("code"), {**annotations, "code": True}, url))
+        elif group in ("link_text", "link_url"):
+            items.extend(_parse_inline(match.group("link_text"), annotations, match.group("link_url")))
+        else:
+            items.extend(_parse_inline(match.group(group), {**annotations, **_INLINE_ANNOTATIONS[group]}, url))
+        position = match.end()
+
+    if position < len(text):
+        items.append(_text_item(text[position:], annotations, url))
+    return items
+
+
+def parse_inline(text: str) -> List[Dict[str, Any]]:
+    """
+    Convert inline Markdown to Notion rich-text items.
+
+    Args:
+        text: Text that may contain inline Markdown
+
+    Returns:
+        list: Rich-text items, each at most 2000 characters long
+    """
+    if not text:
+        return [_text_item("", {})]
+    return split_rich_text(_parse_inline(text, {}, None))
+
+
+# ============================================================================
+# Block-level Markdown -> (block_type, content)
+# ============================================================================
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+_TODO = re.compile(r"^\s*[-*+]\s+\[([ xX])\]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_QUOTE = re.compile(r"^\s*>\s?(.*)$")
+_DIVIDER = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_FENCE = re.compile(r"^\s*```")
+
+
+def compile_markdown(markdown: str) -> List[Tuple[str, str]]:
+    """
+    Parse Markdown into Notion block types.
+
+    Args:
+        markdown: Markdown text (e.g. the generated summary)
+
+    Returns:
+        list: (block_type, content) pairs whose content keeps inline Markdown
+    """
+    blocks: List[Tuple[str, str]] = []
+    paragraph: List[str] = []
+    code: Optional[List[str]] = None
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(("paragraph", "\n".join(paragraph)))
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        if code is not None:
+            if _FENCE.match(line):
+                blocks.append(("code", "\n".join(code)))
+                code = None
+            else:
+                code.append(line)
+            continue
+
+        if _FENCE.match(line):
+            flush_paragraph()
+            code = []
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            flush_paragraph()
+            level = min(len(heading.group(1)), 3)
+            blocks.append((f"heading_{level}", heading.group(2)))
+            continue
+
+        if _DIVIDER.match(line):
+            flush_paragraph()
+            blocks.append(("divider", ""))
+            continue
+
+        todo = _TODO.match(line)
+        if todo:
+            flush_paragraph()
+            block_type = "to_do_checked" if todo.group(1).lower() == "x" else "to_do"
+            blocks.append((block_type, todo.group(2)))
+            continue
+
+        for pattern, block_type in ((_BULLET, "bulleted_list_item"),
+                                    (_NUMBERED, "numbered_list_item"),
+                                    (_QUOTE, "quote")):
+            match = pattern.match(line)
+            if match:
+                flush_paragraph()
+                blocks.append((block_type, match.group(1)))
+                break
+        else:
+            paragraph.append(line.strip())
+
+    # An unterminated fence still keeps its content
+    if code is not None:
+        blocks.append(("code", "\n".join(code)))
+    flush_paragraph()
+
+    return blocks
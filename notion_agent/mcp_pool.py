@@ -0,0 +1,216 @@
+"""
+Notion MCP Session Pool
+
+Keeps Notion MCP server processes warm between calls. Each pooled entry owns
+one long-lived stdio session (one ``npx @notionhq/notion-mcp-server`` process)
+for a Notion token, together with the tools loaded from it, so page listings
+and writes no longer pay for process start-up and npm resolution every time.
+
+Sessions are tied to the event loop that opened them, so there is one pool
+per running loop. Idle sessions are closed after ``NOTION_MCP_IDLE_TIMEOUT``
+seconds and at most ``NOTION_MCP_POOL_SIZE`` sessions are kept open. The
+background loop closes its pool (``close_all``) when it is stopped.
+"""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from anyio import BrokenResourceError, ClosedResourceError, EndOfStream
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+from notion_mcp_config import (
+    NOTION_MCP_IDLE_TIMEOUT,
+    NOTION_MCP_POOL_SIZE,
+    create_notion_servers_config,
+)
+from tracing import record_span
+
+
+# Errors meaning the server process or its stdio streams are gone
+_TRANSPORT_ERRORS = (BrokenResourceError, ClosedResourceError, EndOfStream, ConnectionError, EOFError)
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """Whether an error means the MCP session itself is broken (rather than one tool call failing)."""
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, _TRANSPORT_ERRORS)
+
+
+class _PooledSession:
+    """One warm MCP session and the tools bound to it."""
+
+    def __init__(self, notion_token: str):
+        self.notion_token = notion_token
+        self.tools: List[BaseTool] = []
+        self.error: Optional[Exception] = None
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.error is None and not self.stop.is_set() and not (self.task and self.task.done())
+
+
+class NotionMCPPool:
+    """
+    Pool of long-lived Notion MCP sessions keyed by Notion token.
+
+    Usage:
+        async with notion_mcp_pool().tools(notion_token) as tools:
+            search_tool = next(t for t in tools if "search" in t.name.lower())
+            await search_tool.ainvoke({"query": ""})
+    """
+
+    def __init__(self, max_size: int = NOTION_MCP_POOL_SIZE, idle_timeout: float = NOTION_MCP_IDLE_TIMEOUT):
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, _PooledSession] = {}
+        self._changed = asyncio.Condition()
+        self._reaper: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def _hold_session(self, entry: _PooledSession):
+        """Open the MCP session and keep it open until the entry is stopped."""
+        started, start_time = time.perf_counter(), time.time()
+        try:
+            client = MultiServerMCPClient(create_notion_servers_config(entry.notion_token))
+            async with client.session("notion") as session:
+                entry.tools = await load_mcp_tools(session)
+                record_span("mcp.startup", start_time, (time.perf_counter() - started) * 1000,
+                            tools=len(entry.tools))
+                entry.ready.set()
+                await entry.stop.wait()
+        except Exception as e:
+            entry.error = e
+        finally:
+            entry.ready.set()
+            if self._sessions.get(entry.notion_token) is entry:
+                del self._sessions[entry.notion_token]
+            async with self._changed:
+                self._changed.notify_all()
+
+    def _start_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle_sessions())
+
+    async def _reap_idle_sessions(self):
+        """Periodically close sessions that have been idle for too long."""
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while self._sessions:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for entry in list(self._sessions.values()):
+                if entry.in_use == 0 and now - entry.last_used > self.idle_timeout:
+                    entry.stop.set()
+
+    async def _acquire(self, notion_token: str) -> _PooledSession:
+        """Return a live session for the token, opening one if needed."""
+        if self._closed:
+            raise RuntimeError("Notion MCP pool is closed")
+
+        async with self._changed:
+            while True:
+                entry = self._sessions.get(notion_token)
+                if entry and entry.alive:
+                    break
+
+                if len(self._sessions) < self.max_size:
+                    entry = _PooledSession(notion_token)
+                    self._sessions[notion_token] = entry
+                    entry.task = asyncio.create_task(self._hold_session(entry))
+                    self._start_reaper()
+                    break
+
+                # Make room by closing the least recently used idle session
+                idle = [e for e in self._sessions.values() if e.in_use == 0]
+                if idle:
+                    oldest = min(idle, key=lambda e: e.last_used)
+                    oldest.stop.set()
+                    del self._sessions[oldest.notion_token]
+                    continue
+
+                # Every session is busy; wait for one to be released
+                await self._changed.wait()
+
+            entry.in_use += 1
+
+        await entry.ready.wait()
+        if entry.error:
+            await self._release(entry)
+            raise entry.error
+        return entry
+
+    async def _release(self, entry: _PooledSession):
+        entry.in_use -= 1
+        entry.last_used = time.monotonic()
+        async with self._changed:
+            self._changed.notify_all()
+
+    @asynccontextmanager
+    async def tools(self, notion_token: str) -> AsyncIterator[List[BaseTool]]:
+        """
+        Borrow the cached tool list of a warm session for the given token.
+
+        A session whose transport fails is discarded so the next caller gets
+        a fresh server process; tool errors and cancellations leave it in the
+        pool.
+        """
+        entry = await self._acquire(notion_token)
+        try:
+            yield entry.tools
+        except Exception as e:
+            if is_transport_error(e):
+                entry.stop.set()
+            raise
+        finally:
+            await self._release(entry)
+
+    async def warm(self, notion_token: str):
+        """Start a session for the token ahead of its first use."""
+        async with self.tools(notion_token):
+            pass
+
+    async def close(self):
+        """Shut down every pooled server process."""
+        self._closed = True
+        entries = list(self._sessions.values())
+        for entry in entries:
+            entry.stop.set()
+        tasks = [e.task for e in entries if e.task]
+        if self._reaper:
+            self._reaper.cancel()
+            tasks.append(self._reaper)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._sessions.clear()
+
+
+# One pool per event loop, since MCP sessions cannot move between loops
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, NotionMCPPool]" = weakref.WeakKeyDictionary()
+
+
+def notion_mcp_pool() -> NotionMCPPool:
+    """Return the Notion MCP pool for the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None or pool._closed:
+        pool = NotionMCPPool()
+        _pools[loop] = pool
+    return pool
+
+
+async def close_all():
+    """Close the running loop's pool; called by ``BackgroundEventLoop.stop`` before it drains."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,187 @@
+"""
+MCP Result Decoding
+
+Shared decoder for Notion responses returned by MCP tools.
+
+MCP tool results arrive either as structured content (already a dict) or as
+text content holding the Notion JSON response. Text is decoded in place with
+``json.JSONDecoder.raw_decode`` starting at the first ``{``, so there is no
+``str()`` round trip, no slicing copy, and no guessing with ``rfind('}')``.
+
+List responses (search, block children) are decoded lazily:
+``NotionListResponse`` yields one record at a time from the ``results``
+array, and reads ``has_more``/``next_cursor`` without decoding the records.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, Union
+
+from notion_agent.notion_errors import check_notion_error
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _skip_whitespace(text: str, idx: int) -> int:
+    return _WHITESPACE.match(text, idx).end()
+
+
+def mcp_result_payload(result: Any) -> Union[Dict[str, Any], str]:
+    """
+    Unwrap an MCP tool result to its structured content or JSON text.
+
+    Args:
+        result: Value returned by an MCP tool (dict, str, bytes, list of
+            content parts, or a message object with ``content``)
+
+    Returns:
+        dict for structured content, otherwise the text to decode
+    """
+    if isinstance(result, dict):
+        # Text content parts as dicts ({"type": "text", "text": ...})
+        if result.get("type") == "text" and "text" in result:
+            return result["text"]
+        return result
+    if isinstance(result, bytes):
+        return result.decode("utf-8")
+    if isinstance(result, str):
+        return result
+    if isinstance(result, (list, tuple)):
+        for part in result:
+            payload = mcp_result_payload(part)
+            if isinstance(payload, dict) or "{" in payload:
+                return payload
+        return ""
+    if hasattr(result, "text"):
+        return mcp_result_payload(result.text)
+    if hasattr(result, "content"):
+        return mcp_result_payload(result.content)
+    return str(result)
+
+
+def decode_mcp_result(result: Any) -> Dict[str, Any]:
+    """
+    Decode a complete Notion response from an MCP tool result.
+
+    Args:
+        result: Value returned by an MCP tool
+
+    Returns:
+        dict: Notion response, or an empty dict if the result holds no JSON
+    """
+    payload = mcp_result_payload(result)
+    if isinstance(payload, dict):
+        return check_notion_error(payload)
+
+    start = payload.find("{")
+    if start == -1:
+        return {}
+    value, _ = _decoder.raw_decode(payload, start)
+    return check_notion_error(value)
+
+
+class NotionListResponse:
+    """
+    Lazily decoded Notion list response.
+
+    Supports ``get``/``[]`` like the dict returned by the HTTP backend;
+    ``response["results"]`` is an iterator over the decoded records.
+    """
+
+    def __init__(self, text: str, start: int):
+        self._text = text
+        self._start = start
+
+    def _iter_top_level(self) -> Iterator:
+        """Yield (key, value_index) for each top-level key in order."""
+        text = self._text
+        idx = _skip_whitespace(text, self._start + 1)
+        while idx < len(text) and text[idx] != "}":
+            key, idx = _decoder.raw_decode(text, idx)
+            idx = _skip_whitespace(text, idx)
+            idx = _skip_whitespace(text, idx + 1)  # past ':'
+            yield key, idx
+            # The caller did not consume this value; step over it
+            _, idx = _decoder.raw_decode(text, idx)
+            idx = _skip_whitespace(text, idx)
+            if idx < len(text) and text[idx] == ",":
+                idx = _skip_whitespace(text, idx + 1)
+
+    def _iter_array(self, idx: int) -> Iterator[Any]:
+        """Decode array elements one at a time starting at '['."""
+        text = self._text
+        idx = _skip_whitespace(text, idx + 1)
+        if text[idx] == "]":
+            return
+        while True:
+            value, idx = _decoder.raw_decode(text, idx)
+            yield value
+            idx = _skip_whitespace(text, idx)
+            if text[idx] == "]":
+                return
+            idx = _skip_whitespace(text, idx + 1)  # past ','
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """Yield each record of the ``results`` array without building the list."""
+        for key, idx in self._iter_top_level():
+            if key == "results":
+                yield from self._iter_array(idx)
+                return
+
+    def _tail_value(self, key: str) -> Any:
+        """
+        Read a scalar top-level key such as ``next_cursor``.
+
+        Notion emits these after ``results``, and an unescaped ``"key":``
+        sequence can only occur as an object key, so the last occurrence
+        is the top-level one.
+        """
+        pos = self._text.rfind(f'"{key}":')
+        if pos < self._start:
+            return None
+        idx = _skip_whitespace(self._text, pos + len(key) + 3)
+        value, _ = _decoder.raw_decode(self._text, idx)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "results":
+            return self.iter_results()
+        value = self._tail_value(key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        return self.get(key)
+
+
+def decode_list_response(result: Any) -> Union[Dict[str, Any], NotionListResponse]:
+    """
+    Decode a Notion list response from an MCP tool result.
+
+    Args:
+        result: Value returned by an MCP search or list tool
+
+    Returns:
+        The structured dict if the tool returned one, otherwise a
+        NotionListResponse over the JSON text
+    """
+    payload = mcp_result_payload(result)
+    if isinstance(payload, dict):
+        return check_notion_error(payload)
+
+    start = payload.find("{")
+    if start == -1:
+        return {}
+
+    response = NotionListResponse(payload, start)
+    # Scan the top-level keys up to ``results`` (which error objects do not
+    # have), so an error is caught wherever its "object" key appears
+    for key, idx in response._iter_top_level():
+        if key == "results":
+            break
+        if key == "object" and _decoder.raw_decode(payload, idx)[0] == "error":
+            # Error objects are small; decode them fully so they raise
+            return decode_mcp_result(payload)
+
+    return response
@@ -0,0 +1,101 @@
+"""
+Note Ledger
+
+Remembers, per conversation and Notion page, how much of the conversation
+has already been written and the summary that was written last. The next
+note to the same page then summarizes only the messages added since, with
+the previous summary as context, instead of re-summarizing the whole chat.
+
+Entries are kept in a SQLite file under ``NOTIONMATE_DATA_DIR`` (default
+``.notionmate``), so every worker process sees the same marks and they
+survive app restarts.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+NOTIONMATE_DATA_DIR = os.environ.get("NOTIONMATE_DATA_DIR", ".notionmate")
+NOTE_LEDGER_PATH = os.path.join(NOTIONMATE_DATA_DIR, "note_ledger.sqlite3")
+
+
+class NoteLedger:
+    """
+    Per (conversation, page) high-water marks and cached summaries.
+
+    Args:
+        path: SQLite file (":memory:" keeps the ledger in memory)
+    """
+
+    def __init__(self, path: str = NOTE_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+            # WAL lets several worker processes read while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS notes "
+                "(conversation_id TEXT NOT NULL, page_id TEXT NOT NULL, message_count INTEGER NOT NULL, "
+                "summary TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (conversation_id, page_id))"
+            )
+        return self._conn
+
+    def get(self, conversation_id: str, page_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Look up what has already been written from a conversation to a page.
+
+        Returns:
+            dict: ``message_count`` (messages already covered) and ``summary``
+            (the last summary written), both empty for a first note
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT message_count, summary FROM notes WHERE conversation_id = ? AND page_id = ?",
+                (conversation_id, page_id or "")
+            ).fetchone()
+        if row is None:
+            return {"message_count": 0, "summary": ""}
+        return {"message_count": row[0], "summary": row[1]}
+
+    def record(self, conversation_id: str, page_id: Optional[str], message_count: int, summary: str):
+        """
+        Advance the high-water mark after a successful write.
+
+        Args:
+            conversation_id: Conversation the note was created from
+            page_id: Notion page the note was written to
+            message_count: Number of messages the note covers
+            summary: Summary that was written
+        """
+        with self._lock:
+            # Jobs can finish out of order (in any worker); never move the mark backwards
+            self._connection().execute(
+                "INSERT INTO notes VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (conversation_id, page_id) DO UPDATE SET "
+                "message_count = excluded.message_count, summary = excluded.summary, "
+                "updated_at = excluded.updated_at "
+                "WHERE excluded.message_count >= notes.message_count",
+                (conversation_id, page_id or "", message_count, summary, time.time())
+            )
+
+    def reset(self, conversation_id: str, page_id: Optional[str] = None):
+        """Forget a page's entry, or every entry of a conversation if no page is given."""
+        with self._lock:
+            if page_id is not None:
+                self._connection().execute(
+                    "DELETE FROM notes WHERE conversation_id = ? AND page_id = ?", (conversation_id, page_id)
+                )
+            else:
+                self._connection().execute("DELETE FROM notes WHERE conversation_id = ?", (conversation_id,))
+
+
+note_ledger = NoteLedger()
@@ -0,0 +1,171 @@
+"""
+Notion Backends
+
+The few Notion operations the app needs (search pages, append block children)
+behind one interface with two implementations. Every call is rate limited
+per integration token and retried on 429s (see rate_limit.py).
+
+- MCPNotionBackend: calls the Notion MCP server through the pooled sessions
+- HTTPNotionBackend: calls the Notion REST API directly over a shared
+  keep-alive ``httpx.AsyncClient``
+
+``get_notion_backend()`` returns the backend selected by ``NOTION_BACKEND``.
+"""
+
+import asyncio
+import atexit
+import weakref
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from notion_mcp_config import NOTION_API_BASE_URL, NOTION_API_VERSION, NOTION_BACKEND
+from notion_agent.mcp_pool import notion_mcp_pool
+from notion_agent.mcp_results import decode_list_response, decode_mcp_result
+from notion_agent.notion_errors import NotionAPIError
+from notion_agent.rate_limit import call_with_backoff
+from tracing import span
+
+
+def _search_body(query: str, start_cursor: Optional[str], page_size: Optional[int],
+                 sort: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """Build the request body shared by both backends' search calls."""
+    body: Dict[str, Any] = {"query": query}
+    if start_cursor:
+        body["start_cursor"] = start_cursor
+    if page_size:
+        body["page_size"] = page_size
+    if sort:
+        body["sort"] = sort
+    return body
+
+
+# ============================================================================
+# MCP Backend
+# ============================================================================
+
+class MCPNotionBackend:
+    """Notion operations through the pooled Notion MCP server."""
+
+    async def search(self, notion_token: str, query: str = "", start_cursor: Optional[str] = None,
+                     page_size: Optional[int] = None, sort: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        async def call():
+            async with notion_mcp_pool().tools(notion_token) as tools:
+                search_tool = next((t for t in tools if "search" in t.name.lower()), None)
+                if not search_tool:
+                    raise NotionAPIError("Search tool not found in MCP")
+                result = await search_tool.ainvoke(_search_body(query, start_cursor, page_size, sort))
+            return decode_list_response(result)
+
+        with span("notion.search", backend="mcp"):
+            return await call_with_backoff(notion_token, call)
+
+    async def append_block_children(self, notion_token: str, block_id: str,
+                                    children: List[Dict[str, Any]]) -> Dict[str, Any]:
+        async def call():
+            async with notion_mcp_pool().tools(notion_token) as tools:
+                append_blocks_tool = next((t for t in tools if "patch-block-children" in t.name.lower()), None)
+                if not append_blocks_tool:
+                    raise NotionAPIError("Append blocks tool not found in MCP")
+                result = await append_blocks_tool.ainvoke({"block_id": block_id, "children": children})
+            return decode_mcp_result(result)
+
+        with span("notion.append", backend="mcp", blocks=len(children)):
+            return await call_with_backoff(notion_token, call)
+
+
+# ============================================================================
+# HTTP Backend
+# ============================================================================
+
+# One keep-alive client per event loop, since httpx connections are loop-bound
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=NOTION_API_BASE_URL,
+            headers={"Notion-Version": NOTION_API_VERSION},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+            timeout=httpx.Timeout(30.0, connect=5.0)
+        )
+        _http_clients[loop] = client
+    return client
+
+
+@atexit.register
+def _close_http_clients():
+    """Close pooled connections on interpreter exit."""
+    for loop, client in list(_http_clients.items()):
+        if loop.is_closed() or loop.is_running():
+            continue
+        try:
+            loop.run_until_complete(client.aclose())
+        except Exception:
+            pass
+
+
+class HTTPNotionBackend:
+    """Notion operations over the Notion REST API."""
+
+    async def _request(self, method: str, path: str, notion_token: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        return await call_with_backoff(notion_token, lambda: self._send(method, path, notion_token, body))
+
+    async def _send(self, method: str, path: str, notion_token: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        response = await _http_client().request(
+            method,
+            path,
+            json=body,
+            headers={"Authorization": f"Bearer {notion_token}"}
+        )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if response.status_code >= 400:
+            retry_after = response.headers.get("Retry-After")
+            raise NotionAPIError(
+                payload.get("message", f"Notion API returned HTTP {response.status_code}"),
+                status=response.status_code,
+                code=payload.get("code"),
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        return payload
+
+    async def search(self, notion_token: str, query: str = "", start_cursor: Optional[str] = None,
+                     page_size: Optional[int] = None, sort: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        with span("notion.search", backend="http"):
+            return await self._request("POST", "/search", notion_token,
+                                       _search_body(query, start_cursor, page_size, sort))
+
+    async def append_block_children(self, notion_token: str, block_id: str,
+                                    children: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with span("notion.append", backend="http", blocks=len(children)):
+            return await self._request("PATCH", f"/blocks/{block_id}/children", notion_token,
+                                       {"children": children})
+
+
+_BACKENDS = {
+    "mcp": MCPNotionBackend,
+    "http": HTTPNotionBackend,
+}
+
+
+def get_notion_backend(name: Optional[str] = None):
+    """
+    Return the Notion backend selected in config.
+
+    Args:
+        name: Optional backend name overriding NOTION_BACKEND ("mcp" or "http")
+
+    Returns:
+        MCPNotionBackend or HTTPNotionBackend instance
+    """
+    backend_name = (name or NOTION_BACKEND).lower()
+    if backend_name not in _BACKENDS:
+        raise ValueError(f"Unknown Notion backend: {backend_name}")
+    return _BACKENDS[backend_name]()
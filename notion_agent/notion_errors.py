@@ -0,0 +1,30 @@
+"""
+Notion Errors
+
+Exception raised for Notion API error responses, shared by the Notion
+backends and the MCP result decoder.
+"""
+
+from typing import Any, Dict, Optional
+
+
+class NotionAPIError(Exception):
+    """Error response returned by the Notion API."""
+
+    def __init__(self, message: str, status: Optional[int] = None, code: Optional[str] = None,
+                 retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.retry_after = retry_after
+
+
+def check_notion_error(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Raise NotionAPIError if the payload is a Notion error object."""
+    if isinstance(payload, dict) and payload.get("object") == "error":
+        raise NotionAPIError(
+            payload.get("message", "Notion API error"),
+            status=payload.get("status"),
+            code=payload.get("code")
+        )
+    return payload
@@ -0,0 +1,177 @@
+"""
+Notion Page Directory
+
+Cached, indexed listing of the Notion pages an integration token can see.
+
+- Follows ``has_more``/``next_cursor`` so large workspaces are not truncated;
+  the next result page is requested while the current one is being indexed.
+- Caches one directory per token. Once the TTL expires, a refresh only
+  fetches pages edited since the newest ``last_edited_time`` already seen
+  (search sorted by ``last_edited_time``, stopping at the first older page).
+  A full reload runs every ``NOTION_PAGE_FULL_REFRESH`` seconds to drop
+  pages that were deleted or unshared.
+- Indexes pages by ID and by title, so lookups are O(1) and colliding titles
+  stay distinguishable.
+"""
+
+import asyncio
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from notion_mcp_config import NOTION_PAGE_CACHE_TTL, NOTION_PAGE_FULL_REFRESH
+from notion_agent.notion_backend import get_notion_backend
+
+
+SEARCH_PAGE_SIZE = 100
+NEWEST_FIRST = {"direction": "descending", "timestamp": "last_edited_time"}
+
+
+def extract_page_title(result: Dict[str, Any]) -> str:
+    """
+    Get the plain-text title of a Notion search result.
+
+    Args:
+        result: Page object from a Notion search response
+
+    Returns:
+        str: Page title, or "Untitled" if it has none
+    """
+    props = result.get("properties", {})
+    for prop_name, prop_value in props.items():
+        if prop_value.get("type") == "title":
+            title_array = prop_value.get("title", [])
+            if title_array and len(title_array) > 0:
+                return title_array[0].get("plain_text", "Untitled")
+    return "Untitled"
+
+
+class PageDirectory:
+    """Pages visible to one token, indexed by ID and title."""
+
+    def __init__(self):
+        self.by_id: Dict[str, Dict[str, str]] = {}
+        self.by_title: Dict[str, List[str]] = {}
+        self.high_water = ""
+        self.refreshed_at = 0.0
+        self.loaded_at = 0.0
+
+    def add(self, result: Dict[str, Any]):
+        """Insert or replace a page from a Notion search result."""
+        page_id = result.get("id")
+        if not page_id:
+            return
+
+        self.remove(page_id)
+        if result.get("archived") or result.get("in_trash"):
+            return
+
+        page = {
+            "id": page_id,
+            "title": extract_page_title(result),
+            "last_edited_time": result.get("last_edited_time", "")
+        }
+        self.by_id[page_id] = page
+        self.by_title.setdefault(page["title"], []).append(page_id)
+        # ISO-8601 timestamps compare correctly as strings
+        self.high_water = max(self.high_water, page["last_edited_time"])
+
+    def remove(self, page_id: str):
+        page = self.by_id.pop(page_id, None)
+        if page:
+            ids = self.by_title.get(page["title"], [])
+            if page_id in ids:
+                ids.remove(page_id)
+            if not ids:
+                self.by_title.pop(page["title"], None)
+
+    def get(self, page_id: str) -> Optional[Dict[str, str]]:
+        return self.by_id.get(page_id)
+
+    def find_by_title(self, title: str) -> List[Dict[str, str]]:
+        return [self.by_id[page_id] for page_id in self.by_title.get(title, [])]
+
+    def pages(self) -> List[Dict[str, str]]:
+        return list(self.by_id.values())
+
+
+async def _stream_search_results(notion_token: str, sort: Optional[Dict[str, str]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield every search result across all result pages.
+
+    The request for the next result page is started before the current
+    page's results are handed to the caller.
+    """
+    backend = get_notion_backend()
+    pending = asyncio.ensure_future(backend.search(notion_token, query="", page_size=SEARCH_PAGE_SIZE, sort=sort))
+    try:
+        while pending is not None:
+            response = await pending
+            pending = None
+            next_cursor = response.get("next_cursor")
+            if response.get("has_more") and next_cursor:
+                pending = asyncio.ensure_future(backend.search(
+                    notion_token, query="", start_cursor=next_cursor, page_size=SEARCH_PAGE_SIZE, sort=sort
+                ))
+            for result in response.get("results", []):
+                yield result
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+class PageDirectoryService:
+    """Per-token cache of PageDirectory objects."""
+
+    def __init__(self, ttl: float = NOTION_PAGE_CACHE_TTL, full_refresh: float = NOTION_PAGE_FULL_REFRESH):
+        self.ttl = ttl
+        self.full_refresh = full_refresh
+        self._directories: Dict[str, PageDirectory] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _load(self, notion_token: str) -> PageDirectory:
+        directory = PageDirectory()
+        async for result in _stream_search_results(notion_token):
+            directory.add(result)
+        directory.loaded_at = directory.refreshed_at = time.monotonic()
+        return directory
+
+    async def _refresh(self, notion_token: str, directory: PageDirectory):
+        """Apply pages edited since the directory's high-water mark."""
+        high_water = directory.high_water
+        async with aclosing(_stream_search_results(notion_token, sort=NEWEST_FIRST)) as results:
+            async for result in results:
+                if high_water and result.get("last_edited_time", "") < high_water:
+                    break
+                directory.add(result)
+        directory.refreshed_at = time.monotonic()
+
+    async def get_directory(self, notion_token: str, refresh: bool = False) -> PageDirectory:
+        """
+        Get the page directory for a token, loading or refreshing as needed.
+
+        Args:
+            notion_token: User's Notion integration token
+            refresh: Force an incremental refresh even if the TTL has not expired
+
+        Returns:
+            PageDirectory for the token
+        """
+        lock = self._locks.setdefault(notion_token, asyncio.Lock())
+        async with lock:
+            directory = self._directories.get(notion_token)
+            now = time.monotonic()
+
+            if directory is None or now - directory.loaded_at > self.full_refresh:
+                directory = await self._load(notion_token)
+                self._directories[notion_token] = directory
+            elif refresh or now - directory.refreshed_at > self.ttl:
+                await self._refresh(notion_token, directory)
+
+            return directory
+
+    def invalidate(self, notion_token: str):
+        self._directories.pop(notion_token, None)
+
+
+page_directory_service = PageDirectoryService()
@@ -0,0 +1,97 @@
+"""
+Notion Rate Limiting
+
+Notion allows roughly three requests per second per integration. Every
+backend call for a token goes through that token's shared token bucket, and
+rate-limited responses (HTTP 429 / ``rate_limited``) are retried with
+jittered exponential backoff, never sooner than ``Retry-After`` when it is
+given.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from notion_mcp_config import NOTION_RATE_LIMIT
+from notion_agent.notion_errors import NotionAPIError
+
+
+T = TypeVar("T")
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out request slots at a fixed rate.
+
+    Slots are reserved under a thread lock and the caller sleeps outside it,
+    so one bucket can be shared across event loops and threads.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def notion_rate_limiter(notion_token: str) -> TokenBucket:
+    """Return the shared token bucket for an integration token."""
+    with _buckets_lock:
+        bucket = _buckets.get(notion_token)
+        if bucket is None:
+            bucket = TokenBucket(rate=NOTION_RATE_LIMIT, capacity=max(1.0, NOTION_RATE_LIMIT))
+            _buckets[notion_token] = bucket
+        return bucket
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return isinstance(error, NotionAPIError) and (error.status == 429 or error.code == "rate_limited")
+
+
+async def call_with_backoff(notion_token: str, operation: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run a Notion call under the token's rate limit, retrying on 429s.
+
+    Args:
+        notion_token: Integration token whose bucket the call draws from
+        operation: Zero-argument coroutine factory performing the call
+
+    Returns:
+        The operation's result
+    """
+    bucket = notion_rate_limiter(notion_token)
+    for attempt in range(MAX_RETRIES + 1):
+        await bucket.acquire()
+        try:
+            return await operation()
+        except NotionAPIError as e:
+            if not is_rate_limited(e) or attempt == MAX_RETRIES:
+                raise
+            # Only the backoff is jittered; Retry-After is a floor, never shortened
+            backoff = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+            await asyncio.sleep(max(e.retry_after or 0.0, backoff))
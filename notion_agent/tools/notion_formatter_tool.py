@@ -5,10 +5,10 @@ Formats content into Notion blocks using the NotionFormatterAgent.
 """
 
 from google.adk.tools.tool_context import ToolContext
-from notion_agent.agents.notion_formatter_agent import NotionFormatterAgent
+from notion_agent.agents.notion_formatter_agent import get_notion_formatter
 
 
-def format_notion_blocks_tool(tool_context: ToolContext) -> str:
+async def format_notion_blocks_tool(tool_context: ToolContext) -> str:
     """Format content into Notion blocks"""
     topic = tool_context.state.get("topic", "Untitled Note")
     summary = tool_context.state.get("summary", "")
@@ -19,11 +19,11 @@ def format_notion_blocks_tool(tool_context: ToolContext) -> str:
         return error_msg
     
     try:
-        # Initialize formatter agent
-        formatter = NotionFormatterAgent()
+        # Shared formatter (and Groq client) for the configured mode
+        formatter = get_notion_formatter()
         
         # Format content
-        formatting = formatter.format_content(topic, summary, image_url)
+        formatting = await formatter.aformat_content(topic, summary, image_url)
         blocks = formatter.blocks_to_notion_format(formatting)
         
         # Store in session state
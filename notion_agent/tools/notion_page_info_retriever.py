@@ -3,64 +3,30 @@ Simplified Notion Writer using MCP tools directly
 Searches for pages, creates/updates them without LangGraph complexity
 """
 
-import json
 from dotenv import load_dotenv
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from notion_mcp_config import create_notion_servers_config
+from notion_agent.page_directory import page_directory_service
 
 load_dotenv()
 
 
-async def get_notion_pages(notion_token: str = None):
+async def get_notion_pages(notion_token: str = None, refresh: bool = False):
     """
     Get list of all available Notion pages
     
     Args:
         notion_token: User's Notion integration token
+        refresh: Check Notion for recently edited pages even if the cache is fresh
     
     Returns:
-        list: List of dicts with 'id' and 'title' keys
+        list: List of dicts with 'id', 'title' and 'last_edited_time' keys
     """
     try:
         if not notion_token:
             return []
         
-        servers_config = create_notion_servers_config(notion_token)
-        client = MultiServerMCPClient(servers_config)
-        tools = await client.get_tools()
-        
-        search_tool = next((t for t in tools if "search" in t.name.lower()), None)
-        if not search_tool:
-            return []
-        
-        # Search for all pages
-        search_result = await search_tool.ainvoke({"query": ""})
-        result_str = str(search_result)
-        
-        pages = []
-        if '"results":[' in result_str:
-            json_start = result_str.find('{"object":')
-            json_end = result_str.rfind('}') + 1
-            if json_start != -1 and json_end > json_start:
-                results_json = json.loads(result_str[json_start:json_end])
-                if 'results' in results_json:
-                    for result in results_json['results']:
-                        page_id = result.get('id')
-                        page_title = "Untitled"
-                        
-                        if 'properties' in result:
-                            props = result['properties']
-                            for prop_name, prop_value in props.items():
-                                if prop_value.get('type') == 'title':
-                                    title_array = prop_value.get('title', [])
-                                    if title_array and len(title_array) > 0:
-                                        page_title = title_array[0].get('plain_text', 'Untitled')
-                                        break
-                        
-                        pages.append({"id": page_id, "title": page_title})
-        
-        return pages
+        # All result pages, served from the per-token directory cache
+        directory = await page_directory_service.get_directory(notion_token, refresh=refresh)
+        return directory.pages()
         
     except Exception as e:
         return []
-
@@ -1,18 +1,18 @@
 """
 Notion Writer Tool
 
-Writes formatted blocks to Notion pages using MCP tools.
+Writes formatted blocks to Notion pages through the configured Notion backend.
+A note already written to the page (e.g. a retried job) is skipped.
 """
 
-import asyncio
-import json
 from google.adk.tools.tool_context import ToolContext
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from notion_mcp_config import create_notion_servers_config
+from notion_agent.block_writer import write_note
+from notion_agent.tools.notion_page_info_retriever import get_notion_pages
+from notion_agent.write_ledger import note_key
 
 
-def write_to_notion_tool(tool_context: ToolContext) -> str:
-    """Write formatted blocks to Notion page using MCP tools"""
+async def write_to_notion_tool(tool_context: ToolContext) -> str:
+    """Write formatted blocks to Notion page using the configured Notion backend"""
     notion_blocks = tool_context.state.get("notion_blocks", [])
     notion_page_id = tool_context.state.get("notion_page_id")
     notion_token = tool_context.state.get("notion_token")
@@ -29,75 +29,48 @@ def write_to_notion_tool(tool_context: ToolContext) -> str:
     
     async def write_async():
         try:
-            # Initialize MCP client with user's token
-            servers_config = create_notion_servers_config(notion_token)
-            client = MultiServerMCPClient(servers_config)
-            tools = await client.get_tools()
-            
-            # Find tools
-            search_tool = next((t for t in tools if "search" in t.name.lower()), None)
-            append_blocks_tool = next((t for t in tools if "patch-block-children" in t.name.lower()), None)
-            
-            if not append_blocks_tool:
-                return {"success": False, "error": "Append blocks tool not found in MCP"}
-            
             # Get page if not provided
             target_page_id = notion_page_id
-            page_title = "Specified Page"
+            page_title = tool_context.state.get("notion_page_title") or "Specified Page"
             
             if not target_page_id:
-                if not search_tool:
-                    return {"success": False, "error": "Search tool not found in MCP"}
-                
                 # Get first available page
-                search_result = await search_tool.ainvoke({"query": ""})
-                result_str = str(search_result)
-                
-                if '"results":[' in result_str:
-                    json_start = result_str.find('{"object":')
-                    json_end = result_str.rfind('}') + 1
-                    if json_start != -1 and json_end > json_start:
-                        results_json = json.loads(result_str[json_start:json_end])
-                        if 'results' in results_json and len(results_json['results']) > 0:
-                            first_result = results_json['results'][0]
-                            target_page_id = first_result.get('id')
-                            page_title = "Untitled"
-                            
-                            if 'properties' in first_result:
-                                props = first_result['properties']
-                                for prop_name, prop_value in props.items():
-                                    if prop_value.get('type') == 'title':
-                                        title_array = prop_value.get('title', [])
-                                        if title_array and len(title_array) > 0:
-                                            page_title = title_array[0].get('plain_text', 'Untitled')
-                                            break
-                        else:
-                            return {"success": False, "error": "No pages found in Notion workspace"}
-                else:
+                pages = await get_notion_pages(notion_token)
+                if not pages:
                     return {"success": False, "error": "No pages found in Notion workspace"}
+                target_page_id = pages[0]["id"]
+                page_title = pages[0]["title"]
             
-            # Write blocks
-            await append_blocks_tool.ainvoke({
-                "block_id": target_page_id,
-                "children": notion_blocks
-            })
+            # Write blocks in ordered batches under the token's rate limit,
+            # skipping a note the page already has
+            key = note_key(tool_context.state.get("topic", ""), tool_context.state.get("summary", ""),
+                           tool_context.state.get("image_url", ""))
+            written = await write_note(notion_token, target_page_id, notion_blocks, key)
             
             return {
                 "success": True,
                 "page_id": target_page_id,
-                "page_title": page_title
+                "page_title": page_title,
+                "skipped": written["skipped"]
             }
             
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    # Run async function with nest_asyncio support
+    # Runs on the workflow's own event loop
     try:
-        result = asyncio.run(write_async())
+        result = await write_async()
         
+        if result["success"] and result["skipped"] == "busy":
+            # Another job holds the write; it may still fail, so retry this job later
+            tool_context.state["notion_write_success"] = False
+            return (f"Failed to write to Notion: the same note is already being written to "
+                    f"'{result['page_title']}'; retry once that write has finished")
         if result["success"]:
             tool_context.state["notion_write_success"] = True
             tool_context.state["notion_page_title"] = result["page_title"]
+            if result["skipped"] == "written":
+                return f"Note already written to Notion page: '{result['page_title']}' (duplicate write skipped)"
             return f"Successfully written to Notion page: '{result['page_title']}'"
         else:
             tool_context.state["notion_write_success"] = False
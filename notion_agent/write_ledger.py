@@ -0,0 +1,159 @@
+"""
+Notion Write Ledger
+
+Makes note writes idempotent. Every note is identified by a hash of its
+content (see ``note_key``), and each (page, hash) pair records the blocks
+sent on the first attempt and how many of them Notion has confirmed:
+
+- a note already written to a page is skipped without calling Notion, so a
+  double-clicked "Write to Notion" or a retried job does not duplicate it
+- a write that failed part-way resumes after the last confirmed batch, with
+  the blocks of the first attempt (a re-run formatter stamps a new time)
+- a write in progress is claimed, so the same note sent twice at once (from
+  any worker process) is only written once
+
+Entries are kept in a SQLite file under ``NOTIONMATE_DATA_DIR`` (default
+``.notionmate``).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+NOTIONMATE_DATA_DIR = os.environ.get("NOTIONMATE_DATA_DIR", ".notionmate")
+WRITE_LEDGER_PATH = os.path.join(NOTIONMATE_DATA_DIR, "notion_writes.sqlite3")
+
+# A claim not updated for this long belongs to a crashed writer and can be taken over
+CLAIM_TIMEOUT_SECONDS = 300
+
+
+def content_hash(content: Any) -> str:
+    """Stable hash of JSON-serializable content (key order and whitespace do not matter)."""
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def note_key(topic: str, summary: str, image_url: Optional[str]) -> str:
+    """
+    Idempotency key of a note.
+
+    Hashes what the note says rather than its blocks, which carry the time
+    the formatter ran and so differ between two runs of the same note.
+    """
+    return content_hash({"topic": topic or "", "summary": summary or "", "image_url": image_url or ""})
+
+
+class WriteLedger:
+    """
+    Per (page, content hash) write progress.
+
+    Args:
+        path: SQLite file (":memory:" keeps the ledger in memory)
+    """
+
+    def __init__(self, path: str = WRITE_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS writes "
+                "(page_id TEXT NOT NULL, content_hash TEXT NOT NULL, status TEXT NOT NULL, "
+                "blocks_confirmed INTEGER NOT NULL, total_blocks INTEGER NOT NULL, updated_at REAL NOT NULL, "
+                "blocks TEXT, PRIMARY KEY (page_id, content_hash))"
+            )
+        return self._conn
+
+    def claim(self, page_id: str, content_hash: str,
+              blocks: List[Dict[str, Any]]) -> Tuple[str, int, List[Dict[str, Any]]]:
+        """
+        Reserve a note's write to a page.
+
+        Args:
+            page_id: Page the note is written to
+            content_hash: The note's idempotency key
+            blocks: Blocks to write if this is the first attempt
+
+        Returns:
+            tuple: (status, confirmed, blocks). Status is ``"written"`` if
+            the note is already on the page, ``"busy"`` if another writer
+            holds the claim, or ``"claimed"``, in which case the blocks after
+            the first ``confirmed`` are to be written (those of the first
+            attempt when resuming)
+        """
+        with self._lock:
+            conn = self._connection()
+            # IMMEDIATE takes the write lock up front, so two processes cannot both claim
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT status, blocks_confirmed, total_blocks, updated_at, blocks FROM writes "
+                    "WHERE page_id = ? AND content_hash = ?", (page_id, content_hash)
+                ).fetchone()
+                confirmed = 0
+                if row is not None:
+                    status, confirmed, total, updated_at, stored_blocks = row
+                    if status == "written":
+                        conn.execute("COMMIT")
+                        return "written", total, blocks
+                    if status == "writing" and time.time() - updated_at < CLAIM_TIMEOUT_SECONDS:
+                        conn.execute("COMMIT")
+                        return "busy", confirmed, blocks
+                    blocks = json.loads(stored_blocks)
+                conn.execute(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, 'writing', ?, ?, ?, ?)",
+                    (page_id, content_hash, confirmed, len(blocks), time.time(),
+                     json.dumps(blocks, ensure_ascii=False))
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return "claimed", confirmed, blocks
+
+    def _update(self, sql: str, params: tuple):
+        with self._lock:
+            self._connection().execute(sql, params)
+
+    def confirm(self, page_id: str, content_hash: str, blocks_confirmed: int):
+        """Record that Notion accepted the note's blocks up to ``blocks_confirmed``."""
+        self._update(
+            "UPDATE writes SET blocks_confirmed = ?, updated_at = ? WHERE page_id = ? AND content_hash = ?",
+            (blocks_confirmed, time.time(), page_id, content_hash)
+        )
+
+    def complete(self, page_id: str, content_hash: str):
+        """Mark the note as fully written to the page."""
+        self._update(
+            "UPDATE writes SET status = 'written', blocks_confirmed = total_blocks, blocks = NULL, updated_at = ? "
+            "WHERE page_id = ? AND content_hash = ?",
+            (time.time(), page_id, content_hash)
+        )
+
+    def release(self, page_id: str, content_hash: str):
+        """Give up the claim after a failed write, keeping the confirmed progress."""
+        self._update(
+            "UPDATE writes SET status = 'partial', updated_at = ? WHERE page_id = ? AND content_hash = ?",
+            (time.time(), page_id, content_hash)
+        )
+
+    def forget(self, page_id: str, content_hash: Optional[str] = None):
+        """Drop one note's record (or a page's), e.g. after its blocks were deleted in Notion."""
+        if content_hash is None:
+            self._update("DELETE FROM writes WHERE page_id = ?", (page_id,))
+        else:
+            self._update("DELETE FROM writes WHERE page_id = ? AND content_hash = ?", (page_id, content_hash))
+
+
+write_ledger = WriteLedger()
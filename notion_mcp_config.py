@@ -1,17 +1,52 @@
 import os 
+import shlex
 from dotenv import load_dotenv
 
 # Load environment variables (API keys, etc.)
 _ = load_dotenv()
 
-# Get NPX path from environment (required for all configurations)
+# Get NPX path from environment (needed for the MCP backend unless NOTION_MCP_COMMAND is set)
 NPX_EXECUTABLE_PATH = os.environ.get("NPX_EXECUTABLE_PATH")
 
-# Validate that the NPX executable path is available
-if not NPX_EXECUTABLE_PATH:
-    print("Error: NPX_EXECUTABLE_PATH not found in environment variables.")
-    print("Please make sure you have a .env file with NPX_EXECUTABLE_PATH=/path/to/npx")
-    exit(1)
+# Optional full command that replaces "npx -y @notionhq/notion-mcp-server",
+# e.g. a local stub MCP server for offline benchmarks
+NOTION_MCP_COMMAND = os.environ.get("NOTION_MCP_COMMAND", "")
+
+
+# MCP session pool limits: warm server processes kept per event loop, and how
+# long an unused one may sit idle before it is shut down
+NOTION_MCP_POOL_SIZE = int(os.environ.get("NOTION_MCP_POOL_SIZE", "4"))
+NOTION_MCP_IDLE_TIMEOUT = float(os.environ.get("NOTION_MCP_IDLE_TIMEOUT", "300"))
+
+
+# Backend used for Notion API calls: "mcp" goes through the Notion MCP server,
+# "http" talks to the Notion REST API directly over a pooled HTTP client
+NOTION_BACKEND = os.environ.get("NOTION_BACKEND", "mcp").lower()
+NOTION_API_BASE_URL = os.environ.get("NOTION_API_BASE_URL", "https://api.notion.com/v1")
+NOTION_API_VERSION = os.environ.get("NOTION_API_VERSION", "2022-06-28")
+
+# Page directory cache: seconds before an incremental refresh of a token's
+# page list, and before a full reload that also drops deleted pages
+NOTION_PAGE_CACHE_TTL = float(os.environ.get("NOTION_PAGE_CACHE_TTL", "60"))
+NOTION_PAGE_FULL_REFRESH = float(os.environ.get("NOTION_PAGE_FULL_REFRESH", "3600"))
+
+# Requests per second allowed per Notion integration token
+NOTION_RATE_LIMIT = float(os.environ.get("NOTION_RATE_LIMIT", "3"))
+
+
+def notion_config_error():
+    """
+    Check that the Notion integration can start.
+
+    A missing setting only disables writing to Notion; the chat app keeps working.
+
+    Returns:
+        str: Why the integration is unavailable, or None when it is configured
+    """
+    if NOTION_BACKEND == "mcp" and not NPX_EXECUTABLE_PATH and not NOTION_MCP_COMMAND:
+        return ("NPX_EXECUTABLE_PATH not found in environment variables. "
+                "Add NPX_EXECUTABLE_PATH=/path/to/npx to your .env file, or set NOTION_BACKEND=http.")
+    return None
 
 
 def create_notion_servers_config(notion_token: str):
@@ -27,11 +62,20 @@ def create_notion_servers_config(notion_token: str):
     if not notion_token:
         raise ValueError("Notion token is required")
     
+    config_error = notion_config_error()
+    if config_error:
+        raise ValueError(config_error)
+    
+    if NOTION_MCP_COMMAND:
+        command, *args = shlex.split(NOTION_MCP_COMMAND)
+    else:
+        command, args = NPX_EXECUTABLE_PATH, ["-y", "@notionhq/notion-mcp-server"]
+    
     return {
         "notion": {
             "transport": "stdio",
-            "command": NPX_EXECUTABLE_PATH,
-            "args": ["-y", "@notionhq/notion-mcp-server"],
+            "command": command,
+            "args": args,
             "env": {
                 "NOTION_TOKEN": notion_token
             }
@@ -42,5 +86,6 @@ def create_notion_servers_config(notion_token: str):
 # Default SERVERS config (uses env var if available, otherwise None)
 # This is kept for backward compatibility but will be replaced by user input
 DEFAULT_NOTION_TOKEN = os.environ.get("NOTION_TOKEN")
-SERVERS = create_notion_servers_config(DEFAULT_NOTION_TOKEN) if DEFAULT_NOTION_TOKEN else None
+SERVERS = (create_notion_servers_config(DEFAULT_NOTION_TOKEN)
+           if DEFAULT_NOTION_TOKEN and not notion_config_error() else None)
 
@@ -0,0 +1,190 @@
+"""
+Batch Question Answering
+
+Answers a file of questions against the knowledge base without the chat UI,
+for evaluation runs and bulk FAQ generation:
+
+- questions are embedded with the same query embedding as the chat
+  retriever, and all retrieval happens before any answer is generated
+  (the snapshot store searches every query embedding in one matrix product)
+- answers are generated concurrently, at most ``BATCH_QA_CONCURRENCY`` LLM
+  calls at a time, with the same RAG prompt as the chat (``get_rag_prompt``)
+- each result is appended to the output JSONL file as soon as it is ready
+
+Questions are read from a text file (one per line) or a JSONL file with a
+``question`` field and an optional ``id``.
+
+Usage:
+    python -m rag_component.batch_qa questions.txt --output answers.jsonl
+    python -m rag_component.batch_qa questions.jsonl --concurrency 16 --k 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from rag_component.chat_service import RETRIEVER_K, VECTOR_STORE_BACKEND, load_chat_llm, load_vector_store
+from tracing import span, token_usage
+
+
+BATCH_QA_CONCURRENCY = int(os.environ.get("BATCH_QA_CONCURRENCY", "8"))
+
+
+def load_questions(path: str) -> List[Dict[str, Any]]:
+    """
+    Read questions from a text or JSONL file.
+
+    Returns:
+        list: ``{"id", "question"}`` dicts in file order
+    """
+    questions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                questions.append({"id": record.get("id", line_number), "question": record["question"]})
+            else:
+                questions.append({"id": line_number, "question": line})
+    return questions
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+# ============================================================================
+# Retrieval
+# ============================================================================
+
+def retrieve_batch(questions: List[str], k: int = RETRIEVER_K) -> List[List[str]]:
+    """
+    Embed each question as a query and fetch its top-k chunks.
+
+    Returns:
+        list: For each question, the text of its retrieved chunks
+    """
+    vector_store = load_vector_store()
+
+    # embed_query, as the chat retriever does (query and document embeddings can differ)
+    with span("batch_qa.embed", questions=len(questions)):
+        embeddings = [vector_store.embeddings.embed_query(question) for question in questions]
+
+    with span("batch_qa.search", questions=len(questions), k=k):
+        if VECTOR_STORE_BACKEND == "snapshot":
+            # One matrix search for all embeddings instead of a search per question
+            hits_per_question = vector_store.search_batch(embeddings, k)
+        else:
+            hits_per_question = [vector_store.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+                                 for embedding in embeddings]
+    return [[doc.page_content for doc, _ in hits] for hits in hits_per_question]
+
+
+# ============================================================================
+# Generation
+# ============================================================================
+
+async def _answer_one(llm, prompt, item: Dict[str, Any], contexts: List[str],
+                      slots: asyncio.Semaphore) -> Dict[str, Any]:
+    prompt_value = prompt.invoke({
+        "conversation_history": "",
+        "context": "\n\n".join(contexts),
+        "input": item["question"]
+    })
+    async with slots:
+        start = time.perf_counter()
+        try:
+            with span("llm.call", model=llm.model_name, batch=True) as llm_span:
+                message = await llm.ainvoke(prompt_value)
+                usage = token_usage(message)
+                llm_span.set(**usage)
+            return {**item, "answer": message.content, "contexts": contexts,
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 2), **usage}
+        except Exception as e:
+            return {**item, "answer": None, "error": str(e), "contexts": contexts,
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def run_batch_qa(questions: List[Dict[str, Any]], output_path: str,
+                       concurrency: int = BATCH_QA_CONCURRENCY, k: int = RETRIEVER_K) -> Dict[str, Any]:
+    """
+    Answer a batch of questions and stream the results to a JSONL file.
+
+    Args:
+        questions: ``{"id", "question"}`` dicts
+        output_path: JSONL file results are appended to, in completion order
+        concurrency: Maximum concurrent LLM calls
+        k: Chunks retrieved per question
+
+    Returns:
+        dict: Throughput report
+    """
+    from rag_component.prompt import get_rag_prompt
+
+    llm = load_chat_llm()
+    prompt = get_rag_prompt()
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    with span("batch_qa", questions=len(questions), concurrency=concurrency) as batch_span:
+        start = time.perf_counter()
+        contexts = await asyncio.to_thread(retrieve_batch, [q["question"] for q in questions], k)
+        retrieval_time = time.perf_counter() - start
+
+        latencies, failed, total_tokens = [], 0, 0
+        with open(output_path, "a", encoding="utf-8") as out:
+            tasks = [_answer_one(llm, prompt, item, ctx, slots) for item, ctx in zip(questions, contexts)]
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                latencies.append(result["latency_ms"])
+                failed += 1 if result.get("error") else 0
+                total_tokens += result.get("total_tokens", 0)
+
+        wall_time = time.perf_counter() - start
+        batch_span.set(failed=failed, total_tokens=total_tokens)
+
+    return {
+        "questions": len(questions),
+        "failed": failed,
+        "concurrency": concurrency,
+        "retrieval_s": round(retrieval_time, 3),
+        "wall_time_s": round(wall_time, 3),
+        "throughput_questions_per_s": round(len(questions) / wall_time, 3) if wall_time else None,
+        "llm_latency_p50_ms": _percentile(latencies, 0.5),
+        "llm_latency_p95_ms": _percentile(latencies, 0.95),
+        "total_tokens": total_tokens,
+    }
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    os.environ["OTEL_SDK_DISABLED"] = "true"
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("questions", help="Text file (one question per line) or JSONL with a 'question' field")
+    parser.add_argument("--output", default="answers.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=BATCH_QA_CONCURRENCY)
+    parser.add_argument("--k", type=int, default=RETRIEVER_K, help="Chunks retrieved per question")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    if not questions:
+        print(f"No questions found in {args.questions}", file=sys.stderr)
+        sys.exit(1)
+
+    report = asyncio.run(run_batch_qa(questions, args.output, args.concurrency, args.k))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Chat Service
+
+The RAG chat and PDF ingestion logic shared by the Streamlit UI (main.py)
+and the HTTP API (api_server.py):
+
+- ``answer`` / ``aanswer`` / ``astream_answer``: answer a question from the
+  vector store context and the recent conversation
+- ``ingest_pdf``: parse, split and embed an uploaded PDF into the vector store
+- ``submit_note_job``: queue a note from a chat session's newest messages
+
+Messages are plain ``{"role": ..., "content": ...}`` dicts, whichever client
+they come from.
+
+LangChain, Chroma, the embedding model, Groq and the Notion workflow are
+imported on first use, so importing this module (and starting the UI) stays
+fast.
+"""
+
+import asyncio
+import os
+import threading
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List
+
+from tracing import span, token_usage
+
+
+DB_CHROMA_PATH = "vector_store/chroma_index"
+# "chroma" (default) or "snapshot" for versioned single-writer snapshots shared
+# by several worker processes (see index_snapshots.py)
+VECTOR_STORE_BACKEND = os.environ.get("VECTOR_STORE_BACKEND", "chroma").lower()
+CHAT_MODEL = "openai/gpt-oss-120b"
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+RETRIEVER_K = 5
+# Recent messages included in the prompt as conversation history
+CONTEXT_MESSAGES = 12
+
+# Chunking for ingestion (compare settings with benchmarks/chunking_sweep.py)
+CHUNK_SIZE = int(os.environ.get("CHUNK_SIZE", "500"))
+CHUNK_OVERLAP = int(os.environ.get("CHUNK_OVERLAP", "50"))
+
+Message = Dict[str, str]
+
+# Chroma writes are not safe to interleave within one process (snapshot
+# publishing is additionally serialized across processes by a file lock)
+_ingest_lock = threading.Lock()
+_near_duplicates = None
+
+
+# ============================================================================
+# Shared Resources
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def load_embeddings():
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, model_kwargs={"local_files_only": False})
+
+
+@lru_cache(maxsize=None)
+def load_vector_store():
+    embedding_model = load_embeddings()
+    if VECTOR_STORE_BACKEND == "snapshot":
+        from rag_component.index_snapshots import SnapshotVectorStore
+        return SnapshotVectorStore(embedding_model)
+
+    from langchain_community.vectorstores import Chroma
+    vector_store = Chroma(persist_directory=DB_CHROMA_PATH, embedding_function=embedding_model)
+    return vector_store
+
+
+@lru_cache(maxsize=None)
+def load_chat_llm():
+    from langchain_groq import ChatGroq
+
+    # One Groq client for all chat turns and sessions
+    return ChatGroq(model=CHAT_MODEL)
+
+
+# ============================================================================
+# Chat History Formatting
+# ============================================================================
+
+def format_docs(retrieved_docs):
+    context_text = "\n\n".join(doc.page_content for doc in retrieved_docs)
+    return context_text
+
+
+def format_chat_history(messages: List[Message], max_messages=CONTEXT_MESSAGES):
+    """Format recent messages into a conversation history string."""
+    recent = messages[-max_messages:] if messages else []
+    formatted = []
+    for msg in recent:
+        formatted.append(f"[{msg['role']}] {msg['content']}")
+    return "\n".join(formatted)
+
+
+# ============================================================================
+# Question Answering
+# ============================================================================
+
+def _prompt_chain(messages: List[Message], vector_store):
+    """Retrieval + prompt chain for one turn; ``messages`` includes the new question."""
+    from langchain_core.runnables import RunnableLambda, RunnableParallel, RunnablePassthrough
+
+    from rag_component.prompt import call_prompt
+
+    retriever = vector_store.as_retriever(search_type="similarity", search_kwargs={"k": RETRIEVER_K})
+    chat_history = format_chat_history(messages)
+
+    def search_vector_store(query):
+        with span("vector_search", k=RETRIEVER_K) as search_span:
+            docs = retriever.invoke(query)
+            search_span.set(results=len(docs))
+        return docs
+
+    parallel_chain = RunnableParallel({
+        'context': RunnableLambda(lambda x: search_vector_store(x["input"])) | RunnableLambda(format_docs),
+        'conversation_history': RunnableLambda(lambda _: chat_history),
+        'input': RunnablePassthrough()
+    })
+    return parallel_chain | call_prompt()
+
+
+def answer(query: str, messages: List[Message]) -> str:
+    """
+    Answer a question with RAG context.
+
+    Args:
+        query: The user's question
+        messages: Conversation so far, ending with the question
+
+    Returns:
+        str: The assistant's answer
+    """
+    from langchain_core.output_parsers import StrOutputParser
+
+    llm = load_chat_llm()
+    # Run the chain step by step so each stage gets its own span
+    with span("chat.turn"):
+        with span("prompt.build"):
+            prompt_value = _prompt_chain(messages, load_vector_store()).invoke({'input': query})
+        with span("llm.call", model=llm.model_name) as llm_span:
+            message = llm.invoke(prompt_value)
+            llm_span.set(**token_usage(message))
+        return StrOutputParser().invoke(message)
+
+
+async def aanswer(query: str, messages: List[Message]) -> str:
+    """Async variant of ``answer``."""
+    from langchain_core.output_parsers import StrOutputParser
+
+    llm = load_chat_llm()
+    with span("chat.turn"):
+        with span("prompt.build"):
+            # The first call loads the embedding model; keep it off the event loop
+            vector_store = await asyncio.to_thread(load_vector_store)
+            prompt_value = await _prompt_chain(messages, vector_store).ainvoke({'input': query})
+        with span("llm.call", model=llm.model_name) as llm_span:
+            message = await llm.ainvoke(prompt_value)
+            llm_span.set(**token_usage(message))
+        return StrOutputParser().invoke(message)
+
+
+async def astream_answer(query: str, messages: List[Message]) -> AsyncIterator[str]:
+    """Stream the answer to a question as text chunks."""
+    llm = load_chat_llm()
+    with span("chat.turn", stream=True):
+        with span("prompt.build"):
+            vector_store = await asyncio.to_thread(load_vector_store)
+            prompt_value = await _prompt_chain(messages, vector_store).ainvoke({'input': query})
+        with span("llm.call", model=llm.model_name, stream=True) as llm_span:
+            usage = None
+            async for chunk in llm.astream(prompt_value):
+                if chunk.usage_metadata:
+                    usage = chunk
+                if chunk.content:
+                    yield chunk.content
+            if usage is not None:
+                llm_span.set(**token_usage(usage))
+
+
+# ============================================================================
+# PDF Ingestion
+# ============================================================================
+
+def process_pdf_file(data: bytes, name: str = "upload.pdf"):
+    """Parse a PDF's bytes (or reuse its cached page text) and return its documents."""
+    from rag_component.pdf_text_cache import load_pdf_pages
+
+    return load_pdf_pages(data, name)
+
+
+def split_documents(documents):
+    """Split documents into chunks for processing."""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+    with span("pdf.split", documents=len(documents)) as split_span:
+        split_docs = text_splitter.split_documents(documents)
+        split_span.set(chunks=len(split_docs))
+    return split_docs
+
+
+def _near_duplicate_index(vector_store):
+    """
+    The process-wide near-duplicate index, up to date with other processes.
+
+    Call while holding the index's ``lock()``. On first use without a saved
+    index, the chunks already in the vector store are signed.
+    """
+    global _near_duplicates
+    from rag_component.near_dedup import NearDuplicateIndex
+
+    if _near_duplicates is None:
+        _near_duplicates = NearDuplicateIndex()
+    if not _near_duplicates.exists():
+        # Index built before near-duplicate detection: sign its chunks once
+        if VECTOR_STORE_BACKEND == "snapshot":
+            snapshot = vector_store.snapshot()
+            texts = [doc.page_content for doc in snapshot.documents] if snapshot else []
+        else:
+            texts = vector_store.get(include=["documents"])["documents"]
+        _near_duplicates.reset()
+        _near_duplicates.add_texts(texts)
+        _near_duplicates.save()
+    # Pick up chunks other processes have ingested since
+    _near_duplicates.load()
+    return _near_duplicates
+
+
+def update_vector_store(documents, vector_store):
+    """Add new documents to the existing vector store, skipping near-duplicate chunks."""
+    from rag_component.near_dedup import filter_near_duplicates, index_lock
+
+    split_docs = split_documents(documents)
+    # The file lock keeps other worker processes from ingesting (and saving
+    # signatures) between our load and save
+    with _ingest_lock, index_lock():
+        near_duplicates = _near_duplicate_index(vector_store)
+        with span("pdf.dedupe", chunks=len(split_docs)) as dedupe_span:
+            split_docs, skipped = filter_near_duplicates(split_docs, near_duplicates)
+            dedupe_span.set(skipped=skipped)
+
+        with span("embed.add_documents", chunks=len(split_docs)):
+            try:
+                if split_docs:
+                    vector_store.add_documents(split_docs)
+                    if VECTOR_STORE_BACKEND == "chroma":
+                        vector_store.persist()
+            except Exception:
+                near_duplicates.discard_unsaved()
+                raise
+        near_duplicates.save()
+    return len(split_docs)
+
+
+def ingest_pdf(data: bytes, name: str = "upload.pdf") -> int:
+    """
+    Add a PDF to the knowledge base.
+
+    Args:
+        data: PDF file contents
+        name: Original file name (for tracing and messages)
+
+    Returns:
+        int: Number of chunks added
+    """
+    with span("pdf.ingest", file=name):
+        documents = process_pdf_file(data, name)
+        return update_vector_store(documents, load_vector_store())
+
+
+# ============================================================================
+# Note Jobs
+# ============================================================================
+
+def submit_note_job(session_id: str, page_id: str = None, notion_token: str = None):
+    """
+    Queue note creation in the background.
+
+    Only the messages added since the last note written to the same page are
+    summarized; the previous note is passed along as context.
+
+    Args:
+        session_id: Chat session (see chat_store.py) to create the note from
+        page_id: Optional specific Notion page ID to write to
+        notion_token: User's Notion integration token
+
+    Returns:
+        tuple: (job_id, None) on success, or (None, error message)
+    """
+    from notion_agent.jobs import note_job_manager
+    from notion_agent.note_ledger import note_ledger
+    from rag_component.chat_store import chat_history_store
+
+    if not notion_token:
+        return None, "❌ Please enter your Notion Integration Token first."
+
+    message_count = chat_history_store.count(session_id)
+    written = note_ledger.get(session_id, page_id)
+    start = written["message_count"] if written["message_count"] <= message_count else 0
+    chat_history = chat_history_store.history_text(session_id, start, message_count)
+    if not chat_history:
+        if start:
+            return None, "ℹ️ No new messages since the last note to this page."
+        return None, "❌ No chat history available to create a note."
+
+    job_id = note_job_manager.submit(
+        session_id,
+        chat_history,
+        page_id,
+        notion_token,
+        previous_summary=written["summary"] if start else "",
+        message_count=message_count
+    )
+    return job_id, None
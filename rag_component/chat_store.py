@@ -0,0 +1,131 @@
+"""
+Chat History Store
+
+Append-only chat sessions for the Streamlit app and the HTTP API
+(api_server.py). Messages are kept in a SQLite file under
+``NOTIONMATE_DATA_DIR`` (default ``.notionmate``), so every worker process
+sees the same sessions and history survives restarts.
+
+Reads are windowed (the most recent N messages), and each message is stored
+with its serialized ``[role] content`` line, so rendering a chat or building
+its history for a note does not re-format the whole conversation.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
+NOTIONMATE_DATA_DIR = os.environ.get("NOTIONMATE_DATA_DIR", ".notionmate")
+CHAT_HISTORY_PATH = os.path.join(NOTIONMATE_DATA_DIR, "chat_history.sqlite3")
+
+
+class ChatHistoryStore:
+    """
+    SQLite-backed chat sessions and their messages.
+
+    Args:
+        path: SQLite file (":memory:" keeps the history in memory)
+    """
+
+    def __init__(self, path: str = CHAT_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            # WAL lets several worker processes read while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL, created_at REAL NOT NULL, line TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)")
+            self._conn.commit()
+        return self._conn
+
+    def create_session(self, session_id: Optional[str] = None) -> str:
+        """Start a new chat session (with a given ID, if not taken yet) and return its ID."""
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created_at) VALUES (?, ?)", (session_id, time.time())
+            )
+            conn.commit()
+        return session_id
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row is not None
+
+    def append(self, session_id: str, role: str, content: str):
+        """Add a message to the end of a session."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO messages (session_id, role, content, created_at, line) VALUES (?, ?, ?, ?, ?)",
+                (session_id, role, content, time.time(), f"[{role}] {content}")
+            )
+            conn.commit()
+
+    def count(self, session_id: str) -> int:
+        """Number of messages in a session."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+
+    def messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        A session's messages in order, as ``{"role", "content"}`` dicts.
+
+        Args:
+            session_id: Chat session
+            limit: Only return the most recent ``limit`` messages
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, -1 if limit is None else limit)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def history_text(self, session_id: str, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Serialized chat history of messages ``start`` to ``end``, without system messages.
+
+        Returns:
+            str: ``[role] content`` lines, as expected by the note workflow
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT role, line FROM messages WHERE session_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                (session_id, -1 if end is None else max(0, end - start), start)
+            ).fetchall()
+        return "\n".join(line for role, line in rows if role != "system")
+
+    def delete(self, session_id: str):
+        """Remove a session and its messages."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.commit()
+
+
+chat_history_store = ChatHistoryStore()
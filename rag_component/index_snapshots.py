@@ -0,0 +1,343 @@
+"""
+Vector Index Snapshots
+
+A single-writer, many-reader vector store for running several UI or API
+worker processes against one knowledge base, used instead of sharing the
+Chroma directory when ``VECTOR_STORE_BACKEND=snapshot``.
+
+- Every ingest publishes a new immutable snapshot directory
+  (``v000001``, ``v000002``, ...) holding the normalized embedding matrix
+  (``embeddings.npy``), the chunk texts and metadata (``documents.jsonl``)
+  and a ``manifest.json``.
+- The ``CURRENT`` file names the live snapshot and is switched atomically
+  with ``os.replace`` once a snapshot is complete.
+- Writers serialize on an exclusive file lock, so at most one process
+  builds a snapshot at a time; readers never take the lock.
+- Readers memory-map the embedding matrix, so the OS page cache shares it
+  between worker processes, and check ``CURRENT`` at most every
+  ``VECTOR_SNAPSHOT_POLL_SECONDS`` to switch to a newer version. Queries
+  already running keep using the snapshot they started with.
+- Only the newest ``VECTOR_SNAPSHOT_RETENTION`` snapshots are kept.
+
+Usage (one-off migration of the existing Chroma index, reusing its embeddings):
+    python -m rag_component.index_snapshots migrate-chroma
+    python -m rag_component.index_snapshots status
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from tracing import span
+
+
+VECTOR_SNAPSHOT_DIR = os.environ.get("VECTOR_SNAPSHOT_DIR", "vector_store/snapshots")
+VECTOR_SNAPSHOT_RETENTION = int(os.environ.get("VECTOR_SNAPSHOT_RETENTION", "3"))
+VECTOR_SNAPSHOT_POLL_SECONDS = float(os.environ.get("VECTOR_SNAPSHOT_POLL_SECONDS", "2"))
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".writer.lock"
+EMBEDDINGS_FILE = "embeddings.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+# Query embeddings scored per matrix product in batch searches
+SEARCH_BATCH_SIZE = 64
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so a dot product is the cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# ============================================================================
+# Snapshots
+# ============================================================================
+
+class Snapshot:
+    """One published, immutable version of the index."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = os.path.basename(path)
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        embeddings_path = os.path.join(path, EMBEDDINGS_FILE)
+        # Memory-mapped read-only: pages are shared with every other reader process
+        self.embeddings = np.load(embeddings_path, mmap_mode="r") if self.manifest["count"] else None
+
+        self.documents: List[Document] = []
+        with open(os.path.join(path, DOCUMENTS_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                self.documents.append(Document(page_content=record["text"], metadata=record["metadata"]))
+
+    def __len__(self) -> int:
+        return self.manifest["count"]
+
+    def search(self, query_embeddings: np.ndarray, k: int) -> List[List[Tuple[Document, float]]]:
+        """Top-k (document, cosine similarity) pairs for each normalized query row."""
+        if self.embeddings is None:
+            return [[] for _ in range(len(query_embeddings))]
+
+        k = min(k, len(self))
+        results = []
+        for start in range(0, len(query_embeddings), SEARCH_BATCH_SIZE):
+            scores = query_embeddings[start:start + SEARCH_BATCH_SIZE] @ self.embeddings.T
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for row, candidates in zip(scores, top):
+                ranked = candidates[np.argsort(-row[candidates])]
+                results.append([(self.documents[i], float(row[i])) for i in ranked])
+        return results
+
+
+class SnapshotStore:
+    """
+    Publishes and opens versioned snapshots under one directory.
+
+    Args:
+        root: Directory holding the snapshot versions and the CURRENT pointer
+        retention: Number of newest snapshots kept on disk
+    """
+
+    def __init__(self, root: str = VECTOR_SNAPSHOT_DIR, retention: int = VECTOR_SNAPSHOT_RETENTION):
+        self.root = root
+        self.retention = max(1, retention)
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def open(self, version: Optional[str] = None) -> Optional[Snapshot]:
+        """Open a snapshot (the current one by default), or None if none is published."""
+        version = version or self.current_version()
+        return Snapshot(os.path.join(self.root, version)) if version else None
+
+    @contextmanager
+    def writer_lock(self) -> Iterator[None]:
+        """Exclusive lock held while building and publishing a snapshot."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, LOCK_FILE), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def publish(self, texts: List[str], metadatas: List[dict], embeddings: Any,
+                replace: bool = False) -> str:
+        """
+        Publish a new snapshot with the given chunks added to the current one.
+
+        Args:
+            texts: Chunk texts
+            metadatas: Chunk metadata, one dict per text
+            embeddings: Chunk embeddings, one row per text
+            replace: Start from an empty index instead of the current snapshot
+
+        Returns:
+            str: The new snapshot's version
+        """
+        new_embeddings = _normalize(embeddings) if texts else None
+
+        with self.writer_lock(), span("index.publish", chunks=len(texts)) as publish_span:
+            previous = None if replace else self.open()
+            next_number = int(previous.version[1:]) + 1 if previous else self._last_number() + 1
+            version = f"v{next_number:06d}"
+
+            # Build in a temporary directory so readers never see a partial snapshot
+            building = os.path.join(self.root, f".building-{uuid.uuid4().hex}")
+            os.makedirs(building)
+            try:
+                parts = [m for m in (previous.embeddings if previous else None, new_embeddings) if m is not None]
+                matrix = np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+                np.save(os.path.join(building, EMBEDDINGS_FILE), matrix)
+
+                documents_path = os.path.join(building, DOCUMENTS_FILE)
+                if previous:
+                    shutil.copyfile(os.path.join(previous.path, DOCUMENTS_FILE), documents_path)
+                with open(documents_path, "a", encoding="utf-8") as f:
+                    for text, metadata in zip(texts, metadatas):
+                        f.write(json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False) + "\n")
+
+                with open(os.path.join(building, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                    json.dump({
+                        "version": version,
+                        "parent": previous.version if previous else None,
+                        "count": int(matrix.shape[0]),
+                        "dim": int(matrix.shape[1]) if matrix.size else 0,
+                        "created_at": time.time(),
+                    }, f)
+
+                os.rename(building, os.path.join(self.root, version))
+            except BaseException:
+                shutil.rmtree(building, ignore_errors=True)
+                raise
+
+            pointer = os.path.join(self.root, f"{CURRENT_FILE}.tmp")
+            with open(pointer, "w", encoding="utf-8") as f:
+                f.write(version)
+            os.replace(pointer, os.path.join(self.root, CURRENT_FILE))
+            publish_span.set(version=version, total=int(matrix.shape[0]))
+
+            self._prune()
+        return version
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if name.startswith("v") and name[1:].isdigit())
+
+    def _last_number(self) -> int:
+        versions = self.versions()
+        return int(versions[-1][1:]) if versions else 0
+
+    def _prune(self):
+        """Delete snapshots beyond the retention limit (open memory maps stay valid)."""
+        current = self.current_version()
+        for version in self.versions()[:-self.retention]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
+
+
+# ============================================================================
+# LangChain Vector Store
+# ============================================================================
+
+class SnapshotVectorStore(VectorStore):
+    """
+    LangChain vector store over the published snapshots.
+
+    Searches read the current snapshot (refreshed at most every
+    ``poll_seconds``); ``add_texts`` embeds the texts and publishes a new
+    snapshot under the writer lock.
+    """
+
+    def __init__(self, embedding: Embeddings, root: str = VECTOR_SNAPSHOT_DIR,
+                 poll_seconds: float = VECTOR_SNAPSHOT_POLL_SECONDS):
+        self._embedding = embedding
+        self.store = SnapshotStore(root)
+        self.poll_seconds = poll_seconds
+        self._snapshot: Optional[Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def snapshot(self) -> Optional[Snapshot]:
+        """The current snapshot, switching to a newer version if one was published."""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.poll_seconds:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = now
+            version = self.store.current_version()
+            if version and (self._snapshot is None or self._snapshot.version != version):
+                with span("index.load", version=version):
+                    self._snapshot = self.store.open(version)
+        return self._snapshot
+
+    def search_batch(self, query_embeddings: List[List[float]], k: int = 4) -> List[List[Tuple[Document, float]]]:
+        """Top-k documents and scores for many query embeddings in one pass."""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return [[] for _ in query_embeddings]
+        return snapshot.search(_normalize(query_embeddings), k)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.search_batch([self._embedding.embed_query(query)], k)[0]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.search_batch([embedding], k)[0]]
+
+    def _select_relevance_score_fn(self):
+        # Scores are already cosine similarities in [-1, 1]
+        return lambda score: (score + 1) / 2
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        embeddings = self._embedding.embed_documents(texts)
+        self.store.publish(texts, metadatas, embeddings)
+        # Read our own write on the next search
+        self._checked_at = 0.0
+        return [uuid.uuid4().hex for _ in texts]
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   root: str = VECTOR_SNAPSHOT_DIR, **kwargs: Any) -> "SnapshotVectorStore":
+        """Publish a fresh index holding only these texts."""
+        metadatas = metadatas or [{} for _ in texts]
+        SnapshotStore(root).publish(texts, metadatas, embedding.embed_documents(texts), replace=True)
+        return cls(embedding, root)
+
+
+# ============================================================================
+# Command Line
+# ============================================================================
+
+def migrate_chroma(chroma_path: str, root: str = VECTOR_SNAPSHOT_DIR) -> str:
+    """Publish the existing Chroma index as a snapshot, reusing its stored embeddings."""
+    import chromadb
+
+    client = chromadb.PersistentClient(path=chroma_path)
+    collection = client.get_collection("langchain")
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    return SnapshotStore(root).publish(
+        data["documents"],
+        [metadata or {} for metadata in data["metadatas"]],
+        data["embeddings"],
+        replace=True
+    )
+
+
+def main():
+    from rag_component.chat_service import DB_CHROMA_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate-chroma", "status"])
+    parser.add_argument("--root", default=VECTOR_SNAPSHOT_DIR)
+    parser.add_argument("--chroma-path", default=DB_CHROMA_PATH)
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.root)
+    if args.command == "migrate-chroma":
+        print(f"Published snapshot {migrate_chroma(args.chroma_path, args.root)}")
+
+    snapshot = store.open()
+    print(json.dumps({
+        "root": args.root,
+        "current": snapshot.manifest if snapshot else None,
+        "versions": store.versions(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,13 @@
-from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter 
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS, Chroma
+from rag_component.chat_service import CHUNK_OVERLAP, CHUNK_SIZE
+from rag_component.near_dedup import NearDuplicateIndex, filter_near_duplicates
+from rag_component.pdf_text_cache import load_pdf_directory
 DATA_PATH = "data/"
 def load_pdf(data):
-    loader= DirectoryLoader(
-        data,
-        glob="**/*.pdf",
-        loader_cls=PyPDFLoader
-        )
-    documents = loader.load()
+    # Page text is only extracted for PDFs not seen before (or after a parser upgrade)
+    documents = load_pdf_directory(data)
     return documents
 
 docs = load_pdf(data=DATA_PATH)
@@ -18,8 +16,8 @@ print(f"Total number of documents: {len(docs)}")
 
 def split_documents(documents):
     text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
     )
     split_docs = text_splitter.split_documents(documents)
     return split_docs
@@ -28,6 +26,12 @@ splitted_docs = split_documents(documents = docs)
 
 print(f"Total number of splitted documents: {len(splitted_docs)}")
 
+# Full rebuild: start a fresh near-duplicate index alongside the new vector store
+near_duplicates = NearDuplicateIndex()
+near_duplicates.reset()
+splitted_docs, skipped = filter_near_duplicates(splitted_docs, near_duplicates)
+print(f"Skipped {skipped} near-duplicate chunks, embedding {len(splitted_docs)}")
+
 embeddings =HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
     # return GoogleGenerativeAIEmbeddings()
 
@@ -37,4 +41,6 @@ DB_Chroma_PATH = "vector_store/chroma_index"
 vector_store = Chroma.from_documents(splitted_docs, embedding=embeddings, persist_directory=DB_Chroma_PATH)
 # vector_store.save_local(DB_Chroma_PATH)
 vector_store.persist()
+with near_duplicates.lock():
+    near_duplicates.save()
 print(f"Chroma index saved at {DB_Chroma_PATH}")
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Near-Duplicate Chunk Detection
+
+MinHash/LSH filter applied to chunks before they are embedded, so revised
+editions or re-uploaded copies of a PDF do not fill the index (and the top-k
+retrieval results) with near-identical chunks.
+
+- Each chunk is reduced to a MinHash signature over its word shingles.
+- Signatures are banded into an LSH table; only chunks sharing a band are
+  compared, and a chunk counts as a near-duplicate when its estimated
+  Jaccard similarity reaches ``NEAR_DUP_THRESHOLD``.
+- Near-duplicates of chunks already in the index are skipped. Near-duplicates
+  within one upload are merged: only the first is kept, and it records the
+  other chunks' sources in its ``also_in`` metadata.
+- Signatures of indexed chunks are saved next to the vector store, so later
+  uploads are checked against everything ingested before. The file carries
+  a generation number, and ``lock()`` serializes load, filter and save
+  across worker processes, so no worker overwrites another's signatures.
+
+Set ``NEAR_DUP_ENABLED=false`` to embed every chunk.
+"""
+
+import fcntl
+import os
+import re
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+NEAR_DUP_ENABLED = os.environ.get("NEAR_DUP_ENABLED", "true").lower() in ("1", "true", "yes")
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.85"))
+NEAR_DUP_INDEX_PATH = os.environ.get("NEAR_DUP_INDEX_PATH", "vector_store/near_dup_signatures.npz")
+
+NUM_PERM = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a band
+BAND_ROWS = 8
+SHINGLE_WORDS = 5
+
+# Mersenne prime 2^31 - 1 keeps (a * x + b) within uint64 without overflow
+_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+
+
+@contextmanager
+def index_lock(path: Optional[str] = NEAR_DUP_INDEX_PATH) -> Iterator[None]:
+    """File lock serializing updates to the signature file at ``path`` across processes."""
+    if not path:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> List[str]:
+    """Overlapping word n-grams of normalized text (the whole text if shorter)."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class MinHasher:
+    """MinHash signatures from ``num_perm`` random universal hash functions."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        # Fixed seed: signatures saved by one process must match those of the next
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles(text)), dtype=np.uint64
+        )
+        return ((self.a * hashes + self.b) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+# ============================================================================
+# LSH Index
+# ============================================================================
+
+class NearDuplicateIndex:
+    """
+    LSH index of chunk signatures.
+
+    Args:
+        threshold: Estimated Jaccard similarity at which chunks are near-duplicates
+        path: File signatures are persisted to (None keeps them in memory)
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, path: Optional[str] = NEAR_DUP_INDEX_PATH):
+        self.threshold = threshold
+        self.path = path
+        self.hasher = MinHasher()
+        self._signatures: List[np.ndarray] = []
+        self._bands: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(NUM_PERM // BAND_ROWS)]
+        self._loaded_generation: Optional[int] = None
+        self._saved_count = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _insert(self, signature: np.ndarray) -> int:
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, table in enumerate(self._bands):
+            table[signature[band * BAND_ROWS:(band + 1) * BAND_ROWS].tobytes()].append(index)
+        return index
+
+    def find(self, signature: np.ndarray) -> Optional[int]:
+        """Position of the most similar near-duplicate, or None."""
+        candidates = set()
+        for band, table in enumerate(self._bands):
+            candidates.update(table.get(signature[band * BAND_ROWS:(band + 1) * BAND_ROWS].tobytes(), ()))
+
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            score = float(np.mean(self._signatures[candidate] == signature))
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def add_texts(self, texts: Sequence[str]):
+        for text in texts:
+            self._insert(self.hasher.signature(text))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def exists(self) -> bool:
+        return bool(self.path) and os.path.exists(self.path)
+
+    def lock(self):
+        """Exclusive lock across processes, held from ``load`` to ``save`` of an ingest."""
+        return index_lock(self.path)
+
+    def _read(self, signatures: bool) -> Tuple[int, Optional[np.ndarray]]:
+        with np.load(self.path) as data:
+            return int(data["generation"]), data["signatures"] if signatures else None
+
+    def load(self):
+        """(Re)load saved signatures if another process saved since the last load."""
+        if not self.exists():
+            return
+        generation, _ = self._read(signatures=False)
+        if generation == self._loaded_generation:
+            return
+        generation, signatures = self._read(signatures=True)
+        self.reset()
+        for signature in signatures:
+            self._insert(signature)
+        self._loaded_generation = generation
+        self._saved_count = len(self._signatures)
+
+    def save(self):
+        """Write the signatures under a new generation; call while holding ``lock()``."""
+        if not self.path or len(self._signatures) == self._saved_count:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        generation = (self._read(signatures=False)[0] if self.exists() else 0) + 1
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, generation=np.array(generation), signatures=np.stack(self._signatures)
+                     if self._signatures else np.zeros((0, NUM_PERM), dtype=np.uint32))
+        os.replace(temp_path, self.path)
+        self._loaded_generation = generation
+        self._saved_count = len(self._signatures)
+
+    def discard_unsaved(self):
+        """Drop signatures added since the last save (e.g. when embedding failed)."""
+        self._loaded_generation = None
+        self.reset()
+        self.load()
+
+    def reset(self):
+        """Forget every signature (e.g. before a full index rebuild)."""
+        self._signatures = []
+        self._bands = [defaultdict(list) for _ in range(NUM_PERM // BAND_ROWS)]
+        self._saved_count = 0
+
+
+# ============================================================================
+# Document Filter
+# ============================================================================
+
+def _source_label(metadata: dict) -> str:
+    source = os.path.basename(str(metadata.get("source", "?")))
+    page = metadata.get("page")
+    return f"{source} p{page + 1}" if isinstance(page, int) else source
+
+
+def filter_near_duplicates(documents: list, index: NearDuplicateIndex) -> Tuple[list, int]:
+    """
+    Drop chunks that near-duplicate indexed chunks or earlier chunks of the batch.
+
+    Kept chunks are added to the index; call ``index.save()`` once they have
+    been embedded.
+
+    Args:
+        documents: LangChain documents (chunks) about to be embedded
+        index: Near-duplicate index of the chunks already embedded
+
+    Returns:
+        tuple: (documents to embed, number of near-duplicates skipped)
+    """
+    if not NEAR_DUP_ENABLED:
+        return list(documents), 0
+
+    batch_start = len(index)
+    kept = []
+    for doc in documents:
+        signature = index.hasher.signature(doc.page_content)
+        match = index.find(signature)
+        if match is None:
+            index._insert(signature)
+            kept.append(doc)
+        elif match >= batch_start:
+            # Duplicate within this upload: keep one chunk and note where else it appears
+            original = kept[match - batch_start]
+            label = _source_label(doc.metadata)
+            also_in = original.metadata.get("also_in")
+            if label != _source_label(original.metadata) and label not in (also_in or "").split("; "):
+                original.metadata["also_in"] = f"{also_in}; {label}" if also_in else label
+    return kept, len(documents) - len(kept)
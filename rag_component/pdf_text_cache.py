@@ -0,0 +1,150 @@
+"""
+PDF Text Cache
+
+Persistent cache of the per-page text PyPDFLoader extracts from a PDF, so
+re-uploads, index rebuilds (memory_creator.py) and chunking experiments
+start from cached text instead of re-running the parser.
+
+- Entries are keyed by the SHA-256 of the file contents and the parser
+  version (pypdf and langchain-community), so a parser upgrade re-extracts.
+- Each entry is one zstd-compressed JSON file of page texts and metadata
+  under ``PDF_TEXT_CACHE_DIR`` (default ``NOTIONMATE_DATA_DIR/pdf_text``),
+  written atomically.
+
+Set ``PDF_TEXT_CACHE_ENABLED=false`` to always parse.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from importlib import metadata
+from typing import Any, Dict, List, Optional
+
+from tracing import span
+
+
+PDF_TEXT_CACHE_ENABLED = os.environ.get("PDF_TEXT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PDF_TEXT_CACHE_DIR = os.environ.get(
+    "PDF_TEXT_CACHE_DIR", os.path.join(os.environ.get("NOTIONMATE_DATA_DIR", ".notionmate"), "pdf_text")
+)
+
+# Bump when the stored layout changes
+CACHE_FORMAT = 1
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "none"
+
+
+PARSER_VERSION = (f"pypdf-{_package_version('pypdf')}"
+                  f"_lc-{_package_version('langchain-community')}_f{CACHE_FORMAT}")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class PDFTextCache:
+    """
+    Extracted page text keyed by file hash and parser version.
+
+    Args:
+        directory: Where the compressed entries are stored
+        enabled: When False, every lookup misses and nothing is stored
+    """
+
+    def __init__(self, directory: str = PDF_TEXT_CACHE_DIR, enabled: bool = PDF_TEXT_CACHE_ENABLED,
+                 parser_version: str = PARSER_VERSION):
+        self.directory = directory
+        self.enabled = enabled
+        self.parser_version = parser_version
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.directory, f"{file_hash}-{self.parser_version}.json.zst")
+
+    def get(self, file_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached pages (``{"text", "metadata"}`` dicts), or None on a miss."""
+        import zstandard
+
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(file_hash), "rb") as f:
+                return json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+        except (OSError, ValueError, zstandard.ZstdError):
+            # A missing or corrupt entry only costs a re-parse
+            return None
+
+    def set(self, file_hash: str, pages: List[Dict[str, Any]]):
+        import zstandard
+
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        payload = zstandard.ZstdCompressor(level=10).compress(
+            json.dumps(pages, ensure_ascii=False).encode("utf-8")
+        )
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(temp_path, self._path(file_hash))
+
+
+pdf_text_cache = PDFTextCache()
+
+
+def load_pdf_pages(data: bytes, name: str, cache: Optional[PDFTextCache] = None) -> list:
+    """
+    Page documents of a PDF, from the cache or extracted with PyPDFLoader.
+
+    Args:
+        data: PDF file contents
+        name: File name recorded as each page's ``source``
+        cache: Cache to use (the shared one by default)
+
+    Returns:
+        list: LangChain documents, one per page
+    """
+    from langchain_core.documents import Document
+
+    cache = cache or pdf_text_cache
+    file_hash = content_hash(data)
+    pages = cache.get(file_hash)
+
+    with span("pdf.parse", file=name, cached=pages is not None) as parse_span:
+        if pages is None:
+            from langchain_community.document_loaders import PyPDFLoader
+
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+                temp_file.write(data)
+                temp_path = temp_file.name
+            try:
+                documents = PyPDFLoader(temp_path).load()
+            finally:
+                os.unlink(temp_path)
+
+            pages = [{
+                "text": doc.page_content,
+                "metadata": {key: value for key, value in doc.metadata.items() if key != "source"}
+            } for doc in documents]
+            cache.set(file_hash, pages)
+        parse_span.set(pages=len(pages))
+
+    return [Document(page_content=page["text"], metadata={**page["metadata"], "source": name}) for page in pages]
+
+
+def load_pdf_directory(directory: str, cache: Optional[PDFTextCache] = None) -> list:
+    """Page documents of every PDF under a directory, with the file path as ``source``."""
+    documents = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    documents.extend(load_pdf_pages(f.read(), path, cache))
+    return documents
@@ -0,0 +1,289 @@
+"""
+Tracing
+
+Lightweight in-process span tracing for the chat and note pipelines, used
+instead of OpenTelemetry (which stays disabled) so timings are available
+without an external collector.
+
+- ``span(name, **attributes)``: context manager timing a block; nested spans
+  (also across asyncio tasks and LangChain worker threads) share a trace ID
+- ``traced(name)``: the same as a decorator for sync and async functions
+- ``record_span``: add an already-timed span, for callback-style hooks
+- finished spans go to an in-process ring buffer (``ring_buffer``) and, when
+  ``TRACE_FILE`` is set, are appended to that file as JSON lines
+
+Set ``TRACING_ENABLED=false`` to turn spans into no-ops.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "5000"))
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+
+
+# ============================================================================
+# Spans
+# ============================================================================
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes",
+                 "start_time", "duration_ms", "status", "error", "_started")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes: Any):
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes: Dict[str, Any] = attributes
+        self.start_time = time.time()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set(self, **attributes: Any):
+        """Add or update attributes (e.g. token counts once they are known)."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes: Any):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("notionmate_span", default=None)
+
+
+# ============================================================================
+# Exporters
+# ============================================================================
+
+class RingBufferExporter:
+    """Keeps the most recent finished spans in memory."""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE):
+        self._spans: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self._spans.append(span.to_dict())
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id:
+            spans = [s for s in spans if s["trace_id"] == trace_id]
+        return sorted(spans, key=lambda s: s["start_time"])
+
+    def traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Most recent traces, newest first.
+
+        Returns:
+            list: Dicts with the root span's name, start_time and duration_ms,
+            plus all of the trace's spans in start order
+        """
+        grouped: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        for span in self.spans():
+            grouped.setdefault(span["trace_id"], []).append(span)
+
+        traces = []
+        for trace_id, spans in reversed(grouped.items()):
+            root = next((s for s in spans if s["parent_id"] is None), spans[0])
+            traces.append({
+                "trace_id": trace_id,
+                "name": root["name"],
+                "start_time": root["start_time"],
+                "duration_ms": root["duration_ms"],
+                "spans": spans,
+            })
+            if len(traces) >= limit:
+                break
+        return traces
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+class JSONLFileExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+ring_buffer = RingBufferExporter()
+_exporters: List[Any] = [ring_buffer]
+if TRACE_FILE:
+    _exporters.append(JSONLFileExporter(TRACE_FILE))
+
+
+def add_exporter(exporter: Any):
+    """Register another exporter (any object with an ``export(span)`` method)."""
+    _exporters.append(exporter)
+
+
+def _export(span: Span):
+    for exporter in _exporters:
+        try:
+            exporter.export(span)
+        except Exception:
+            # Tracing must never break the traced code
+            pass
+
+
+# ============================================================================
+# Span API
+# ============================================================================
+
+def current_span():
+    """The innermost active span (a no-op span when there is none)."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a block of code as a span.
+
+    Args:
+        name: Operation name, e.g. "notion.search"
+        **attributes: Extra attributes recorded with the span
+
+    Yields:
+        The span, whose ``set`` method adds attributes while it is open
+    """
+    if not TRACING_ENABLED:
+        yield _NOOP_SPAN
+        return
+
+    active = Span(name, _current_span.get(), **attributes)
+    token = _current_span.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.status = "error"
+        active.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        active.duration_ms = round((time.perf_counter() - active._started) * 1000, 3)
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Closed from a different context than it was opened in
+            pass
+        _export(active)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of ``span`` for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def record_span(name: str, start_time: float, duration_ms: float, **attributes: Any):
+    """
+    Record a span that was timed elsewhere, as a child of the current span.
+
+    Args:
+        name: Operation name
+        start_time: Wall-clock start (``time.time()``)
+        duration_ms: Duration in milliseconds
+        **attributes: Extra attributes recorded with the span
+    """
+    if not TRACING_ENABLED:
+        return
+    recorded = Span(name, _current_span.get(), **attributes)
+    recorded.start_time = start_time
+    recorded.duration_ms = round(duration_ms, 3)
+    _export(recorded)
+
+
+def token_usage(message: Any) -> Dict[str, int]:
+    """Token counts from a LangChain chat message's usage metadata, if present."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    return {key: usage[key] for key in ("input_tokens", "output_tokens", "total_tokens") if key in usage}
+
+
+# ============================================================================
+# ADK Model Callbacks
+# ============================================================================
+
+def trace_before_model(callback_context, llm_request):
+    """ADK before-model callback that starts timing an LLM call."""
+    callback_context.state[f"temp:trace_llm:{callback_context.agent_name}"] = {
+        "start_time": time.time(),
+        "model": llm_request.model or "",
+    }
+    return None
+
+
+def trace_after_model(callback_context, llm_response):
+    """ADK after-model callback that records the LLM call with its token counts."""
+    started = callback_context.state.get(f"temp:trace_llm:{callback_context.agent_name}")
+    if not started:
+        return None
+
+    attributes = {"agent": callback_context.agent_name, "model": started["model"]}
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None:
+        attributes["input_tokens"] = usage.prompt_token_count or 0
+        attributes["output_tokens"] = usage.candidates_token_count or 0
+        attributes["total_tokens"] = usage.total_token_count or 0
+    record_span("llm.call", started["start_time"], (time.time() - started["start_time"]) * 1000, **attributes)
+    return None